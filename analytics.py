@@ -0,0 +1,182 @@
+"""Pre-aggregated registration analytics.
+
+Rollups live in ``db.registration_rollups`` as one small counter document per
+bucket: an IST hour (``hour:2025-11-28T09:00``) or a college/course/role tally
+(``college:MGM College, Udupi``). They are bumped alongside every insert and
+delete, and can be rebuilt from scratch with a single aggregation over
+``db.registrations`` (``flask rebuild-analytics``).
+"""
+
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from pymongo import UpdateOne
+
+ROLLUP_COLLECTION = "registration_rollups"
+ROLLUP_TIMEZONE = "Asia/Kolkata"
+HOUR_FORMAT = "%Y-%m-%dT%H:00"
+TALLY_KINDS = ("college", "course", "role")
+
+IST = ZoneInfo(ROLLUP_TIMEZONE)
+
+
+def hour_bucket(created_at):
+    """Return the IST hour bucket label for a registration timestamp.
+
+    ISO 8601 strings (e.g. rows written by older tools) are parsed; anything
+    else that is not a datetime has no bucket.
+    """
+    if isinstance(created_at, str):
+        try:
+            created_at = datetime.fromisoformat(created_at)
+        except ValueError:
+            return None
+    if not isinstance(created_at, datetime):
+        return None
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return created_at.astimezone(IST).strftime(HOUR_FORMAT)
+
+
+def rollup_keys(doc):
+    """Yield the ``(kind, key)`` buckets a registration contributes to."""
+    bucket = hour_bucket(doc.get("created_at"))
+    if bucket:
+        yield "hour", bucket
+    values = {
+        "college": doc.get("college"),
+        "course": doc.get("course"),
+        "role": doc.get("role") or doc.get("category"),
+    }
+    for kind in TALLY_KINDS:
+        if values[kind]:
+            yield kind, values[kind]
+
+
+def rollup_updates(docs, delta=1):
+    """Return the ``UpdateOne`` operations applying ``delta`` for ``docs``."""
+    tallies = Counter()
+    for doc in docs:
+        for kind, key in rollup_keys(doc):
+            tallies[(kind, key)] += delta
+    return [
+        UpdateOne(
+            {"_id": f"{kind}:{key}"},
+            {"$inc": {"count": count}, "$setOnInsert": {"kind": kind, "key": key}},
+            upsert=True,
+        )
+        for (kind, key), count in tallies.items()
+        if count
+    ]
+
+
+def record(db, docs, delta=1):
+    """Apply ``delta`` to the rollups of every registration in ``docs``."""
+    updates = rollup_updates(docs, delta)
+    if updates:
+        db[ROLLUP_COLLECTION].bulk_write(updates, ordered=False)
+
+
+def rebuild(db, option_ids=None):
+    """Recompute every rollup from ``db.registrations`` and swap them in.
+
+    Counts are computed into a scratch collection and renamed over the live
+    one so readers never see a half-built set. Increments that land while the
+    rebuild is running may be lost; run it during a quiet window. Compact
+    documents group by ``college_id``/``course_id``, which ``option_ids``
+    turns back into names.
+    """
+    def group(expr):
+        return [
+            {"$group": {"_id": expr, "count": {"$sum": 1}}},
+            {"$match": {"_id": {"$nin": [None, ""]}}},
+        ]
+
+    pipeline = [
+        {
+            "$facet": {
+                "hour": group(
+                    {
+                        "$dateToString": {
+                            # Strings are parsed like ``hour_bucket`` does;
+                            # unparseable values fall out as null.
+                            "date": {
+                                "$convert": {
+                                    "input": "$created_at",
+                                    "to": "date",
+                                    "onError": None,
+                                    "onNull": None,
+                                }
+                            },
+                            "format": HOUR_FORMAT,
+                            "timezone": ROLLUP_TIMEZONE,
+                        }
+                    }
+                ),
+                "college": group({"$ifNull": ["$college", "$college_id"]}),
+                "course": group({"$ifNull": ["$course", "$course_id"]}),
+                "role": group({"$ifNull": ["$role", "$category"]}),
+            }
+        }
+    ]
+    facets = next(db.registrations.aggregate(pipeline), {})
+
+    # Legacy and compact rows for the same name land in one bucket.
+    tallies = Counter()
+    for kind, rows in facets.items():
+        for row in rows:
+            key = row["_id"]
+            if isinstance(key, int) and option_ids is not None:
+                key = option_ids.name_for(kind, key)
+            if key:
+                tallies[(kind, key)] += row["count"]
+    rollups = [
+        {"_id": f"{kind}:{key}", "kind": kind, "key": key, "count": count}
+        for (kind, key), count in tallies.items()
+    ]
+
+    scratch = db[f"{ROLLUP_COLLECTION}_rebuild"]
+    scratch.drop()
+    if not rollups:
+        db[ROLLUP_COLLECTION].drop()
+        return 0
+    scratch.insert_many(rollups)
+    scratch.rename(ROLLUP_COLLECTION, dropTarget=True)
+    return len(rollups)
+
+
+def hour_labels(hours, now=None):
+    """Return the IST hour labels of the last ``hours`` hours, oldest first."""
+    now = (now or datetime.now(timezone.utc)).astimezone(IST)
+    current = now.replace(minute=0, second=0, microsecond=0)
+    return [
+        (current - timedelta(hours=offset)).strftime(HOUR_FORMAT)
+        for offset in range(hours - 1, -1, -1)
+    ]
+
+
+def summary(db, hours=48, now=None):
+    """Return the rollups grouped by kind, ready for JSON.
+
+    ``hourly`` covers exactly the last ``hours`` IST hours up to ``now``,
+    with hours that saw no sign-ups filled in as zero.
+    """
+    labels = hour_labels(hours, now)
+    grouped = {"hour": [], "college": [], "course": [], "role": []}
+    query = {
+        "count": {"$gt": 0},
+        "$or": [{"kind": {"$ne": "hour"}}, {"key": {"$gte": labels[0]}}],
+    }
+    for doc in db[ROLLUP_COLLECTION].find(query):
+        if doc.get("kind") in grouped:
+            grouped[doc["kind"]].append({"key": doc["key"], "count": doc["count"]})
+
+    per_hour = {row["key"]: row["count"] for row in grouped.pop("hour")}
+    result = {
+        kind: sorted(rows, key=lambda row: (-row["count"], row["key"]))
+        for kind, rows in grouped.items()
+    }
+    result["hourly"] = [{"key": label, "count": per_hour.get(label, 0)} for label in labels]
+    result["total"] = sum(row["count"] for row in result["role"])
+    return result
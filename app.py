@@ -1,29 +1,52 @@
 import os
+import queue
 import re
+import uuid
 from datetime import datetime, timezone
 from functools import wraps
 from io import BytesIO
 
-import pandas as pd
-from fpdf import FPDF
+import click
 from flask import (
     Flask,
     flash,
+    g,
     jsonify,
     redirect,
     render_template,
+    Response,
     request,
     send_file,
+    send_from_directory,
     session,
+    stream_with_context,
     url_for,
 )
-from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
-from openpyxl.utils import get_column_letter
-from pymongo import MongoClient, errors
+from pymongo import MongoClient, ReturnDocument, errors
+from pymongo.read_concern import ReadConcern
+from pymongo.read_preferences import (
+    Nearest,
+    Primary,
+    PrimaryPreferred,
+    Secondary,
+    SecondaryPreferred,
+)
 from bson import ObjectId
 from bson.errors import InvalidId
+from jinja2 import FileSystemBytecodeCache
 from zoneinfo import ZoneInfo
 
+import analytics
+import archive
+import assets
+import bulk_ops
+import compact
+import compression
+import freeze
+import gallery
+import idempotency
+import importer
+import warmup
 from data import (
     current_year,
     dignitaries,
@@ -34,6 +57,24 @@ from data import (
     schedule,
     storyline,
 )
+from export_cache import ExportCache
+from idempotency import SubmissionTokens
+from live_feed import RegistrationFeed
+from query_audit import SlowQueryLog
+from query_cache import QueryCache
+from read_model import RegistrationReadModel
+from exports import (
+    EXCEL_MIMETYPE,
+    PDF_MIMETYPE,
+    build_excel,
+    build_pdf,
+    build_workbook,
+    bundle_filename,
+    iter_built_exports,
+    reset_export_pool,
+    shutdown_export_pool,
+    stream_zip,
+)
 
 IST = ZoneInfo("Asia/Kolkata")
 
@@ -57,6 +98,92 @@ app.config["ADMIN_USERNAME"] = os.environ.get("ADMIN_USERNAME", "admin")
 app.config["ADMIN_PASSWORD"] = os.environ.get("ADMIN_PASSWORD", "brahatgeetha2025")
 app.config["MONGO_URI"] = os.environ.get("MONGO_URI", "mongodb://localhost:27017")
 app.config["MONGO_DB_NAME"] = os.environ.get("MONGO_DB_NAME", "krishna_event")
+# Per-process connection pool bounds (each worker process has its own client).
+app.config["MONGO_MAX_POOL_SIZE"] = int(os.environ.get("MONGO_MAX_POOL_SIZE", "100"))
+app.config["MONGO_MIN_POOL_SIZE"] = int(os.environ.get("MONGO_MIN_POOL_SIZE", "0"))
+# Wire compression offered to the server, best first; codecs whose Python
+# package is missing (zstandard, python-snappy) are skipped with a warning.
+app.config["MONGO_COMPRESSORS"] = os.environ.get("MONGO_COMPRESSORS", "zstd,snappy,zlib")
+# Write registrations with college/course ids instead of names (compact.py);
+# existing rows are converted with ``flask compact-registrations``.
+app.config["COMPACT_REGISTRATIONS"] = os.environ.get("COMPACT_REGISTRATIONS", "0") == "1"
+# Read routing for admin searches, counts and exports; registration writes
+# and duplicate checks always go to the primary.
+app.config["MONGO_READ_PREFERENCE"] = os.environ.get(
+    "MONGO_READ_PREFERENCE", "secondaryPreferred"
+)
+app.config["MONGO_MAX_STALENESS_SECONDS"] = int(
+    os.environ.get("MONGO_MAX_STALENESS_SECONDS", "-1")
+)
+app.config["MONGO_READ_CONCERN"] = os.environ.get("MONGO_READ_CONCERN", "local")
+app.config["EXPORT_CACHE_DIR"] = os.environ.get(
+    "EXPORT_CACHE_DIR", os.path.join(app.instance_path, "export_cache")
+)
+app.config["EXPORT_CACHE_MAX_BYTES"] = int(
+    os.environ.get("EXPORT_CACHE_MAX_BYTES", str(256 * 1024 * 1024))
+)
+app.config["LIVE_FEED_POLL_SECONDS"] = float(os.environ.get("LIVE_FEED_POLL_SECONDS", "2"))
+# Each open live feed holds a server thread (see serve.py); beyond this many
+# per process, dashboards are refused a feed rather than starve other requests.
+app.config["LIVE_FEED_MAX_STREAMS"] = int(os.environ.get("LIVE_FEED_MAX_STREAMS", "4"))
+# Admin search results are cached per process; other workers' writes are
+# picked up by re-reading the shared change counter at most this often.
+app.config["SEARCH_CACHE_ENTRIES"] = int(os.environ.get("SEARCH_CACHE_ENTRIES", "256"))
+app.config["SEARCH_CACHE_REVALIDATE_SECONDS"] = float(
+    os.environ.get("SEARCH_CACHE_REVALIDATE_SECONDS", "2")
+)
+# Mongo commands slower than this are logged with their filter shape; a sample
+# of them is explained to show the plan (see /admin/slow-queries).
+app.config["SLOW_QUERY_MS"] = float(os.environ.get("SLOW_QUERY_MS", "100"))
+app.config["SLOW_QUERY_EXPLAIN_SAMPLE"] = float(os.environ.get("SLOW_QUERY_EXPLAIN_SAMPLE", "0.1"))
+app.config["SLOW_QUERY_LOG_SIZE"] = int(os.environ.get("SLOW_QUERY_LOG_SIZE", "200"))
+# Optional per-process in-memory copy of the registrations serving admin
+# search/paging and exports; kept current by polling every few seconds.
+app.config["READ_MODEL"] = os.environ.get("READ_MODEL", "0") == "1"
+app.config["READ_MODEL_POLL_SECONDS"] = float(os.environ.get("READ_MODEL_POLL_SECONDS", "2"))
+# The gallery renders its first screen and loads the rest from /api/gallery.
+app.config["GALLERY_FIRST_PAGE"] = int(os.environ.get("GALLERY_FIRST_PAGE", "6"))
+app.config["GALLERY_PAGE_SIZE"] = int(os.environ.get("GALLERY_PAGE_SIZE", "12"))
+# Registrations created before the current event (ARCHIVE_BEFORE, a date in
+# IST) are moved to the archive collection by ``flask archive-registrations``.
+app.config["ARCHIVE_BEFORE"] = os.environ.get("ARCHIVE_BEFORE", "")
+app.config["ARCHIVE_BATCH_SIZE"] = int(os.environ.get("ARCHIVE_BATCH_SIZE", "1000"))
+app.config["ARCHIVE_DIR"] = os.environ.get(
+    "ARCHIVE_DIR", os.path.join(app.instance_path, "archive")
+)
+# Resubmissions of the same rendered registration form replay the first
+# outcome; claims are kept this long and the last outcomes cached per process.
+app.config["IDEMPOTENCY_TTL_SECONDS"] = int(os.environ.get("IDEMPOTENCY_TTL_SECONDS", "86400"))
+app.config["IDEMPOTENCY_CACHE_SIZE"] = int(os.environ.get("IDEMPOTENCY_CACHE_SIZE", "10000"))
+app.config["IDEMPOTENCY_WAIT_SECONDS"] = float(os.environ.get("IDEMPOTENCY_WAIT_SECONDS", "5"))
+app.config["BULK_BATCH_SIZE"] = int(os.environ.get("BULK_BATCH_SIZE", "500"))
+app.config["IMPORT_BATCH_SIZE"] = int(os.environ.get("IMPORT_BATCH_SIZE", "1000"))
+app.config["IMPORT_REPORT_DIR"] = os.environ.get(
+    "IMPORT_REPORT_DIR", os.path.join(app.instance_path, "import_reports")
+)
+# Bundle export processes per web worker; every gunicorn worker owns its own
+# pool, so the machine runs up to WEB_WORKERS x EXPORT_WORKERS builders.
+app.config["EXPORT_WORKERS"] = int(os.environ.get("EXPORT_WORKERS", "2"))
+# Serve the purged/minified files from ``flask build-assets`` when they exist.
+app.config["USE_ASSET_BUNDLE"] = os.environ.get("USE_ASSET_BUNDLE", "1") == "1"
+# Dynamic responses smaller than this are sent as-is; level 5 keeps gzip cheap
+# on CPU while getting most of level 9's savings on HTML and JSON.
+app.config["COMPRESS_MIN_BYTES"] = int(os.environ.get("COMPRESS_MIN_BYTES", "1024"))
+app.config["COMPRESS_LEVEL"] = int(os.environ.get("COMPRESS_LEVEL", "5"))
+# Compiled templates are cached on disk and shared by every worker; all
+# templates are loaded at import so first requests never compile one.
+app.config["TEMPLATE_CACHE"] = os.environ.get("TEMPLATE_CACHE", "1") == "1"
+app.config["TEMPLATE_CACHE_DIR"] = os.environ.get(
+    "TEMPLATE_CACHE_DIR", os.path.join(app.instance_path, "jinja_cache")
+)
+app.config["TEMPLATE_WARMUP"] = os.environ.get("TEMPLATE_WARMUP", "1") == "1"
+
+if app.config["TEMPLATE_CACHE"]:
+    os.makedirs(app.config["TEMPLATE_CACHE_DIR"], exist_ok=True)
+    app.jinja_options = {
+        **app.jinja_options,
+        "bytecode_cache": FileSystemBytecodeCache(app.config["TEMPLATE_CACHE_DIR"]),
+    }
 
 DEFAULT_COLLEGES = [
     "Dr. B. B. Hegde First Grade College, Kundapura",
@@ -77,8 +204,44 @@ DEFAULT_COURSES = [
 
 mongo_client = None
 mongo_db = None
+mongo_read_db = None
+asset_build = None
+
+READ_PREFERENCES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+export_cache = ExportCache(
+    app.config["EXPORT_CACHE_DIR"], app.config["EXPORT_CACHE_MAX_BYTES"]
+)
+
+REGISTRATIONS_STATE_ID = "registrations_state"
+
+submission_tokens = SubmissionTokens(
+    ttl_seconds=app.config["IDEMPOTENCY_TTL_SECONDS"],
+    cache_size=app.config["IDEMPOTENCY_CACHE_SIZE"],
+    wait_seconds=app.config["IDEMPOTENCY_WAIT_SECONDS"],
+)
 
 PHONE_PATTERN = re.compile(r"^[6-9]\d{9}$")
+VALID_ROLES = {"Student", "Faculty", "Volunteer"}
+
+def explain_client():
+    db = get_db()
+    return db.client if db is not None else None
+
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=app.config["SLOW_QUERY_MS"],
+    explain_sample_rate=app.config["SLOW_QUERY_EXPLAIN_SAMPLE"],
+    max_entries=app.config["SLOW_QUERY_LOG_SIZE"],
+    get_client=explain_client,
+)
+
 
 def get_db():
     """Return MongoDB database handle or None if unavailable."""
@@ -90,6 +253,10 @@ def get_db():
         mongo_client = MongoClient(
             app.config["MONGO_URI"],
             serverSelectionTimeoutMS=3000,
+            maxPoolSize=app.config["MONGO_MAX_POOL_SIZE"],
+            minPoolSize=app.config["MONGO_MIN_POOL_SIZE"],
+            compressors=app.config["MONGO_COMPRESSORS"] or None,
+            event_listeners=[slow_query_log],
         )
         mongo_client.admin.command("ping")
         mongo_db = mongo_client[app.config["MONGO_DB_NAME"]]
@@ -97,16 +264,114 @@ def get_db():
         app.logger.error("MongoDB connection failed: %s", exc)
         mongo_db = None
 
+    if mongo_db is not None and app.config["COMPACT_REGISTRATIONS"]:
+        try:
+            compact.ensure_indexes(mongo_db)
+        except errors.PyMongoError as exc:
+            app.logger.warning("Could not create compact registration indexes: %s", exc)
+
     return mongo_db
 
 
+def close_db():
+    """Close the MongoDB client; the next ``get_db`` call reconnects."""
+    global mongo_client, mongo_db, mongo_read_db
+    if mongo_client is not None:
+        mongo_client.close()
+    mongo_client = None
+    mongo_db = None
+    mongo_read_db = None
+
+
+def reset_after_fork():
+    """Drop per-process state inherited from a parent process.
+
+    A ``MongoClient`` must not be shared across ``fork``; its sockets and
+    monitor threads belong to the parent. The child just forgets it (without
+    closing, which would touch the parent's connections) along with the live
+    feed watcher and export pool.
+    """
+    global mongo_client, mongo_db, mongo_read_db, search_cache
+    mongo_client = None
+    mongo_db = None
+    mongo_read_db = None
+    search_cache = new_search_cache()
+    slow_query_log.reset()
+    submission_tokens.reset()
+    read_model.reset()
+    registration_feed.reset()
+    reset_export_pool()
+
+
+def warm_worker():
+    """Connect to MongoDB and fill per-process caches before serving traffic."""
+    if get_db() is not None:
+        get_read_db()
+        get_form_options()
+        option_ids.refresh()
+    get_asset_build()
+    if app.config["READ_MODEL"]:
+        read_model.start()
+    # Normally already done at import (in the gunicorn master with
+    # preload_app, inherited by the fork); TEMPLATE_WARMUP=0 turns it off.
+    if app.config["TEMPLATE_WARMUP"] and not templates_warmed:
+        warm_templates()
+
+
+def shutdown_worker():
+    """Release per-process resources when a worker drains."""
+    shutdown_export_pool()
+    close_db()
+
+
+def admin_read_preference():
+    """Read preference for admin/export reads, from ``MONGO_READ_PREFERENCE``."""
+    mode = READ_PREFERENCES[app.config["MONGO_READ_PREFERENCE"]]
+    if mode is Primary:
+        return Primary()
+    return mode(max_staleness=app.config["MONGO_MAX_STALENESS_SECONDS"])
+
+
+def admin_read_concern():
+    return ReadConcern(app.config["MONGO_READ_CONCERN"])
+
+
+def get_read_db():
+    """Return a database handle for read-heavy admin and export queries.
+
+    Same connection pool as ``get_db`` but with the configured read
+    preference and read concern, so these reads can be served by
+    secondaries instead of the primary that absorbs registrations.
+    """
+    global mongo_read_db
+    db = get_db()
+    if db is None:
+        return None
+    if mongo_read_db is None or mongo_read_db.client is not db.client:
+        mongo_read_db = db.with_options(
+            read_preference=admin_read_preference(),
+            read_concern=admin_read_concern(),
+        )
+    return mongo_read_db
+
+
+# The document also holds the compact id tables, which the forms never need.
+FORM_OPTIONS_PROJECTION = {"colleges": 1, "courses": 1}
+
+
 def get_form_options():
     """Fetch college and course options from MongoDB."""
     db = get_db()
     if db is None:
         return DEFAULT_COLLEGES, DEFAULT_COURSES
 
-    doc = db.meta.find_one({"_id": "form_options"}) or {}
+    doc = db.meta.find_one({"_id": "form_options"}, FORM_OPTIONS_PROJECTION)
+    return form_options_from_doc(doc)
+
+
+def form_options_from_doc(doc):
+    """Return ``(colleges, courses)`` from the ``meta.form_options`` document."""
+    doc = doc or {}
     colleges = doc.get("colleges") or DEFAULT_COLLEGES
     courses = doc.get("courses") or DEFAULT_COURSES
     return colleges, courses
@@ -125,43 +390,223 @@ def save_form_options(colleges, courses):
     return True
 
 
-def fetch_registrations(search_query=None, college_filter=None):
-    """Fetch all registrations, optionally filtered by search query and/or college."""
+def new_search_cache():
+    return QueryCache(
+        max_entries=app.config["SEARCH_CACHE_ENTRIES"],
+        revalidate_seconds=app.config["SEARCH_CACHE_REVALIDATE_SECONDS"],
+    )
+
+
+search_cache = new_search_cache()
+
+
+def bump_registrations_version(db, updated=False):
+    """Record that the registrations collection changed.
+
+    ``updated`` marks in-place edits (bulk reassignments), which the read
+    model cannot pick up incrementally and reloads for.
+    """
+    search_cache.invalidate()
+    increments = {"version": 1}
+    if updated:
+        increments["updates"] = 1
+    state = db.meta.find_one_and_update(
+        {"_id": REGISTRATIONS_STATE_ID},
+        {"$inc": increments},
+        projection={"version": 1},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    # Searches served by secondaries are only cached once they show this write.
+    search_cache.observe_version(state["version"])
+    read_model.poke()
+
+
+def active_read_model(version=None, catch_up=True):
+    """Return the in-memory read model if it is loaded and current, else None.
+
+    Current means it has seen at least ``version`` of ``registrations_state``;
+    by default the version the search cache last observed on the primary,
+    which is re-read at most every ``SEARCH_CACHE_REVALIDATE_SECONDS`` so
+    keystrokes do not each cost a round trip. A model that is behind syncs
+    inline when ``catch_up`` is set; if it is still behind, callers fall back
+    to MongoDB.
+    """
+    if not app.config["READ_MODEL"]:
+        return None
+    read_model.start()
+    if not read_model.ready:
+        return None
+    if version is None:
+        db = get_db()
+        if db is None:
+            return None
+        revalidate_search_cache(db)
+        version = search_cache.version or 0
+    if (read_model.version or 0) < version:
+        if catch_up:
+            read_model.catch_up()
+        else:
+            read_model.poke()
+    return read_model if (read_model.version or 0) >= version else None
+
+
+def revalidate_search_cache(db):
+    """Drop cached searches if another process changed the registrations."""
+    if search_cache.needs_revalidation():
+        search_cache.observe_version(read_version(db))
+
+
+def read_version(db, session=None):
+    """The ``registrations_state`` version visible through ``db``."""
+    state = db.meta.find_one(
+        {"_id": REGISTRATIONS_STATE_ID}, {"version": 1}, session=session
+    ) or {}
+    return state.get("version", 0)
+
+
+def search_cache_keys(search_query, college_filter, page, limit, archived=False):
+    """Cache keys for a result page and for the (page-independent) count."""
+    return (
+        ("count", search_query, college_filter, archived),
+        ("page", search_query, college_filter, page, limit, archived),
+    )
+
+
+def wants_archive(args):
+    """True when an admin request asks for archived (past-event) registrations."""
+    return args.get("archive") == "1"
+
+
+def registrations_collection(db, archived=False):
+    return db[archive.ARCHIVE_COLLECTION] if archived else db.registrations
+
+
+def registrations_data_version(db, session=None):
+    """Return a token that changes whenever the registration data changes.
+
+    Combines the change counter bumped by the app with the document count and
+    newest ``_id`` so inserts made outside the app are noticed too. Pass the
+    primary ``db``; the count is taken first because it cannot join
+    ``session``, so the session's cluster time covers all three reads.
+    """
+    count = db.registrations.estimated_document_count()
+    state = db.meta.find_one({"_id": REGISTRATIONS_STATE_ID}, session=session) or {}
+    latest = db.registrations.find_one(
+        {}, {"_id": 1}, sort=[("_id", -1)], session=session
+    )
+    return "{}:{}:{}".format(
+        state.get("version", 0),
+        count,
+        latest["_id"] if latest else "",
+    )
+
+
+def record_analytics(docs, delta=1):
+    """Keep the analytics rollups in step with registration writes."""
     db = get_db()
     if db is None:
-        return []
+        return
+    try:
+        analytics.record(db, docs, delta)
+    except errors.PyMongoError as exc:
+        # Rollups can be rebuilt later; never fail the write because of them.
+        app.logger.warning("Failed to update analytics rollups: %s", exc)
+
 
+def build_registration_query(search_query=None, college_filter=None):
+    """Build the Mongo filter for the admin search box and college dropdown.
+
+    College and course conditions match both stored forms (names and
+    compact ids).
+    """
     query = {}
     
     # College filter (exact match)
     if college_filter and college_filter.strip():
-        query["college"] = college_filter.strip()
+        query = option_ids.match("college", college_filter.strip())
     
     # Search query (across multiple fields)
     if search_query and search_query.strip():
-        search_regex = {"$regex": search_query.strip().lower(), "$options": "i"}
+        pattern = search_query.strip().lower()
+        search_regex = {"$regex": pattern, "$options": "i"}
         search_conditions = {
             "$or": [
                 {"name": search_regex},
-                {"college": search_regex},
-                {"course": search_regex},
+                *option_ids.match_regex("college", pattern),
+                *option_ids.match_regex("course", pattern),
                 {"role": search_regex},
                 {"phone": search_regex},
                 {"email": search_regex},
             ]
         }
         # Combine college filter with search
-        if college_filter and college_filter.strip():
-            query = {"$and": [{"college": college_filter.strip()}, search_conditions]}
+        if query:
+            query = {"$and": [query, search_conditions]}
         else:
             query = search_conditions
 
-    registrations = []
-    for entry in db.registrations.find(query).sort("created_at", 1):
-        entry["_id"] = str(entry["_id"])
-        entry["formatted_created_at"] = format_timestamp(entry.get("created_at"))
-        registrations.append(entry)
-    return registrations
+    return query
+
+
+def fetch_registrations(
+    search_query=None, college_filter=None, archived=False, session=None
+):
+    """Fetch all registrations, optionally filtered by search query and/or college.
+
+    ``archived`` reads the archive collection instead of the current event.
+    ``session`` (causally consistent) makes the read see at least what earlier
+    reads in that session saw, even when a secondary serves it.
+    """
+    model = None if archived else active_read_model()
+    if model is not None:
+        _, entries = model.query(search_query, college_filter)
+        return [serialize_registration(entry) for entry in entries]
+
+    db = get_read_db()
+    if db is None:
+        return []
+
+    query = build_registration_query(search_query, college_filter)
+    return [
+        serialize_registration(entry)
+        for entry in registrations_collection(db, archived)
+        .find(query, session=session)
+        .sort("created_at", 1)
+    ]
+
+
+def stored_registration(doc):
+    """Return ``doc`` in the form it is written to ``db.registrations``."""
+    if app.config["COMPACT_REGISTRATIONS"]:
+        return option_ids.encode(doc)
+    return doc
+
+
+def serialize_registration(entry):
+    """Prepare a registration document for templates, JSON and exports."""
+    option_ids.decode(entry)
+    entry["_id"] = str(entry["_id"])
+    entry["formatted_created_at"] = format_timestamp(entry.get("created_at"))
+    return entry
+
+
+option_ids = compact.OptionIds(get_db)
+
+read_model = RegistrationReadModel(
+    get_db,
+    REGISTRATIONS_STATE_ID,
+    poll_interval=app.config["READ_MODEL_POLL_SECONDS"],
+    logger=app.logger,
+    decode=option_ids.decode,
+)
+
+registration_feed = RegistrationFeed(
+    get_db,
+    serialize_registration,
+    poll_interval=app.config["LIVE_FEED_POLL_SECONDS"],
+    logger=app.logger,
+)
 
 
 def admin_required(view_func):
@@ -227,7 +672,7 @@ def get_gallery_images():
     if os.path.exists(image_dir):
         image_extensions = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".svg"}
 
-        for filename in os.listdir(image_dir):
+        for filename in sorted(os.listdir(image_dir)):
             lower_name = filename.lower()
             if (
                 "logo" in lower_name
@@ -254,6 +699,7 @@ def get_gallery_images():
                 gallery_images.append(
                     {
                         "src": url_for("static", filename=f"images/{filename}"),
+                        "filename": f"images/{filename}",
                         "caption": caption,
                         "title": caption,
                         "subtitle": "Sri Krishna Math · Devotional Moment",
@@ -269,17 +715,34 @@ def get_additional_gallery_images():
         images.append(
             {
                 "src": url_for("static", filename=filename),
+                "filename": filename,
                 "caption": caption,
                 "title": caption,
-                "loading": "eager",
-                "fetchpriority": "high",
             }
         )
     return images
 
 
+def get_asset_build():
+    """Return the built asset manifest with critical CSS loaded, or None."""
+    global asset_build
+    if not app.config["USE_ASSET_BUNDLE"]:
+        return None
+    if asset_build is None:
+        manifest = assets.load_manifest(app.static_folder)
+        if manifest is None:
+            return None
+        critical_css = {}
+        for endpoint, path in manifest["critical"].items():
+            with open(os.path.join(app.static_folder, *path.split("/")), encoding="utf-8") as handle:
+                critical_css[endpoint] = handle.read()
+        asset_build = {**manifest, "critical_css": critical_css}
+    return asset_build
+
+
 @app.context_processor
 def inject_layout_tokens():
+    build = get_asset_build()
     return {
         "brand": "Laksha Kantha Geetha Parayana",
         "year": current_year(),
@@ -290,12 +753,37 @@ def inject_layout_tokens():
             {"href": "/register", "label": "Register"},
         ],
         "asset_version": ASSET_VERSION,
+        "css_bundle": build["css_bundle"] if build else None,
+        "critical_css": build["critical_css"].get(request.endpoint, "") if build else "",
     }
 
 
+@app.url_defaults
+def fingerprinted_static_urls(endpoint, values):
+    """Swap static filenames for built and (while freezing) hashed names."""
+    if endpoint != "static":
+        return
+    build = get_asset_build()
+    if build and values.get("filename") in build["files"]:
+        values["filename"] = build["files"][values["filename"]]
+    manifest = app.config.get("ASSET_MANIFEST")
+    if not manifest:
+        return
+    hashed = manifest.get(values.get("filename"))
+    if hashed:
+        values["filename"] = hashed
+        values.pop("v", None)
+
+
 @app.after_request
 def apply_response_headers(response):
-    response.headers["Cache-Control"] = f"public, max-age={CACHE_MAX_AGE}"
+    if response.mimetype == "text/event-stream":
+        response.headers["Cache-Control"] = "no-cache"
+    elif request.endpoint == "register" or g.get("submission_token_issued"):
+        # A cached copy would hand the same one-time token to the next visitor.
+        response.headers["Cache-Control"] = "no-store"
+    else:
+        response.headers["Cache-Control"] = f"public, max-age={CACHE_MAX_AGE}"
     response.headers.pop("Expires", None)
     response.headers.pop("X-Frame-Options", None)
     response.headers.pop("X-XSS-Protection", None)
@@ -309,8 +797,37 @@ def apply_response_headers(response):
         "frame-ancestors 'self';"
     )
     response.headers["Content-Security-Policy"] = csp
+    return compression.compress_response(
+        response,
+        request.accept_encodings,
+        app.config["COMPRESS_MIN_BYTES"],
+        app.config["COMPRESS_LEVEL"],
+    )
+
+
+def serve_static(filename):
+    """Static files, preferring a prebuilt ``.br``/``.gz`` sibling when accepted."""
+    variant = compression.precompressed_variant(
+        app.static_folder, filename, request.accept_encodings
+    )
+    if variant is None:
+        response = app.send_static_file(filename)
+    else:
+        encoding, sibling = variant
+        response = send_from_directory(
+            app.static_folder,
+            sibling,
+            mimetype=compression.guess_mimetype(filename),
+            max_age=app.get_send_file_max_age(filename),
+        )
+        response.headers["Content-Encoding"] = encoding
+    if response.mimetype in compression.COMPRESSIBLE_MIMETYPES:
+        response.vary.add("Accept-Encoding")
     return response
 
+
+app.view_functions["static"] = serve_static
+
 @app.route("/favicon.ico")
 def favicon():
     # Return 204 No Content to remove favicon/logo from title
@@ -331,10 +848,66 @@ def home():
     )
 
 
-@app.route("/gallery")
-def gallery():
-    gallery_images = get_gallery_images() + get_additional_gallery_images()
-    return render_template("gallery.html", hero=hero_story, gallery=gallery_images)
+def gallery_item_payload(item):
+    """Public fields of a gallery image plus its size and placeholder."""
+    payload = {
+        "src": item["src"],
+        "title": item.get("title") or item.get("caption") or "Gallery image",
+        "caption": item.get("caption", ""),
+        "subtitle": item.get("subtitle", ""),
+        "width": None,
+        "height": None,
+        "placeholder": None,
+    }
+    if item.get("filename"):
+        path = os.path.join(app.static_folder, *item["filename"].split("/"))
+        payload.update(gallery.image_metadata(path))
+    return payload
+
+
+def gallery_page(cursor, limit):
+    """Return ``(items, next_cursor)``; raises ValueError for a bad cursor."""
+    items = get_gallery_images() + get_additional_gallery_images()
+    page, next_cursor = gallery.paginate(items, cursor, limit)
+    return [gallery_item_payload(item) for item in page], next_cursor
+
+
+def render_gallery(cursor):
+    try:
+        items, next_cursor = gallery_page(cursor, app.config["GALLERY_FIRST_PAGE"])
+    except ValueError:
+        return redirect(url_for("gallery"))
+    return render_template(
+        "gallery.html",
+        hero=hero_story,
+        gallery=items,
+        next_cursor=next_cursor,
+        first_page=cursor is None,
+        page_size=app.config["GALLERY_PAGE_SIZE"],
+    )
+
+
+@app.route("/gallery", endpoint="gallery")
+def gallery_view():
+    return render_gallery(None)
+
+
+# The no-JS "Load more" link; kept off the frozen /gallery page, whose static
+# copy cannot see the query string.
+@app.route("/gallery/more")
+def gallery_more():
+    return render_gallery(request.args.get("cursor") or None)
+
+
+@app.route("/api/gallery")
+def api_gallery():
+    limit = request.args.get("limit", type=int) or app.config["GALLERY_PAGE_SIZE"]
+    limit = max(1, min(limit, 48))
+    try:
+        items, next_cursor = gallery_page(request.args.get("cursor") or None, limit)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return jsonify({"items": items, "next_cursor": next_cursor})
 
 
 @app.route("/about")
@@ -352,37 +925,112 @@ def api_events():
     return jsonify(events)
 
 
+def validate_registration(fields):
+    """Normalize submitted registration fields.
+
+    Returns ``(form_data, errors_list)``; ``form_data["phone"]`` is the
+    normalized 10-digit number (or None when invalid).
+    """
+    form_data = {
+        "name": str(fields.get("name") or "").strip(),
+        "college": str(fields.get("college") or "").strip(),
+        "course": str(fields.get("course") or "").strip(),
+        "role": str(fields.get("role") or "").strip(),
+        "email": str(fields.get("email") or "").strip(),
+        "created_at": datetime.now(timezone.utc),
+    }
+
+    errors_list = []
+    if not form_data["name"]:
+        errors_list.append("Please enter your full name.")
+    if not form_data["college"]:
+        errors_list.append("Please select your college.")
+    if not form_data["course"]:
+        errors_list.append("Please select your course.")
+    if form_data["role"] not in VALID_ROLES:
+        errors_list.append("Please choose a valid role.")
+    form_data["phone"] = normalize_phone(str(fields.get("phone") or "").strip())
+    if not form_data["phone"]:
+        errors_list.append("Please provide a valid 10-digit Indian mobile number.")
+    if form_data["email"] and "@" not in form_data["email"]:
+        errors_list.append("Please provide a valid email address.")
+
+    return form_data, errors_list
+
+
+def duplicate_queries(form_data):
+    """Return the phone and email lookups that detect repeat registrations."""
+    phone = form_data["phone"]
+    phone_query = {"phone": {"$in": [phone, f"+91{phone}"]}}
+    email_query = {"email": form_data["email"]} if form_data["email"] else None
+    return phone_query, email_query
+
+
+def duplicate_messages_for(duplicate_phone, duplicate_email):
+    duplicate_messages = []
+    if duplicate_phone:
+        duplicate_messages.append("This mobile number is already registered.")
+    if duplicate_email:
+        duplicate_messages.append("This email address is already registered.")
+    return duplicate_messages
+
+
+@app.template_global()
+def submission_token():
+    """A fresh idempotency token for a rendering of the registration form."""
+    g.submission_token_issued = True
+    return idempotency.new_token()
+
+
+def form_submission_token(form):
+    token = form.get("submission_token", "")
+    return token if idempotency.valid_token(token) else None
+
+
+def complete_submission(db, token, fingerprint, outcome):
+    """Record a submission's outcome; the registration itself is already saved."""
+    try:
+        submission_tokens.complete(db, token, fingerprint, outcome)
+    except errors.PyMongoError as exc:
+        app.logger.warning("Failed to record submission outcome: %s", exc)
+
+
+def replay_submission(outcome, colleges, courses):
+    """Answer a resubmitted registration form with its first outcome."""
+    if outcome == idempotency.PENDING:
+        flash(
+            "Your registration is still being processed. "
+            "Please wait a moment before submitting again.",
+            "warning",
+        )
+        return redirect(url_for("register"))
+    if outcome["status"] == "success":
+        session["registration_success"] = True
+        flash("Jai Sri Krishna! Your registration is confirmed.", "success")
+        return redirect(url_for("register"))
+    for msg in outcome.get("messages", []):
+        flash(msg, "warning")
+    return render_template(
+        "register.html",
+        hero=hero_story,
+        colleges=colleges,
+        courses=courses,
+        registration_duplicate=True,
+    )
+
+
 @app.route("/register", methods=["GET", "POST"])
 def register():
     colleges, courses = get_form_options()
     db = get_db()
 
     if request.method == "POST":
-        raw_phone = request.form.get("phone", "").strip()
-        form_data = {
-            "name": request.form.get("name", "").strip(),
-            "college": request.form.get("college", "").strip(),
-            "course": request.form.get("course", "").strip(),
-            "role": request.form.get("role", "").strip(),
-            "email": request.form.get("email", "").strip(),
-            "created_at": datetime.now(timezone.utc),
-        }
-
-        errors_list = []
-        if not form_data["name"]:
-            errors_list.append("Please enter your full name.")
-        if not form_data["college"]:
-            errors_list.append("Please select your college.")
-        if not form_data["course"]:
-            errors_list.append("Please select your course.")
-        valid_roles = {"Student", "Faculty", "Volunteer"}
-        if form_data["role"] not in valid_roles:
-            errors_list.append("Please choose a valid role.")
-        normalized_phone = normalize_phone(raw_phone)
-        if not normalized_phone:
-            errors_list.append("Please provide a valid 10-digit Indian mobile number.")
-        if form_data["email"] and "@" not in form_data["email"]:
-            errors_list.append("Please provide a valid email address.")
+        token = form_submission_token(request.form)
+        form_data, errors_list = validate_registration(request.form)
+        fingerprint = idempotency.form_fingerprint(form_data)
+        outcome = submission_tokens.cached(token, fingerprint) if token else None
+        if outcome is not None:
+            return replay_submission(outcome, colleges, courses)
 
         if errors_list:
             for issue in errors_list:
@@ -406,24 +1054,33 @@ def register():
                 503,
             )
 
-        form_data["phone"] = normalized_phone
+        if token:
+            outcome = submission_tokens.claim(db, token, fingerprint)
+            if outcome is not None:
+                return replay_submission(outcome, colleges, courses)
 
-        duplicate_phone = db.registrations.find_one(
-            {"phone": {"$in": [normalized_phone, f"+91{normalized_phone}"]}}
-        )
-        duplicate_email = (
-            db.registrations.find_one({"email": form_data["email"]})
-            if form_data["email"]
-            else None
-        )
-
-        duplicate_messages = []
-        if duplicate_phone:
-            duplicate_messages.append("This mobile number is already registered.")
-        if duplicate_email:
-            duplicate_messages.append("This email address is already registered.")
+        try:
+            phone_query, email_query = duplicate_queries(form_data)
+            duplicate_phone = db.registrations.find_one(phone_query)
+            duplicate_email = (
+                db.registrations.find_one(email_query) if email_query else None
+            )
+            duplicate_messages = duplicate_messages_for(duplicate_phone, duplicate_email)
+            if not duplicate_messages:
+                db.registrations.insert_one(stored_registration(form_data))
+        except errors.PyMongoError:
+            if token:
+                submission_tokens.release(db, token)
+            raise
 
         if duplicate_messages:
+            if token:
+                complete_submission(
+                    db,
+                    token,
+                    fingerprint,
+                    {"status": "duplicate", "messages": duplicate_messages},
+                )
             for msg in duplicate_messages:
                 flash(msg, "warning")
             return render_template(
@@ -434,7 +1091,10 @@ def register():
                 registration_duplicate=True,
             )
 
-        db.registrations.insert_one(form_data)
+        if token:
+            complete_submission(db, token, fingerprint, {"status": "success"})
+        bump_registrations_version(db)
+        record_analytics([form_data])
         session["registration_success"] = True
         flash("Jai Sri Krishna! Your registration is confirmed.", "success")
         return redirect(url_for("register"))
@@ -476,6 +1136,26 @@ def admin_logout():
     return redirect(url_for("admin_login"))
 
 
+def registration_page_params(args):
+    """Parse ``page``, ``limit``, ``search`` and ``college`` for the admin API."""
+    page = int(args.get("page", 1))
+    limit = int(args.get("limit", 10))
+    search_query = args.get("search", "").strip().lower()
+    college_filter = args.get("college", "").strip()
+    return page, limit, search_query, college_filter
+
+
+def registration_page(registrations, total_count, page, limit):
+    skip = (page - 1) * limit
+    return {
+        "registrations": registrations,
+        "total": total_count,
+        "page": page,
+        "limit": limit,
+        "has_more": skip + len(registrations) < total_count,
+    }
+
+
 @app.route("/admin/api/registrations", methods=["GET"])
 def admin_api_registrations():
     """API endpoint for paginated and searchable registrations."""
@@ -483,71 +1163,246 @@ def admin_api_registrations():
     if not session.get("admin_authenticated"):
         return jsonify({"error": "Authentication required"}), 401
     
-    db = get_db()
+    db = get_read_db()
     if db is None:
         return jsonify({"error": "Database unavailable"}), 503
 
-    # Get query parameters
-    page = int(request.args.get("page", 1))
-    limit = int(request.args.get("limit", 10))
-    search_query = request.args.get("search", "").strip().lower()
-    college_filter = request.args.get("college", "").strip()
+    page, limit, search_query, college_filter = registration_page_params(request.args)
+    archived = wants_archive(request.args)
+    collection = registrations_collection(db, archived)
 
-    # Build query
-    query = {}
-    
-    # College filter (exact match)
-    if college_filter:
-        query["college"] = college_filter
-    
-    # Search query (across multiple fields)
-    if search_query:
-        search_regex = {"$regex": search_query, "$options": "i"}
-        search_conditions = {
-            "$or": [
-                {"name": search_regex},
-                {"college": search_regex},
-                {"course": search_regex},
-                {"role": search_regex},
-                {"phone": search_regex},
-                {"email": search_regex},
+    model = None if archived else active_read_model()
+    if model is not None:
+        total_count, entries = model.query(
+            search_query, college_filter, skip=(page - 1) * limit, limit=limit
+        )
+        registrations = [serialize_registration(entry) for entry in entries]
+        return jsonify(registration_page(registrations, total_count, page, limit))
+
+    query = build_registration_query(search_query, college_filter)
+    revalidate_search_cache(get_db())
+    generation = search_cache.generation
+    count_key, page_key = search_cache_keys(
+        search_query, college_filter, page, limit, archived
+    )
+    total_count = search_cache.get(count_key)
+    registrations = search_cache.get(page_key)
+    if total_count is not None and registrations is not None:
+        return jsonify(registration_page(registrations, total_count, page, limit))
+
+    # Misses are read from the configured read preference. Results outlive the
+    # request, so they are only cached if the member answering has applied
+    # every registrations_state version this process has seen; the causal
+    # session keeps the count and page at least that fresh even if a
+    # different secondary serves them.
+    with db.client.start_session(causal_consistency=True) as read_session:
+        cacheable = read_version(db, read_session) >= (search_cache.version or 0)
+
+        # Get total count
+        if total_count is None:
+            total_count = collection.count_documents(query, session=read_session)
+            if cacheable:
+                search_cache.put(count_key, total_count, generation)
+
+        # Calculate skip
+        skip = (page - 1) * limit
+
+        # Fetch registrations
+        if registrations is None:
+            registrations = [
+                serialize_registration(entry)
+                for entry in (
+                    collection.find(query, session=read_session)
+                    .sort("created_at", 1)
+                    .skip(skip)
+                    .limit(limit)
+                )
             ]
-        }
-        # Combine college filter with search
-        if college_filter:
-            query = {"$and": [{"college": college_filter}, search_conditions]}
-        else:
-            query = search_conditions
+            if cacheable:
+                search_cache.put(page_key, registrations, generation)
 
-    # Get total count
-    total_count = db.registrations.count_documents(query)
+    return jsonify(registration_page(registrations, total_count, page, limit))
 
-    # Calculate skip
-    skip = (page - 1) * limit
 
-    # Fetch registrations
-    registrations = []
-    for entry in (
-        db.registrations.find(query)
-        .sort("created_at", 1)
-        .skip(skip)
-        .limit(limit)
-    ):
-        entry["_id"] = str(entry["_id"])
-        entry["formatted_created_at"] = format_timestamp(entry.get("created_at"))
-        registrations.append(entry)
-
-    return jsonify(
-        {
-            "registrations": registrations,
-            "total": total_count,
-            "page": page,
-            "limit": limit,
-            "has_more": skip + len(registrations) < total_count,
-        }
+@app.route("/admin/api/registrations/stream", methods=["GET"])
+def admin_registrations_stream():
+    """Server-sent events with new registrations and updated counters."""
+    if not session.get("admin_authenticated"):
+        return jsonify({"error": "Authentication required"}), 401
+
+    subscriber = registration_feed.subscribe(limit=app.config["LIVE_FEED_MAX_STREAMS"])
+    if subscriber is None:
+        response = jsonify({"error": "Too many live feeds are open"})
+        response.status_code = 503
+        response.headers["Retry-After"] = "60"
+        return response
+
+    def stream():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    event = subscriber.get(timeout=15)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {app.json.dumps(event)}\n\n"
+        finally:
+            registration_feed.unsubscribe(subscriber)
+
+    return Response(
+        stream_with_context(stream()),
+        mimetype="text/event-stream",
+        headers={"X-Accel-Buffering": "no"},
+    )
+
+
+@app.route("/admin/api/read-model", methods=["GET"])
+def admin_api_read_model():
+    """Size and freshness of this worker's in-memory registrations copy."""
+    if not session.get("admin_authenticated"):
+        return jsonify({"error": "Authentication required"}), 401
+    if not app.config["READ_MODEL"]:
+        return jsonify({"enabled": False})
+    read_model.start()
+    return jsonify({"enabled": True, **read_model.stats()})
+
+
+@app.route("/admin/api/analytics", methods=["GET"])
+def admin_api_analytics():
+    """Precomputed sign-up rollups: hourly (IST), per college/course/role."""
+    if not session.get("admin_authenticated"):
+        return jsonify({"error": "Authentication required"}), 401
+
+    db = get_read_db()
+    if db is None:
+        return jsonify({"error": "Database unavailable"}), 503
+
+    hours = request.args.get("hours", type=int)
+    if hours is None:
+        if "hours" in request.args:
+            return jsonify({"error": "hours must be a whole number"}), 400
+        hours = 48
+    hours = min(max(hours, 1), 24 * 30)
+    return jsonify(analytics.summary(db, hours=hours))
+
+
+@app.cli.command("rebuild-analytics")
+def rebuild_analytics_command():
+    """Recompute the registration analytics rollups from scratch."""
+    db = get_db()
+    if db is None:
+        raise SystemExit("MongoDB is unavailable.")
+    count = analytics.rebuild(db, option_ids)
+    print(f"Rebuilt {count} analytics rollups.")
+
+
+@app.cli.command("archive-registrations")
+@click.option("--before", default=None, help="Event boundary, YYYY-MM-DD in IST [ARCHIVE_BEFORE].")
+@click.option("--jsonl/--no-jsonl", default=False, help="Also write a .jsonl.gz in ARCHIVE_DIR.")
+def archive_registrations_command(before, jsonl):
+    """Move registrations from before the current event to the archive."""
+    before = before or app.config["ARCHIVE_BEFORE"]
+    if not before:
+        raise SystemExit("Pass --before YYYY-MM-DD or set ARCHIVE_BEFORE.")
+    try:
+        boundary = archive.parse_boundary(before, IST)
+    except ValueError as exc:
+        raise SystemExit(str(exc))
+    db = get_db()
+    if db is None:
+        raise SystemExit("MongoDB is unavailable.")
+    jsonl_path = None
+    if jsonl:
+        jsonl_path = archive.archive_filename(
+            app.config["ARCHIVE_DIR"], boundary.astimezone(IST)
+        )
+    report = archive.archive(
+        db, boundary, batch_size=app.config["ARCHIVE_BATCH_SIZE"], jsonl_path=jsonl_path
+    )
+    if report["archived"]:
+        bump_registrations_version(db, updated=True)
+    print(
+        f"Archived {report['archived']} registrations created before "
+        f"{boundary.astimezone(IST):%d %b %Y %H:%M} IST in {report['batches']} batches."
+    )
+    if jsonl_path:
+        print(f"Compressed copy of {report['exported']} registrations: {jsonl_path}")
+
+
+def collection_sizes(db):
+    """Return ``(data bytes, index bytes)`` of ``db.registrations`` or None."""
+    try:
+        stats = db.command("collStats", "registrations")
+    except errors.PyMongoError:
+        return None
+    return stats.get("size", 0), stats.get("totalIndexSize", 0)
+
+
+@app.cli.command("compact-registrations")
+def compact_registrations_command():
+    """Rewrite stored registrations to reference colleges/courses by id."""
+    db = get_db()
+    if db is None:
+        raise SystemExit("MongoDB is unavailable.")
+    compact.ensure_indexes(db)
+    before = collection_sizes(db)
+    migrated = compact.migrate(db, option_ids, batch_size=app.config["BULK_BATCH_SIZE"])
+    after = collection_sizes(db)
+    print(f"Converted {migrated} registrations to the compact form.")
+    if before and after:
+        print(f"Data size: {before[0]:,} B -> {after[0]:,} B")
+        print(f"Index size: {before[1]:,} B -> {after[1]:,} B")
+    if not app.config["COMPACT_REGISTRATIONS"]:
+        print("Set COMPACT_REGISTRATIONS=1 so new registrations are written compactly too.")
+
+
+@app.cli.command("read-routing")
+def read_routing_command():
+    """Show where admin/export reads are routed (useful on a replica set)."""
+    db = get_read_db()
+    if db is None:
+        raise SystemExit("MongoDB is unavailable.")
+    print(f"Read preference: {db.read_preference!r}")
+    print(f"Read concern: {db.read_concern.level}")
+    print(f"Primary: {db.client.primary}")
+    print(f"Secondaries: {sorted(db.client.secondaries)}")
+    cursor = db.registrations.find({}, {"_id": 1}).limit(1)
+    list(cursor)
+    print(f"Sample admin read served by: {cursor.address}")
+
+
+@app.cli.command("freeze")
+@click.option("--output", default="build/site", show_default=True, help="Output directory.")
+def freeze_command(output):
+    """Render the public pages to static HTML with fingerprinted assets."""
+    try:
+        site_manifest = freeze.freeze_site(app, output)
+    except ValueError as exc:
+        raise SystemExit(str(exc))
+    print(
+        f"Froze {len(site_manifest['pages'])} pages and "
+        f"{len(site_manifest['assets'])} assets into {output}."
     )
 
 
+@app.cli.command("build-assets")
+def build_assets_command():
+    """Purge and minify CSS/JS into static/dist and report the savings."""
+    global asset_build
+    manifest = assets.build_assets(
+        app.static_folder,
+        os.path.join(app.root_path, app.template_folder),
+        static_url_path=app.static_url_path,
+        extra_sources=[os.path.join(app.root_path, name) for name in assets.TOKEN_SOURCES],
+    )
+    asset_build = None
+    for line in assets.format_report(manifest["report"]):
+        print(line)
+    written, before, after = compression.precompress(app.static_folder)
+    print(f"Precompressed {written} files; static text {before:,} B -> {after:,} B gzipped.")
+
+
 @app.route("/admin", methods=["GET"])
 @admin_required
 def admin_dashboard():
@@ -555,7 +1410,7 @@ def admin_dashboard():
     db_connected = get_db() is not None
     
     # Get total count for display
-    db = get_db()
+    db = get_read_db()
     total_registrations = db.registrations.count_documents({}) if db is not None else 0
 
     return render_template(
@@ -565,6 +1420,102 @@ def admin_dashboard():
         courses=courses,
         db_connected=db_connected,
         total_registrations=total_registrations,
+        last_import=session.get("last_import"),
+    )
+
+
+@app.route("/admin/import", methods=["POST"])
+@admin_required
+def admin_import_registrations():
+    """Import registrations from an uploaded CSV or XLSX sheet."""
+    upload = request.files.get("file")
+    if upload is None or not upload.filename:
+        flash("Choose a CSV or Excel file to import.", "danger")
+        return redirect(url_for("admin_dashboard"))
+
+    db = get_db()
+    if db is None:
+        db_unavailable_message()
+        return redirect(url_for("admin_dashboard"))
+
+    report_id = uuid.uuid4().hex
+    report = importer.ErrorReport(
+        os.path.join(app.config["IMPORT_REPORT_DIR"], f"{report_id}.csv")
+    )
+    stopped = False
+    try:
+        summary = importer.run_import(
+            db,
+            importer.iter_rows(upload.stream, upload.filename),
+            validate_registration,
+            report,
+            batch_size=app.config["IMPORT_BATCH_SIZE"],
+            encode=stored_registration,
+        )
+    except importer.ImportFormatError as exc:
+        flash(str(exc), "danger")
+        summary, stopped = exc.summary, True
+    except errors.PyMongoError as exc:
+        app.logger.error("Registration import failed: %s", exc)
+        flash("The import stopped because the database failed. Please try again.", "danger")
+        summary, stopped = exc.summary, True
+    finally:
+        report.close()
+
+    # Also after a handled failure: earlier batches may already be saved.
+    try:
+        bump_registrations_version(db)
+    except errors.PyMongoError as exc:
+        app.logger.warning("Failed to record the import: %s", exc)
+
+    if not report.rows:
+        os.unlink(report.path)
+    if stopped and not summary["rows"]:
+        return redirect(url_for("admin_dashboard"))
+
+    session["last_import"] = {
+        **summary,
+        "filename": upload.filename,
+        "report_id": report_id if report.rows else None,
+        "stopped": stopped,
+    }
+    message = f"Imported {summary['inserted']} of {summary['rows']} rows from {upload.filename}"
+    if stopped:
+        message += f" before it stopped; {report.rows} rows were rejected"
+    flash(f"{message}.", "success" if not report.rows and not stopped else "warning")
+    return redirect(url_for("admin_dashboard"))
+
+
+@app.route("/admin/slow-queries", methods=["GET"])
+@admin_required
+def admin_slow_queries():
+    """Slowest MongoDB query shapes seen by this worker, with sampled plans."""
+    return render_template(
+        "admin_slow_queries.html",
+        hero=None,
+        entries=slow_query_log.worst(),
+        threshold_ms=app.config["SLOW_QUERY_MS"],
+        worker_pid=os.getpid(),
+        ist=IST,
+    )
+
+
+@app.route("/admin/import/reports/<report_id>")
+@admin_required
+def admin_import_report(report_id):
+    if not re.fullmatch(r"[0-9a-f]{32}", report_id):
+        flash("Invalid import report.", "danger")
+        return redirect(url_for("admin_dashboard"))
+
+    path = os.path.join(app.config["IMPORT_REPORT_DIR"], f"{report_id}.csv")
+    if not os.path.exists(path):
+        flash("That import report is no longer available.", "warning")
+        return redirect(url_for("admin_dashboard"))
+    return send_file(
+        path,
+        as_attachment=True,
+        download_name="import-errors.csv",
+        mimetype="text/csv",
     )
 
 
@@ -650,283 +1601,305 @@ def admin_delete_registration(reg_id):
         return redirect(url_for("admin_dashboard"))
 
     try:
-        result = db.registrations.delete_one({"_id": object_id})
+        deleted = db.registrations.find_one_and_delete({"_id": object_id})
+        if deleted:
+            bump_registrations_version(db)
     except errors.PyMongoError as exc:
         app.logger.error("Failed to delete registration: %s", exc)
         flash("Could not delete the registration. Please try again.", "danger")
         return redirect(url_for("admin_dashboard"))
 
-    if result.deleted_count:
+    if deleted:
+        record_analytics([option_ids.decode(deleted)], delta=-1)
         flash("Registration removed permanently.", "success")
     else:
         flash("Registration was not found or already removed.", "warning")
     return redirect(url_for("admin_dashboard"))
 
 
-@app.route("/admin/export/excel")
-@admin_required
-def export_excel():
+@app.route("/admin/api/registrations/bulk", methods=["POST"])
+def admin_bulk_registrations():
+    """Delete or reassign many registrations, selected by ids or by filter.
+
+    Payload: ``{"action": "delete" | "reassign", "ids": [...]}`` or
+    ``{"action": ..., "filter": {"search": ..., "college": ...}}``, with
+    ``"set": {"college": ..., "course": ...}`` for reassignments and
+    ``"dry_run": true`` to only count the matching registrations.
+    """
+    if not session.get("admin_authenticated"):
+        return jsonify({"error": "Authentication required"}), 401
+
+    db = get_db()
+    if db is None:
+        return jsonify({"error": "Database unavailable"}), 503
+
+    payload = request.get_json(silent=True) or {}
+    action = payload.get("action")
+    if action not in bulk_ops.BULK_ACTIONS:
+        return jsonify({"error": "Unknown bulk action"}), 400
+
+    ids = payload.get("ids")
+    filters = payload.get("filter") or {}
+    if ids:
+        if not isinstance(ids, list):
+            return jsonify({"error": "ids must be a list"}), 400
+        try:
+            query = {"_id": {"$in": [ObjectId(reg_id) for reg_id in ids]}}
+        except (InvalidId, TypeError):
+            return jsonify({"error": "Invalid registration identifier"}), 400
+    else:
+        search_query = str(filters.get("search", "")).strip()
+        college_filter = str(filters.get("college", "")).strip()
+        if not (search_query or college_filter):
+            # Never let an empty selection turn into "every registration".
+            return jsonify({"error": "Provide ids or a search/college filter"}), 400
+        query = build_registration_query(search_query, college_filter)
+
+    changes = {}
+    if action == "reassign":
+        colleges, courses = get_form_options()
+        allowed = {"college": colleges, "course": courses}
+        for field, value in (payload.get("set") or {}).items():
+            value = str(value).strip()
+            if field not in bulk_ops.REASSIGNABLE_FIELDS or value not in allowed[field]:
+                return jsonify({"error": f"Invalid {field} value"}), 400
+            changes[field] = value
+        if not changes:
+            return jsonify({"error": "Nothing to reassign"}), 400
+
+    if payload.get("dry_run"):
+        return jsonify(
+            {
+                "action": action,
+                "dry_run": True,
+                "matched": db.registrations.count_documents(
+                    bulk_ops.affected_query(query, action, changes, option_ids)
+                ),
+            }
+        )
+
+    try:
+        report = bulk_ops.run(
+            db,
+            query,
+            action,
+            changes,
+            batch_size=app.config["BULK_BATCH_SIZE"],
+            option_ids=option_ids,
+            compact=app.config["COMPACT_REGISTRATIONS"],
+        )
+    except errors.PyMongoError as exc:
+        app.logger.error("Bulk %s failed: %s", action, exc)
+        return jsonify({"error": "Bulk operation failed"}), 500
+    finally:
+        bump_registrations_version(db, updated=action == "reassign")
+
+    return jsonify(report)
+
+
+def export_rows(registrations):
+    """Flatten registration documents into rows for the export builders."""
+    return [
+        {
+            "Name": reg.get("name"),
+            "College": reg.get("college"),
+            "Course": reg.get("course"),
+            "Role": reg.get("role") or reg.get("category", ""),
+            "Phone": format_phone(reg.get("phone")),
+            "Email": reg.get("email"),
+            "Registered On": format_timestamp(reg.get("created_at")),
+        }
+        for reg in registrations
+    ]
+
+
+EXPORT_FORMATS = {
+    "excel": (".xlsx", "registrations.xlsx", EXCEL_MIMETYPE, build_excel),
+    "pdf": (".pdf", "registrations.pdf", PDF_MIMETYPE, build_pdf),
+}
+
+
+def serve_export(export_format):
+    """Build (or reuse from the export cache) an export for the current filters."""
+    db = get_db()
+    if db is None:
+        return export_response(export_format, None, None)
+    # The cache key's version is read from the primary and the export query
+    # reuses that causally consistent session, so whichever member serves the
+    # export has applied at least everything the version covers; a lagging
+    # secondary can never put older rows under a newer key.
+    with db.client.start_session(causal_consistency=True) as session:
+        return export_response(export_format, db, session)
+
+
+def export_response(export_format, db, session):
+    suffix, download_name, mimetype, builder = EXPORT_FORMATS[export_format]
     search_query = request.args.get("search", "").strip()
     college_filter = request.args.get("college", "").strip()
+    archived = wants_archive(request.args)
+    if archived:
+        download_name = f"archived-{download_name}"
+
+    cache_key = None
+    if db is not None:
+        try:
+            cache_key = export_cache.make_key(
+                export_format,
+                search_query,
+                college_filter,
+                archived,
+                registrations_data_version(db, session),
+            )
+        except errors.PyMongoError as exc:
+            app.logger.warning("Could not compute export cache key: %s", exc)
+        if cache_key:
+            cached_path = export_cache.get(cache_key, suffix)
+            if cached_path:
+                try:
+                    return send_file(
+                        cached_path,
+                        as_attachment=True,
+                        download_name=download_name,
+                        mimetype=mimetype,
+                        conditional=True,
+                        etag=cache_key,
+                    )
+                except FileNotFoundError:
+                    # Another worker evicted it after get(); build it again.
+                    pass
+
     registrations = fetch_registrations(
         search_query if search_query else None,
-        college_filter if college_filter else None
+        college_filter if college_filter else None,
+        archived=archived,
+        session=session,
     )
     if not registrations:
         flash("No registrations to export.", "warning")
         return redirect(url_for("admin_dashboard"))
 
-    dataframe = pd.DataFrame(
-        [
-            {
-                "Name": reg.get("name"),
-                "College": reg.get("college"),
-                "Course": reg.get("course"),
-                "Role": reg.get("role") or reg.get("category", ""),
-                "Phone": format_phone(reg.get("phone")),
-                "Email": reg.get("email"),
-                "Registered On": format_timestamp(reg.get("created_at")),
-            }
-            for reg in registrations
-        ]
-    )
-    buffer = BytesIO()
-    report_name = "Laksha Kantha Geetha Parayana Registration Sheet"
-    
-    # Determine start row based on whether there are filters
-    has_filters = bool(college_filter or search_query)
-    if has_filters:
-        start_row = 3  # Title (1), Filter (2), Headers (3)
-    else:
-        start_row = 2  # Title (1), Headers (2)
-    
-    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
-        dataframe.to_excel(
-            writer, index=False, sheet_name="Registrations", startrow=start_row
-        )
-        worksheet = writer.sheets["Registrations"]
-
-        # Title row
-        worksheet.merge_cells(
-            start_row=1,
-            start_column=1,
-            end_row=1,
-            end_column=len(dataframe.columns),
-        )
-        title_cell = worksheet.cell(row=1, column=1)
-        title_cell.value = report_name
-        title_cell.font = Font(size=16, bold=True, color="1A237E")
-        title_cell.alignment = Alignment(horizontal="center")
-
-        # Filter row (only if filters exist)
-        if has_filters:
-            worksheet.merge_cells(
-                start_row=2,
-                start_column=1,
-                end_row=2,
-                end_column=len(dataframe.columns),
-            )
-            filter_cell = worksheet.cell(row=2, column=1)
-            filter_parts = []
-            if college_filter:
-                filter_parts.append(f"College: {college_filter}")
-            if search_query:
-                filter_parts.append(f"Search: {search_query}")
-            filter_cell.value = "\n".join(filter_parts)
-            filter_cell.font = Font(size=12, italic=True, color="555555")
-            filter_cell.alignment = Alignment(horizontal="center")
-            header_row = 3
+    data = builder(export_rows(registrations), search_query, college_filter)
+    if cache_key:
+        try:
+            cached_path = export_cache.put(cache_key, suffix, data)
+        except OSError as exc:
+            app.logger.warning("Could not write export cache entry: %s", exc)
         else:
-            header_row = 2
-        header_fill = PatternFill("solid", fgColor="0B0A08")
-        header_font = Font(color="FFFFFF", bold=True)
-        thin_border = Border(
-            left=Side(style="thin", color="CCCCCC"),
-            right=Side(style="thin", color="CCCCCC"),
-            top=Side(style="thin", color="CCCCCC"),
-            bottom=Side(style="thin", color="CCCCCC"),
-        )
-        for col_idx, column in enumerate(dataframe.columns, start=1):
-            cell = worksheet.cell(row=header_row, column=col_idx)
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-            cell.border = thin_border
-
-        for idx, column in enumerate(dataframe.columns, start=1):
-            max_len = len(column)
-            column_series = dataframe[column].astype(str)
-            if not column_series.empty:
-                max_len = max(max_len, column_series.map(len).max())
-            worksheet.column_dimensions[get_column_letter(idx)].width = max_len + 2
-
-        for row in worksheet.iter_rows(
-            min_row=header_row + 1,
-            max_row=worksheet.max_row,
-            min_col=1,
-            max_col=len(dataframe.columns),
-        ):
-            for cell in row:
-                cell.border = thin_border
+            try:
+                return send_file(
+                    cached_path,
+                    as_attachment=True,
+                    download_name=download_name,
+                    mimetype=mimetype,
+                    conditional=True,
+                    etag=cache_key,
+                )
+            except FileNotFoundError:
+                # Already evicted by another worker; send ``data`` as built.
+                pass
 
-    buffer.seek(0)
-    filename = "registrations.xlsx"
     return send_file(
-        buffer,
+        BytesIO(data),
         as_attachment=True,
-        download_name=filename,
-        mimetype=(
-            "application/vnd.openxmlformats-officedocument."
-            "spreadsheetml.sheet"
-        ),
+        download_name=download_name,
+        mimetype=mimetype,
     )
 
 
+@app.route("/admin/export/excel")
+@admin_required
+def export_excel():
+    return serve_export("excel")
+
+
 @app.route("/admin/export/pdf")
 @admin_required
 def export_pdf():
+    return serve_export("pdf")
+
+
+def partition_by_college(registrations):
+    """Group registrations per college, in dropdown order then any extras."""
+    colleges, _ = get_form_options()
+    partitions = {college: [] for college in colleges}
+    for reg in registrations:
+        partitions.setdefault(reg.get("college") or "Unspecified", []).append(reg)
+    return [(college, regs) for college, regs in partitions.items() if regs]
+
+
+@app.route("/admin/export/bundle/<export_format>")
+@admin_required
+def export_bundle(export_format):
+    """Export one file (or sheet) per college, built in parallel."""
+    if export_format not in EXPORT_FORMATS:
+        flash("Unknown export format.", "danger")
+        return redirect(url_for("admin_dashboard"))
+
     search_query = request.args.get("search", "").strip()
-    college_filter = request.args.get("college", "").strip()
+    layout = request.args.get("layout", "zip")
     registrations = fetch_registrations(
-        search_query if search_query else None,
-        college_filter if college_filter else None
+        search_query if search_query else None, archived=wants_archive(request.args)
     )
     if not registrations:
         flash("No registrations to export.", "warning")
         return redirect(url_for("admin_dashboard"))
 
-    pdf = FPDF()
-    pdf.set_auto_page_break(auto=True, margin=15)
-    # Set consistent line width for borders (same on all pages)
-    pdf.set_line_width(0.1)
-    
-    headers = ["Name", "College", "Course", "Role", "Phone", "Email", "Registered On"]
-    col_widths = [32, 45, 25, 25, 28, 40, 35]
-    usable_width = pdf.w - 2 * pdf.l_margin
-    width_scale = usable_width / sum(col_widths)
-    col_widths = [w * width_scale for w in col_widths]
-    
-    line_height = 6
-    header_height = 8
-    header_y = None
-
-    def print_page_header():
-        """Print page header (title, filter info) on every page."""
-        pdf.set_font("Helvetica", "B", 16)
-        pdf.cell(0, 10, "Laksha Kantha Geetha Parayana Registrations", ln=True)
-        pdf.set_font("Helvetica", "", 11)
-        # Filter info on separate line (if exists)
-        if college_filter or search_query:
-            filter_parts = []
-            if college_filter:
-                filter_parts.append(f"College: {college_filter}")
-            if search_query:
-                filter_parts.append(f"Search: {search_query}")
-            pdf.cell(0, 8, "\n".join(filter_parts), ln=True)
-        pdf.ln(6)
-    
-    def print_table_header():
-        """Print table header row on current page."""
-        nonlocal header_y
-        pdf.set_font("Helvetica", "B", 11)
-        pdf.set_fill_color(26, 35, 126)
-        pdf.set_text_color(255, 255, 255)
-        header_y = pdf.get_y()
-        for header, width in zip(headers, col_widths):
-            pdf.cell(width, header_height, header, border=1, align="C", fill=True)
-        pdf.ln()
-        # Reset font and text color for data rows (same as first page)
-        pdf.set_font("Helvetica", size=10)
-        pdf.set_text_color(40, 40, 40)
-
-    def split_text(text, width):
-        """Split text to fit within column width."""
-        lines = pdf.multi_cell(width, line_height, str(text), split_only=True)
-        return lines or [""]
-
-    # First page
-    pdf.add_page()
-    print_page_header()
-    print_table_header()
-
-    pdf.set_font("Helvetica", size=10)
-
-    for index, reg in enumerate(registrations):
-        # Calculate row height first to check if it fits
-        row = [
-            reg.get("name", ""),
-            reg.get("college", ""),
-            reg.get("course", ""),
-            reg.get("role") or reg.get("category", ""),
-            format_phone(reg.get("phone", "")),
-            reg.get("email", ""),
-            format_timestamp(reg.get("created_at")),
-        ]
-        row_lines = [
-            split_text(text, width) for text, width in zip(row, col_widths)
-        ]
-        max_lines = max(len(lines) for lines in row_lines)
-        row_height = max_lines * line_height
-        
-        # Check if we need a new page (leave space for page header and table header)
-        # Page header: 10px (title) + 8px (filter if exists) + 6px (spacing) = ~24px
-        # Table header: 8px
-        # Bottom margin: 15px
-        # Total needed: ~24 + 8 + 15 = 47px minimum, plus row height
-        space_needed = 47 + row_height
-        if pdf.get_y() + space_needed > pdf.h - pdf.b_margin:
-            pdf.add_page()
-            # Reset line width for consistent borders (same as first page)
-            pdf.set_line_width(0.1)
-            print_page_header()
-            print_table_header()
-            # Ensure font is reset for data rows (same style as first page)
-            pdf.set_font("Helvetica", size=10)
-            pdf.set_text_color(40, 40, 40)
-
-        if index % 2 == 0:
-            pdf.set_fill_color(255, 255, 255)
-        else:
-            pdf.set_fill_color(245, 245, 245)
-
-        y_start = pdf.get_y()
-        x_pos = pdf.l_margin
-        for width in col_widths:
-            pdf.set_xy(x_pos, y_start)
-            pdf.cell(width, row_height, "", border=1, fill=True)
-            x_pos += width
-
-        pdf.set_xy(pdf.l_margin, y_start)
-        # Ensure font is set correctly for data (not bold, size 10) - same style on all pages
-        pdf.set_font("Helvetica", size=10)
-        pdf.set_text_color(40, 40, 40)
-        for lines, width in zip(row_lines, col_widths):
-            x = pdf.get_x()
-            y = pdf.get_y()
-            pdf.multi_cell(
-                width,
-                line_height,
-                "\n".join(lines),
-                border=0,
-                align="L",
+    partitions = [
+        (college, export_rows(regs))
+        for college, regs in partition_by_college(registrations)
+    ]
+
+    if export_format == "excel" and layout == "workbook":
+        return send_file(
+            BytesIO(build_workbook(partitions, search_query)),
+            as_attachment=True,
+            download_name="registrations-by-college.xlsx",
+            mimetype=EXCEL_MIMETYPE,
+        )
+
+    suffix, _, _, builder = EXPORT_FORMATS[export_format]
+    taken = set()
+    jobs = [
+        (bundle_filename(college, suffix, taken), rows, search_query, college)
+        for college, rows in partitions
+    ]
+    files = iter_built_exports(builder, jobs, max_workers=app.config["EXPORT_WORKERS"])
+    return Response(
+        stream_zip(files),
+        mimetype="application/zip",
+        headers={
+            "Content-Disposition": (
+                f"attachment; filename=registrations-{export_format}-by-college.zip"
             )
-            pdf.set_xy(x + width, y)
-        pdf.set_xy(pdf.l_margin, y_start + row_height)
+        },
+    )
 
-    pdf_data = pdf.output(dest="S")
-    if isinstance(pdf_data, str):
-        pdf_bytes = pdf_data.encode("latin1")
-    else:
-        pdf_bytes = bytes(pdf_data)
-    buffer = BytesIO(pdf_bytes)
-    buffer.seek(0)
-    return send_file(
-        buffer,
-        as_attachment=True,
-        download_name="registrations.pdf",
-        mimetype="application/pdf",
+
+@app.cli.command("bench-startup")
+@click.option("--runs", default=5, show_default=True, help="Fresh interpreters per mode.")
+def bench_startup_command(runs):
+    """Measure import, warm-up and first-request latency for each template setup."""
+    results = warmup.run_benchmark(app.root_path, runs=runs)
+    for line in warmup.format_results(results):
+        print(line)
+
+
+template_warmup_seconds = 0.0
+templates_warmed = False
+
+
+def warm_templates():
+    global template_warmup_seconds, templates_warmed
+    template_count, template_warmup_seconds = warmup.warm_templates(app)
+    templates_warmed = True
+    app.logger.debug(
+        "Warmed %d templates in %.1f ms", template_count, template_warmup_seconds * 1000
     )
 
 
+if app.config["TEMPLATE_WARMUP"]:
+    warm_templates()
+
+
 if __name__ == "__main__":
     app.run(debug=True,host='0.0.0.0', port=5002)
\ No newline at end of file
@@ -0,0 +1,107 @@
+"""Hot/cold archival of registrations from past events.
+
+``db.registrations`` only needs to hold the current event, yet it keeps every
+sign-up ever made, so its counts, regex searches and exports slow down year by
+year. ``archive`` moves every registration created before an event boundary
+into the ``registrations_archive`` collection, in ``_id``-ordered batches. Each
+batch is upserted into the archive *before* it is deleted from the hot
+collection, so an interrupted run loses nothing and can simply be repeated.
+Optionally a gzip-compressed JSON Lines file (one Extended JSON document per
+line) is written for keeping outside MongoDB. It is exported from the archive
+collection once all batches are done, into a temporary file renamed over the
+target, so a repeated run rewrites it whole rather than appending duplicates.
+
+Archived rows are only read when an admin asks for them (``archive=1`` on the
+registrations API and the exports), with the same filters as the hot data.
+Analytics rollups are left untouched, so past sign-ups still show there.
+"""
+
+import gzip
+import os
+from datetime import datetime, timezone
+
+from bson import json_util
+from pymongo import ReplaceOne
+
+import bulk_ops
+
+ARCHIVE_COLLECTION = "registrations_archive"
+
+
+def parse_boundary(value, tz):
+    """Parse ``YYYY-MM-DD`` (midnight in ``tz``) or an ISO timestamp to UTC.
+
+    Raises ``ValueError`` for anything else.
+    """
+    value = value.strip()
+    try:
+        boundary = datetime.fromisoformat(value)
+    except ValueError as exc:
+        raise ValueError(f"Invalid archive boundary {value!r}; use YYYY-MM-DD.") from exc
+    if boundary.tzinfo is None:
+        boundary = boundary.replace(tzinfo=tz)
+    return boundary.astimezone(timezone.utc)
+
+
+def archive_filename(directory, before):
+    return os.path.join(directory, f"registrations-before-{before:%Y%m%d}.jsonl.gz")
+
+
+def write_jsonl(db, before, path):
+    """Write every archived registration created before ``before`` to ``path``.
+
+    Returns the number of documents written. ``path`` is only replaced once
+    the export is complete.
+    """
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    written = 0
+    try:
+        with gzip.open(temp_path, "wt", encoding="utf-8") as handle:
+            cursor = db[ARCHIVE_COLLECTION].find(
+                {"created_at": {"$lt": before}}, {"archived_at": 0}
+            ).sort("_id", 1)
+            for doc in cursor:
+                handle.write(json_util.dumps(doc, json_options=json_util.RELAXED_JSON_OPTIONS))
+                handle.write("\n")
+                written += 1
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    return written
+
+
+def archive(db, before, batch_size=1000, jsonl_path=None):
+    """Move registrations created before ``before`` into the archive collection.
+
+    Returns ``{"before", "batches", "archived", "file", "exported"}``.
+    """
+    query = {"created_at": {"$lt": before}}
+    archived_at = datetime.now(timezone.utc)
+    report = {
+        "before": before,
+        "batches": 0,
+        "archived": 0,
+        "file": jsonl_path,
+        "exported": 0,
+    }
+    if jsonl_path:
+        os.makedirs(os.path.dirname(jsonl_path) or ".", exist_ok=True)
+
+    for docs in bulk_ops.iter_batches(db, query, batch_size, projection=None):
+        # Upserts keep a rerun after a crash from duplicating archived rows.
+        db[ARCHIVE_COLLECTION].bulk_write(
+            [
+                ReplaceOne({"_id": doc["_id"]}, {**doc, "archived_at": archived_at}, upsert=True)
+                for doc in docs
+            ],
+            ordered=False,
+        )
+        result = db.registrations.delete_many({"_id": {"$in": [doc["_id"] for doc in docs]}})
+        report["batches"] += 1
+        report["archived"] += result.deleted_count
+
+    if jsonl_path:
+        report["exported"] = write_jsonl(db, before, jsonl_path)
+    return report
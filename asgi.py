@@ -0,0 +1,342 @@
+"""ASGI entry point with coroutine versions of the hot endpoints.
+
+``POST /register`` and ``GET /admin/api/registrations`` are served natively on
+the event loop using PyMongo's ``AsyncMongoClient``, so a single process can
+hold many registrations in flight while MongoDB answers; the duplicate phone
+and email lookups (and the count and page query) run concurrently. Every other
+request is handed to the regular Flask app through ``asgiref``'s WSGI adapter,
+so templates, sessions and flashes behave exactly as in the sync app.
+
+Run with an ASGI server, for example::
+
+    uvicorn asgi:application --host 0.0.0.0 --port 5002
+"""
+
+import asyncio
+import io
+import sys
+
+from asgiref.wsgi import WsgiToAsgi
+from flask import flash, jsonify, redirect, render_template, request, session, url_for
+from pymongo import AsyncMongoClient, ReturnDocument, errors
+from werkzeug.exceptions import HTTPException
+
+import analytics
+import app as site
+import idempotency
+from data import hero_story
+
+flask_app = site.app
+wsgi_fallback = WsgiToAsgi(flask_app)
+
+_async_client = None
+_async_db = None
+
+
+async def get_async_db():
+    """Return the async MongoDB database handle or None if unavailable."""
+    global _async_client, _async_db
+    if _async_db is not None:
+        return _async_db
+
+    try:
+        _async_client = AsyncMongoClient(
+            flask_app.config["MONGO_URI"],
+            serverSelectionTimeoutMS=3000,
+            maxPoolSize=flask_app.config["MONGO_MAX_POOL_SIZE"],
+            minPoolSize=flask_app.config["MONGO_MIN_POOL_SIZE"],
+            compressors=flask_app.config["MONGO_COMPRESSORS"] or None,
+            event_listeners=[site.slow_query_log],
+        )
+        await _async_client.admin.command("ping")
+        _async_db = _async_client[flask_app.config["MONGO_DB_NAME"]]
+    except errors.PyMongoError as exc:
+        flask_app.logger.error("Async MongoDB connection failed: %s", exc)
+        _async_db = None
+
+    return _async_db
+
+
+async def close_async_db():
+    global _async_client, _async_db
+    if _async_client is not None:
+        await _async_client.close()
+    _async_client = None
+    _async_db = None
+
+
+async def _none():
+    return None
+
+
+async def register_post():
+    """Coroutine twin of the POST branch of ``app.register``."""
+    db = await get_async_db()
+    options_doc = (
+        await db.meta.find_one({"_id": "form_options"}, site.FORM_OPTIONS_PROJECTION)
+        if db is not None
+        else None
+    )
+    colleges, courses = site.form_options_from_doc(options_doc)
+
+    def render_form(**extra):
+        return render_template(
+            "register.html", hero=hero_story, colleges=colleges, courses=courses, **extra
+        )
+
+    token = site.form_submission_token(request.form)
+    form_data, errors_list = site.validate_registration(request.form)
+    fingerprint = idempotency.form_fingerprint(form_data)
+    outcome = site.submission_tokens.cached(token, fingerprint) if token else None
+    if outcome is not None:
+        return site.replay_submission(outcome, colleges, courses)
+    if errors_list:
+        for issue in errors_list:
+            flash(issue, "danger")
+        return render_form()
+
+    if db is None:
+        site.db_unavailable_message()
+        return render_form(), 503
+
+    tokens = site.submission_tokens
+    if token:
+        outcome = await tokens.claim_async(db, token, fingerprint)
+        if outcome is not None:
+            return site.replay_submission(outcome, colleges, courses)
+
+    try:
+        phone_query, email_query = site.duplicate_queries(form_data)
+        duplicate_phone, duplicate_email = await asyncio.gather(
+            db.registrations.find_one(phone_query),
+            db.registrations.find_one(email_query) if email_query else _none(),
+        )
+        duplicate_messages = site.duplicate_messages_for(duplicate_phone, duplicate_email)
+        if not duplicate_messages:
+            # Encoding may allocate or look up option ids through the sync
+            # client, so it runs off the event loop.
+            stored = await asyncio.to_thread(site.stored_registration, form_data)
+            await db.registrations.insert_one(stored)
+    except errors.PyMongoError:
+        if token:
+            await tokens.release_async(db, token)
+        raise
+
+    async def complete(outcome):
+        try:
+            await tokens.complete_async(db, token, fingerprint, outcome)
+        except errors.PyMongoError as exc:
+            flask_app.logger.warning("Failed to record submission outcome: %s", exc)
+
+    if duplicate_messages:
+        if token:
+            await complete({"status": "duplicate", "messages": duplicate_messages})
+        for msg in duplicate_messages:
+            flash(msg, "warning")
+        return render_form(registration_duplicate=True)
+
+    if token:
+        await complete({"status": "success"})
+    site.search_cache.invalidate()
+    try:
+        state, _ = await asyncio.gather(
+            db.meta.find_one_and_update(
+                {"_id": site.REGISTRATIONS_STATE_ID},
+                {"$inc": {"version": 1}},
+                projection={"version": 1},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            ),
+            db[analytics.ROLLUP_COLLECTION].bulk_write(
+                analytics.rollup_updates([form_data]), ordered=False
+            ),
+        )
+        site.search_cache.observe_version(state["version"])
+    except errors.PyMongoError as exc:
+        flask_app.logger.warning("Failed to update registration bookkeeping: %s", exc)
+
+    session["registration_success"] = True
+    flash("Jai Sri Krishna! Your registration is confirmed.", "success")
+    return redirect(url_for("register"))
+
+
+def serialize_all(entries):
+    return [site.serialize_registration(entry) for entry in entries]
+
+
+async def admin_api_registrations():
+    """Coroutine twin of ``app.admin_api_registrations``."""
+    if not session.get("admin_authenticated"):
+        return jsonify({"error": "Authentication required"}), 401
+
+    db = await get_async_db()
+    if db is None:
+        return jsonify({"error": "Database unavailable"}), 503
+    read_db = db.with_options(
+        read_preference=site.admin_read_preference(),
+        read_concern=site.admin_read_concern(),
+    )
+
+    page, limit, search_query, college_filter = site.registration_page_params(request.args)
+    archived = site.wants_archive(request.args)
+    collection = site.registrations_collection(read_db, archived)
+    skip = (page - 1) * limit
+
+    cache = site.search_cache
+    if cache.needs_revalidation():
+        state = await db.meta.find_one({"_id": site.REGISTRATIONS_STATE_ID}, {"version": 1})
+        cache.observe_version((state or {}).get("version", 0))
+
+    model = None
+    if not archived:
+        model = site.active_read_model(cache.version or 0, catch_up=False)
+    if model is not None:
+        # No inline catch-up here: it would block the event loop on PyMongo.
+        # Model rows already carry names, so serializing never reaches MongoDB.
+        total_count, entries = model.query(
+            search_query, college_filter, skip=skip, limit=limit, catch_up=False
+        )
+        registrations = [site.serialize_registration(entry) for entry in entries]
+        return jsonify(site.registration_page(registrations, total_count, page, limit))
+
+    # Translating names to compact ids may refresh the id tables through the
+    # sync client, so it runs off the event loop (as does decoding below).
+    query = await asyncio.to_thread(
+        site.build_registration_query, search_query, college_filter
+    )
+    generation = cache.generation
+    count_key, page_key = site.search_cache_keys(
+        search_query, college_filter, page, limit, archived
+    )
+    total_count = cache.get(count_key)
+    registrations = cache.get(page_key)
+    if total_count is not None and registrations is not None:
+        return jsonify(site.registration_page(registrations, total_count, page, limit))
+
+    # Same rule as ``app.admin_api_registrations``: secondary results are
+    # cached only if that member has applied the version this process has
+    # seen. A session serves one operation at a time, so the reads run in turn.
+    async with db.client.start_session(causal_consistency=True) as read_session:
+        state = await read_db.meta.find_one(
+            {"_id": site.REGISTRATIONS_STATE_ID}, {"version": 1}, session=read_session
+        )
+        cacheable = (state or {}).get("version", 0) >= (cache.version or 0)
+        if total_count is None:
+            total_count = await collection.count_documents(query, session=read_session)
+            if cacheable:
+                cache.put(count_key, total_count, generation)
+        if registrations is None:
+            entries = await (
+                collection.find(query, session=read_session)
+                .sort("created_at", 1)
+                .skip(skip)
+                .limit(limit)
+                .to_list()
+            )
+            registrations = await asyncio.to_thread(serialize_all, entries)
+            if cacheable:
+                cache.put(page_key, registrations, generation)
+    return jsonify(site.registration_page(registrations, total_count, page, limit))
+
+
+ASYNC_ROUTES = {
+    ("POST", "/register"): register_post,
+    ("GET", "/admin/api/registrations"): admin_api_registrations,
+}
+
+
+def build_environ(scope, body):
+    """Translate an ASGI HTTP scope into a WSGI environ for Flask's request context."""
+    server_name, server_port = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf8").decode("latin1"),
+        "PATH_INFO": scope["path"].encode("utf8").decode("latin1"),
+        "QUERY_STRING": scope["query_string"].decode("ascii"),
+        "SERVER_NAME": server_name,
+        "SERVER_PORT": str(server_port),
+        "SERVER_PROTOCOL": f"HTTP/{scope['http_version']}",
+        "REMOTE_ADDR": (scope.get("client") or ("127.0.0.1", 0))[0],
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for raw_name, raw_value in scope["headers"]:
+        name = raw_name.decode("latin1").upper().replace("-", "_")
+        value = raw_value.decode("latin1")
+        if name == "CONTENT_TYPE":
+            environ["CONTENT_TYPE"] = value
+        # The body is already buffered, so CONTENT_LENGTH was set from it.
+        elif name not in ("CONTENT_LENGTH", "TRANSFER_ENCODING"):
+            key = f"HTTP_{name}"
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def read_body(receive):
+    body = bytearray()
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            break
+        body.extend(message.get("body", b""))
+        if not message.get("more_body"):
+            break
+    return bytes(body)
+
+
+async def handle_async_route(handler, scope, receive, send):
+    environ = build_environ(scope, await read_body(receive))
+    with flask_app.request_context(environ):
+        try:
+            response = flask_app.make_response(await handler())
+        except HTTPException as exc:  # abort(), bad form data: their own status
+            response = flask_app.make_response(flask_app.handle_http_exception(exc))
+        except Exception as exc:  # mirror Flask: log and answer 500
+            response = flask_app.make_response(flask_app.handle_exception(exc))
+        # Runs after_request hooks and persists the (signed cookie) session.
+        response = flask_app.process_response(response)
+        body = response.get_data()
+
+    await send(
+        {
+            "type": "http.response.start",
+            "status": response.status_code,
+            "headers": [
+                (name.lower().encode("latin1"), value.encode("latin1"))
+                for name, value in response.headers.items()
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await get_async_db()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await close_async_db()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+
+    if scope["type"] == "http":
+        handler = ASYNC_ROUTES.get((scope["method"], scope["path"]))
+        if handler is not None:
+            await handle_async_route(handler, scope, receive, send)
+            return
+
+    await wsgi_fallback(scope, receive, send)
@@ -0,0 +1,563 @@
+"""Build step for the site's stylesheets and scripts.
+
+``flask build-assets`` writes everything under ``static/dist/``:
+
+* ``site.min.css``: ``styles.css`` and ``modern-styles.css`` concatenated,
+  with rules whose classes or ids never appear in the templates, scripts or
+  ``data.py`` dropped, then minified.
+* ``critical/<endpoint>.css``: the subset of those rules needed to paint the
+  page shell (``base.html``) and the first section of each page. ``base.html``
+  inlines it and loads ``site.min.css`` without blocking render.
+* ``js/<name>.min.js``: every script under ``static/js/`` with comments and
+  indentation stripped. Line breaks are kept so automatic semicolon insertion
+  never changes meaning.
+* ``manifest.json``: the source-to-built mapping and the size report.
+
+Purging is deliberately conservative: a class is "used" if its name appears as
+a word anywhere in the sources, and a word ending in ``-`` right before
+``{{``, ``${`` or a closing quote (``'btn-' + kind``) keeps every class with
+that prefix.
+"""
+
+import gzip
+import json
+import os
+import posixpath
+import re
+from datetime import datetime, timezone
+
+from freeze import CSS_URL_PATTERN
+
+DIST_DIR = "dist"
+CSS_SOURCES = ["css/styles.css", "css/modern-styles.css"]
+CSS_BUNDLE = "dist/site.min.css"
+TOKEN_SOURCES = ["data.py", "app.py"]
+
+# Endpoint -> template rendered for it; used to pick each page's critical rules.
+PAGE_TEMPLATES = {
+    "home": "home.html",
+    "about": "about.html",
+    "gallery": "gallery.html",
+    "gallery_more": "gallery.html",
+    "register": "register.html",
+    "admin_login": "admin_login.html",
+    "admin_dashboard": "admin_dashboard.html",
+    "admin_slow_queries": "admin_slow_queries.html",
+}
+CRITICAL_FALLBACK_BYTES = 4000
+
+# At-rules whose body is a list of ordinary rules that can be purged.
+GROUPING_AT_RULES = ("@media", "@supports", "@container", "@layer")
+
+WORD_PATTERN = re.compile(r"[A-Za-z_][\w-]*")
+DYNAMIC_PREFIX_PATTERN = re.compile(r"([A-Za-z_][\w-]*-)(?=\{\{|\$\{|['\"`])")
+SELECTOR_TOKEN_PATTERN = re.compile(r"[.#](-?[A-Za-z_][\w-]*)")
+KEYFRAMES_PATTERN = re.compile(r"@(?:-\w+-)?keyframes\s+([\w-]+)")
+
+
+# -- source scanning -----------------------------------------------------------
+
+
+def collect_used_tokens(sources):
+    """Return ``(words, prefixes)`` found in the given source texts."""
+    words = set()
+    prefixes = set()
+    for text in sources:
+        words.update(WORD_PATTERN.findall(text))
+        prefixes.update(DYNAMIC_PREFIX_PATTERN.findall(text))
+    return words, prefixes
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as handle:
+        return handle.read()
+
+
+def first_section(template_text):
+    """Return the part of a page template that renders above the fold."""
+    match = re.search(r"</section>", template_text)
+    if match:
+        return template_text[: match.end()]
+    return template_text[:CRITICAL_FALLBACK_BYTES]
+
+
+# -- CSS -----------------------------------------------------------------------
+
+
+def _skip_string(text, index):
+    """Return the index just past the string literal starting at ``index``."""
+    quote = text[index]
+    index += 1
+    while index < len(text) and text[index] != quote:
+        index += 2 if text[index] == "\\" else 1
+    return index + 1
+
+
+def strip_css_comments(css):
+    out = []
+    index = 0
+    while index < len(css):
+        char = css[index]
+        if char in "'\"":
+            end = _skip_string(css, index)
+            out.append(css[index:end])
+            index = end
+        elif css.startswith("/*", index):
+            end = css.find("*/", index + 2)
+            index = len(css) if end == -1 else end + 2
+        else:
+            out.append(char)
+            index += 1
+    return "".join(out)
+
+
+def _matching_brace(css, index):
+    """Return the index of the ``}`` closing the ``{`` at ``index``."""
+    depth = 0
+    while index < len(css):
+        char = css[index]
+        if char in "'\"":
+            index = _skip_string(css, index)
+            continue
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return index
+        index += 1
+    return len(css)
+
+
+def parse_css(css):
+    """Parse comment-free CSS into a list of nodes.
+
+    Nodes are ``("rule", selector, body)``, ``("group", prelude, children)``
+    for ``@media`` and friends, and ``("raw", text, None)`` for any other
+    at-rule, which is kept verbatim.
+    """
+    nodes = []
+    index = 0
+    while index < len(css):
+        start = index
+        while index < len(css) and css[index] not in "{;}":
+            index = _skip_string(css, index) if css[index] in "'\"" else index + 1
+        prelude = css[start:index].strip()
+        if index >= len(css):
+            break
+        if css[index] in ";}":
+            if prelude.startswith("@"):
+                nodes.append(("raw", prelude + ";", None))
+            index += 1
+            continue
+
+        end = _matching_brace(css, index)
+        body = css[index + 1 : end]
+        if prelude.lower().startswith(GROUPING_AT_RULES):
+            nodes.append(("group", prelude, parse_css(body)))
+        elif prelude.startswith("@"):
+            nodes.append(("raw", prelude + "{" + body + "}", None))
+        else:
+            nodes.append(("rule", prelude, body))
+        index = end + 1
+    return nodes
+
+
+def split_top_level(text, separator):
+    """Split on ``separator`` outside brackets, parentheses and strings."""
+    parts = []
+    depth = 0
+    start = 0
+    index = 0
+    while index < len(text):
+        char = text[index]
+        if char in "'\"":
+            index = _skip_string(text, index)
+            continue
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:index])
+            start = index + 1
+        index += 1
+    parts.append(text[start:])
+    return parts
+
+
+def selector_tokens(selector):
+    """Return the class and id names a selector needs in order to match."""
+    # Anything inside :not(), :is(), [attr=...] and friends is optional or
+    # not a class reference at all, so only the outer compound counts.
+    outer = []
+    depth = 0
+    for char in selector:
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        elif depth == 0:
+            outer.append(char)
+    return SELECTOR_TOKEN_PATTERN.findall("".join(outer))
+
+
+def _token_used(token, words, prefixes):
+    return token in words or any(token.startswith(prefix) for prefix in prefixes)
+
+
+def purge(nodes, words, prefixes):
+    """Drop selectors (and then rules) that reference unused classes or ids."""
+    kept = []
+    for kind, prelude, body in nodes:
+        if kind == "group":
+            children = purge(body, words, prefixes)
+            if children:
+                kept.append((kind, prelude, children))
+        elif kind == "rule":
+            selectors = [
+                selector
+                for selector in split_top_level(prelude, ",")
+                if all(
+                    _token_used(token, words, prefixes)
+                    for token in selector_tokens(selector)
+                )
+            ]
+            if selectors:
+                kept.append((kind, ",".join(selectors), body))
+        else:
+            kept.append((kind, prelude, body))
+    return _drop_unused_keyframes(kept)
+
+
+def _declarations_text(nodes):
+    parts = []
+    for kind, prelude, body in nodes:
+        if kind == "group":
+            parts.append(_declarations_text(body))
+        elif kind == "rule":
+            parts.append(body)
+    return " ".join(parts)
+
+
+def _drop_unused_keyframes(nodes):
+    used = set(WORD_PATTERN.findall(_declarations_text(nodes)))
+    kept = []
+    for node in nodes:
+        match = KEYFRAMES_PATTERN.match(node[1]) if node[0] == "raw" else None
+        if match and match.group(1) not in used:
+            continue
+        kept.append(node)
+    return kept
+
+
+def _collapse_whitespace(text):
+    """Collapse whitespace runs to one space, leaving strings untouched."""
+    out = []
+    index = 0
+    while index < len(text):
+        char = text[index]
+        if char in "'\"":
+            end = _skip_string(text, index)
+            out.append(text[index:end])
+            index = end
+        elif char.isspace():
+            while index < len(text) and text[index].isspace():
+                index += 1
+            out.append(" ")
+        else:
+            out.append(char)
+            index += 1
+    return "".join(out).strip()
+
+
+def minify_selector(selector):
+    selector = _collapse_whitespace(selector)
+    return re.sub(r"\s*([>+~,])\s*", r"\1", selector)
+
+
+def minify_declarations(body):
+    declarations = []
+    for declaration in split_top_level(body, ";"):
+        declaration = _collapse_whitespace(declaration)
+        if not declaration:
+            continue
+        name, colon, value = declaration.partition(":")
+        if not colon:
+            continue
+        # Spaces after commas are never significant; spaces around +/- are
+        # (inside calc()), so they are left alone.
+        value = re.sub(r"\s*,\s*", ",", value.strip())
+        value = re.sub(r"\s*!\s*important", "!important", value)
+        declarations.append(f"{name.strip()}:{value}")
+    return ";".join(declarations)
+
+
+def serialize_css(nodes):
+    """Render parsed nodes back into minified CSS."""
+    out = []
+    for kind, prelude, body in nodes:
+        if kind == "group":
+            out.append(f"{_collapse_whitespace(prelude)}{{{serialize_css(body)}}}")
+        elif kind == "rule":
+            declarations = minify_declarations(body)
+            if declarations:
+                out.append(f"{minify_selector(prelude)}{{{declarations}}}")
+        else:
+            out.append(_minify_raw(prelude))
+    return "".join(out)
+
+
+def _minify_raw(text):
+    if "{" not in text:
+        return _collapse_whitespace(text)
+    head, _, rest = text.partition("{")
+    inner = rest[: rest.rfind("}")]
+    if KEYFRAMES_PATTERN.match(head):
+        return f"{_collapse_whitespace(head)}{{{serialize_css(parse_css(inner))}}}"
+    return f"{_collapse_whitespace(head)}{{{minify_declarations(inner)}}}"
+
+
+def rebase_urls(css, source_path, target):
+    """Rewrite relative ``url()`` references for CSS that moves elsewhere.
+
+    ``target`` is either the directory (relative to ``static/``) the CSS is
+    written to, or a URL prefix ending in ``/`` for CSS inlined into pages.
+    """
+    base_dir = posixpath.dirname(source_path)
+
+    def replace(match):
+        quote, ref = match.groups()
+        if ref.startswith(("data:", "http:", "https:", "//", "#", "/")):
+            return match.group(0)
+        resolved = posixpath.normpath(posixpath.join(base_dir, ref))
+        if target.endswith("/"):
+            new_ref = target + resolved
+        else:
+            new_ref = posixpath.relpath(resolved, target)
+        return f"url({quote}{new_ref}{quote})"
+
+    return CSS_URL_PATTERN.sub(replace, css)
+
+
+# -- JavaScript ----------------------------------------------------------------
+
+REGEX_PRECEDERS = set("(,=:[!&|?{};+-*%<>~^")
+REGEX_KEYWORDS = ("return", "typeof", "case", "do", "else", "in", "of", "void", "yield")
+
+
+def _regex_allowed(out):
+    code = "".join(out[-16:]).rstrip(" \t")
+    if not code or code.endswith("\n"):
+        return True
+    if code[-1] in REGEX_PRECEDERS:
+        return True
+    return any(re.search(rf"\b{word}$", code) for word in REGEX_KEYWORDS)
+
+
+def _skip_regex(text, index):
+    in_class = False
+    index += 1
+    while index < len(text) and text[index] != "\n":
+        char = text[index]
+        if char == "\\":
+            index += 2
+            continue
+        if char == "[":
+            in_class = True
+        elif char == "]":
+            in_class = False
+        elif char == "/" and not in_class:
+            index += 1
+            while index < len(text) and (text[index].isalnum() or text[index] == "_"):
+                index += 1
+            return index
+        index += 1
+    return index
+
+
+def minify_js(source):
+    """Strip comments and indentation from a script, keeping line breaks."""
+    out = []
+    index = 0
+    # Each entry is the brace depth at which a ``${`` substitution resumes
+    # its enclosing template literal.
+    template_stack = []
+    depth = 0
+    length = len(source)
+
+    def read_template(start):
+        position = start
+        while position < length:
+            char = source[position]
+            if char == "\\":
+                position += 2
+                continue
+            if char == "`":
+                return position + 1, False
+            if source.startswith("${", position):
+                return position + 2, True
+            position += 1
+        return length, False
+
+    while index < length:
+        char = source[index]
+        if char in "'\"":
+            end = _skip_string(source, index)
+            out.append(source[index:end])
+            index = end
+        elif char == "`":
+            end, substitution = read_template(index + 1)
+            out.append(source[index:end])
+            index = end
+            if substitution:
+                template_stack.append(depth)
+        elif char == "}" and template_stack and template_stack[-1] == depth:
+            template_stack.pop()
+            end, substitution = read_template(index + 1)
+            out.append(source[index:end])
+            index = end
+            if substitution:
+                template_stack.append(depth)
+        elif source.startswith("//", index):
+            while index < length and source[index] != "\n":
+                index += 1
+        elif source.startswith("/*", index):
+            end = source.find("*/", index + 2)
+            end = length if end == -1 else end + 2
+            out.append("\n" if "\n" in source[index:end] else " ")
+            index = end
+        elif char == "/" and _regex_allowed(out):
+            end = _skip_regex(source, index)
+            out.append(source[index:end])
+            index = end
+        elif char.isspace():
+            start = index
+            while index < length and source[index].isspace():
+                index += 1
+            run = source[start:index]
+            if "\n" in run:
+                while out and out[-1] in (" ", "\n"):
+                    if out.pop() == "\n":
+                        break
+                out.append("\n")
+            elif out and out[-1] not in (" ", "\n"):
+                out.append(" ")
+        else:
+            if char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+            out.append(char)
+            index += 1
+
+    return "".join(out).strip() + "\n"
+
+
+# -- build ---------------------------------------------------------------------
+
+
+def _sizes(data):
+    return {"bytes": len(data), "gzip": len(gzip.compress(data, compresslevel=9))}
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    data = text.encode("utf-8")
+    with open(path, "wb") as handle:
+        handle.write(data)
+    return data
+
+
+def build_assets(static_folder, template_folder, static_url_path="/static", extra_sources=()):
+    """Build the purged and minified assets; return the build manifest."""
+    templates = {
+        name: _read(os.path.join(template_folder, name))
+        for name in sorted(os.listdir(template_folder))
+        if name.endswith(".html")
+    }
+    js_dir = os.path.join(static_folder, "js")
+    scripts = {
+        f"js/{name}": _read(os.path.join(js_dir, name))
+        for name in sorted(os.listdir(js_dir))
+        if name.endswith(".js") and not name.endswith(".min.js")
+    }
+    sources = list(templates.values()) + list(scripts.values())
+    sources += [_read(path) for path in extra_sources if os.path.exists(path)]
+    words, prefixes = collect_used_tokens(sources)
+
+    report = []
+    files = {}
+    dist = os.path.join(static_folder, DIST_DIR)
+
+    # Stylesheets: concatenate, purge, minify.
+    original_css = b""
+    nodes = []
+    for source_path in CSS_SOURCES:
+        raw = _read(os.path.join(static_folder, *source_path.split("/")))
+        original_css += raw.encode("utf-8")
+        css = rebase_urls(strip_css_comments(raw), source_path, DIST_DIR)
+        nodes.extend(parse_css(css))
+    purged = purge(nodes, words, prefixes)
+    bundle = _write(os.path.join(static_folder, *CSS_BUNDLE.split("/")), serialize_css(purged))
+    report.append({"file": CSS_BUNDLE, "sources": CSS_SOURCES,
+                   "before": _sizes(original_css), "after": _sizes(bundle)})
+
+    # Critical CSS per page: rules matching the shell plus the first section.
+    shell = templates.get("base.html", "")
+    prefix = static_url_path.rstrip("/") + "/"
+    critical = {}
+    for endpoint, template_name in PAGE_TEMPLATES.items():
+        if template_name not in templates:
+            continue
+        page_words, page_prefixes = collect_used_tokens(
+            [shell, first_section(templates[template_name])]
+        )
+        css = serialize_css(purge(purged, page_words, page_prefixes))
+        css = rebase_urls(css, CSS_BUNDLE, prefix)
+        path = f"{DIST_DIR}/critical/{endpoint}.css"
+        data = _write(os.path.join(static_folder, *path.split("/")), css)
+        critical[endpoint] = path
+        report.append({"file": path, "sources": [template_name], "before": None,
+                       "after": _sizes(data)})
+
+    # Scripts.
+    for logical, source in scripts.items():
+        built = f"{DIST_DIR}/{logical[:-3]}.min.js"
+        data = _write(os.path.join(static_folder, *built.split("/")), minify_js(source))
+        files[logical] = built
+        report.append({"file": built, "sources": [logical],
+                       "before": _sizes(source.encode("utf-8")), "after": _sizes(data)})
+
+    manifest = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "css_bundle": CSS_BUNDLE,
+        "css_sources": CSS_SOURCES,
+        "critical": critical,
+        "files": files,
+        "report": report,
+    }
+    with open(os.path.join(dist, "manifest.json"), "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(static_folder):
+    """Return the last build manifest, or None if assets were never built."""
+    path = os.path.join(static_folder, DIST_DIR, "manifest.json")
+    try:
+        with open(path, encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def format_report(report):
+    """Render the size report as aligned text lines."""
+    def size(entry):
+        return f"{entry['bytes']:>8,} B ({entry['gzip']:>7,} B gz)" if entry else " " * 26
+
+    lines = [f"{'file':<40} {'before':>26}  {'after':>26}"]
+    for row in report:
+        lines.append(f"{row['file']:<40} {size(row['before'])}  {size(row['after'])}")
+    return lines
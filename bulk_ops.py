@@ -0,0 +1,136 @@
+"""Batched admin operations over many registrations at once.
+
+Matching documents are walked in ``_id`` order, one batch at a time, and each
+batch is applied with a single unordered ``bulk_write``. Walking by ``_id``
+keeps the iteration stable even when the operation itself moves documents out
+of the filter (for example reassigning away from the filtered college).
+"""
+
+from pymongo import DeleteOne, UpdateOne, errors
+
+import analytics
+
+BULK_ACTIONS = ("delete", "reassign")
+REASSIGNABLE_FIELDS = ("college", "course")
+
+# Only what analytics needs; the full documents never leave the server.
+BATCH_PROJECTION = {
+    "college": 1,
+    "course": 1,
+    "college_id": 1,
+    "course_id": 1,
+    "role": 1,
+    "category": 1,
+    "created_at": 1,
+}
+
+
+def iter_batches(db, query, batch_size, projection=BATCH_PROJECTION):
+    """Yield lists of matching registration documents, ``batch_size`` at a time.
+
+    Pass ``projection=None`` for whole documents.
+    """
+    last_id = None
+    while True:
+        batch_query = query
+        if last_id is not None:
+            batch_query = {"$and": [query, {"_id": {"$gt": last_id}}]}
+        batch = list(
+            db.registrations.find(batch_query, projection)
+            .sort("_id", 1)
+            .limit(batch_size)
+        )
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1]["_id"]
+
+
+def affected_query(query, action, changes=None, option_ids=None):
+    """Narrow ``query`` to the documents ``run`` would actually write.
+
+    Reassignments skip documents that already carry every target value, in
+    either the legacy or the compact form.
+    """
+    if action != "reassign" or not changes:
+        return query
+    current = [
+        option_ids.match(field, value) if option_ids else {field: value}
+        for field, value in changes.items()
+    ]
+    return {"$and": [query, {"$nor": [{"$and": current}]}]}
+
+
+def _batch_operations(action, docs, update):
+    if action == "delete":
+        return [DeleteOne({"_id": doc["_id"]}) for doc in docs]
+    return [UpdateOne({"_id": doc["_id"]}, update) for doc in docs]
+
+
+def run(db, query, action, changes=None, batch_size=500, option_ids=None, compact=False):
+    """Apply ``action`` to every registration matching ``query``.
+
+    Returns a report with one entry per batch plus overall totals. Analytics
+    rollups are adjusted batch by batch. When a batch writes fewer documents
+    than it sent (another admin deleted or changed some first), which ones is
+    unknown, so the rollups are rebuilt once at the end instead
+    (``analytics_rebuilt`` in the report). With ``option_ids`` (see ``compact.py``) documents are
+    decoded before use, and reassignments are written in the compact form
+    when ``compact`` is set.
+    """
+    changes = changes or {}
+    update = option_ids.update_for(changes, compact) if option_ids else {"$set": changes}
+    report = {"action": action, "batches": [], "matched": 0, "deleted": 0, "modified": 0}
+    rebuild_analytics = False
+
+    for index, docs in enumerate(iter_batches(db, query, batch_size), start=1):
+        if option_ids is not None:
+            docs = [option_ids.decode(doc) for doc in docs]
+        if action == "reassign":
+            # Skip documents that already carry the target values.
+            docs = [
+                doc for doc in docs
+                if any(doc.get(field) != value for field, value in changes.items())
+            ]
+        entry = {"batch": index, "matched": len(docs), "deleted": 0, "modified": 0}
+        report["matched"] += len(docs)
+        if not docs:
+            report["batches"].append(entry)
+            continue
+
+        try:
+            result = db.registrations.bulk_write(
+                _batch_operations(action, docs, update), ordered=False
+            )
+        except errors.BulkWriteError as exc:
+            details = exc.details
+            entry["deleted"] = details.get("nRemoved", 0)
+            entry["modified"] = details.get("nModified", 0)
+            entry["errors"] = [error.get("errmsg") for error in details.get("writeErrors", [])]
+            failed = {docs[error["index"]]["_id"] for error in details.get("writeErrors", [])}
+            docs = [doc for doc in docs if doc["_id"] not in failed]
+        else:
+            entry["deleted"] = result.deleted_count
+            entry["modified"] = result.modified_count
+
+        written = entry["deleted"] if action == "delete" else entry["modified"]
+        if written != len(docs):
+            rebuild_analytics = True
+        elif not rebuild_analytics:
+            analytics.record(db, docs, delta=-1)
+            if action == "reassign":
+                analytics.record(db, [{**doc, **changes} for doc in docs])
+
+        report["deleted"] += entry["deleted"]
+        report["modified"] += entry["modified"]
+        report["batches"].append(entry)
+
+    if rebuild_analytics:
+        try:
+            analytics.rebuild(db, option_ids)
+        except errors.PyMongoError as exc:
+            # The writes stand; ``flask rebuild-analytics`` can be rerun later.
+            report["analytics_error"] = str(exc)
+            rebuild_analytics = False
+    report["analytics_rebuilt"] = rebuild_analytics
+    return report
@@ -0,0 +1,198 @@
+"""Compact registration documents: colleges and courses stored by id.
+
+Every registration used to repeat the full college name (some are over 40
+characters) and course. In compact mode they are written as small integers,
+``college_id`` and ``course_id``, and turned back into names on read through
+an in-process lookup table, so documents, the working set and export reads
+all shrink.
+
+The ids live in the ``meta.form_options`` document next to the dropdown
+lists, as append-only ``college_ids``/``course_ids`` arrays of
+``{"id", "name"}``. Names are never removed or renumbered there, so renaming
+or reordering the dropdowns leaves older registrations readable. Reads decode
+whichever form a document is in, so compact and legacy rows can coexist while
+``flask compact-registrations`` migrates the existing ones, and turning the
+mode off again only affects new writes.
+"""
+
+import re
+import threading
+import time
+
+from pymongo import ReturnDocument, UpdateOne
+
+import bulk_ops
+
+FORM_OPTIONS_ID = "form_options"
+OPTION_FIELDS = ("college", "course")
+ID_FIELDS = {"college": "college_id", "course": "course_id"}
+COUNTER_FIELD = "next_option_id"
+# Query translation rereads the tables this often, to see ids other worker
+# processes allocated for newly added colleges/courses.
+MAX_TABLE_AGE_SECONDS = 10.0
+
+
+class OptionIds:
+    """Append-only ``name <-> id`` tables for colleges and courses."""
+
+    def __init__(self, get_db, max_age=MAX_TABLE_AGE_SECONDS):
+        self._get_db = get_db
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._names = {field: {} for field in OPTION_FIELDS}
+        self._ids = {field: {} for field in OPTION_FIELDS}
+        self._refreshed_at = None
+
+    def refresh(self, db=None):
+        """Reload both tables from ``meta.form_options``."""
+        db = db if db is not None else self._get_db()
+        if db is None:
+            return
+        doc = db.meta.find_one(
+            {"_id": FORM_OPTIONS_ID}, {f"{field}_ids": 1 for field in OPTION_FIELDS}
+        ) or {}
+        names = {}
+        ids = {}
+        for field in OPTION_FIELDS:
+            entries = doc.get(f"{field}_ids") or []
+            names[field] = {entry["id"]: entry["name"] for entry in entries}
+            ids[field] = {entry["name"]: entry["id"] for entry in entries}
+        # Swapped whole, so readers never see a half-built table.
+        self._names = names
+        self._ids = ids
+        self._refreshed_at = time.monotonic()
+
+    def _current_ids(self, field):
+        if self._refreshed_at is None or time.monotonic() - self._refreshed_at > self.max_age:
+            self.refresh()
+        return self._ids[field]
+
+    def name_for(self, field, option_id):
+        name = self._names[field].get(option_id)
+        if name is None:
+            # Allocated by another process since the last refresh.
+            self.refresh()
+            name = self._names[field].get(option_id)
+        return name
+
+    def id_for(self, field, name, create=False):
+        """Return the id of ``name``; with ``create``, allocate one if needed."""
+        option_id = self._ids[field].get(name)
+        if option_id is None:
+            self.refresh()
+            option_id = self._ids[field].get(name)
+        if option_id is None and create:
+            option_id = self._allocate(field, name)
+        return option_id
+
+    def _allocate(self, field, name):
+        db = self._get_db()
+        if db is None:
+            return None
+        with self._lock:
+            counter = db.meta.find_one_and_update(
+                {"_id": FORM_OPTIONS_ID},
+                {"$inc": {COUNTER_FIELD: 1}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+            # Only pushed if no other process registered the name meanwhile;
+            # the refresh then picks up whichever id won.
+            db.meta.update_one(
+                {"_id": FORM_OPTIONS_ID, f"{field}_ids.name": {"$ne": name}},
+                {"$push": {f"{field}_ids": {"id": counter[COUNTER_FIELD], "name": name}}},
+            )
+            self.refresh(db)
+        return self._ids[field].get(name)
+
+    # -- documents -----------------------------------------------------------
+
+    def encode(self, doc):
+        """Return a copy of ``doc`` with college/course replaced by their ids."""
+        doc = dict(doc)
+        for field in OPTION_FIELDS:
+            if doc.get(field):
+                option_id = self.id_for(field, doc[field], create=True)
+                if option_id is not None:
+                    doc[ID_FIELDS[field]] = option_id
+                    del doc[field]
+        return doc
+
+    def decode(self, doc):
+        """Put the college/course names back on ``doc`` (in place) and return it."""
+        for field in OPTION_FIELDS:
+            id_field = ID_FIELDS[field]
+            if id_field in doc:
+                doc[field] = self.name_for(field, doc.pop(id_field)) or ""
+        return doc
+
+    def update_for(self, changes, compact):
+        """Return the update document that sets ``changes`` (names) on a registration.
+
+        The other form of each field is unset so a document never carries both.
+        """
+        update = {"$set": {}, "$unset": {}}
+        for field, value in changes.items():
+            option_id = None
+            if compact and field in ID_FIELDS:
+                option_id = self.id_for(field, value, create=True)
+            if option_id is not None:
+                update["$set"][ID_FIELDS[field]] = option_id
+                update["$unset"][field] = ""
+            else:
+                update["$set"][field] = value
+                if field in ID_FIELDS:
+                    update["$unset"][ID_FIELDS[field]] = ""
+        return {operator: fields for operator, fields in update.items() if fields}
+
+    # -- queries -------------------------------------------------------------
+
+    def match(self, field, name):
+        """Filter matching ``name`` in either the legacy or the compact form."""
+        option_id = self._current_ids(field).get(name) if field in ID_FIELDS else None
+        if option_id is None:
+            return {field: name}
+        return {"$or": [{field: name}, {ID_FIELDS[field]: option_id}]}
+
+    def match_regex(self, field, pattern):
+        """Conditions matching ``pattern`` (case-insensitive) in either form.
+
+        Returned as a list to splice into an existing ``$or``.
+        """
+        conditions = [{field: {"$regex": pattern, "$options": "i"}}]
+        table = self._current_ids(field) if field in ID_FIELDS else None
+        if table:
+            try:
+                regex = re.compile(pattern, re.IGNORECASE)
+            except re.error:
+                return conditions
+            option_ids = [option_id for name, option_id in table.items() if regex.search(name)]
+            if option_ids:
+                conditions.append({ID_FIELDS[field]: {"$in": option_ids}})
+        return conditions
+
+
+def ensure_indexes(db):
+    """Index ``college_id``/``course_id`` so filters on the compact form use them."""
+    for id_field in ID_FIELDS.values():
+        db.registrations.create_index(id_field)
+
+
+def migrate(db, option_ids, batch_size=1000):
+    """Rewrite legacy registrations into the compact form; return the count."""
+    query = {"$or": [{field: {"$exists": True}} for field in OPTION_FIELDS]}
+    projection = {field: 1 for field in OPTION_FIELDS}
+    migrated = 0
+    for docs in bulk_ops.iter_batches(db, query, batch_size, projection=projection):
+        operations = []
+        for doc in docs:
+            changes = {field: doc[field] for field in OPTION_FIELDS if doc.get(field)}
+            update = option_ids.update_for(changes, compact=True)
+            # Empty values carry nothing worth an id; just drop them.
+            for field in OPTION_FIELDS:
+                if field in doc and field not in changes:
+                    update.setdefault("$unset", {})[field] = ""
+            operations.append(UpdateOne({"_id": doc["_id"]}, update))
+        result = db.registrations.bulk_write(operations, ordered=False)
+        migrated += result.modified_count
+    return migrated
@@ -0,0 +1,94 @@
+"""On-disk, content-addressed cache for generated export files.
+
+Entries are keyed by a hash of the export format, the active filters and the
+registrations data version, so any insert or delete naturally produces a new
+key. Files are evicted least-recently-used first once the cache directory grows
+past its byte budget; a hit refreshes the file's mtime, which is what the
+eviction order is based on.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+
+class ExportCache:
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(*parts):
+        payload = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def path_for(self, key, suffix):
+        return os.path.join(self.directory, f"{key}{suffix}")
+
+    def get(self, key, suffix):
+        """Return the cached file path for ``key`` or None on a miss.
+
+        Another process may still evict the file before it is opened, so
+        callers must treat ``FileNotFoundError`` as a miss.
+        """
+        path = self.path_for(key, suffix)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key, suffix, data):
+        """Store ``data`` under ``key`` and return the cached file path."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(key, suffix)
+        # Write to a temp file first so concurrent readers (or other workers)
+        # never observe a partially written export.
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        self.evict(keep=path)
+        return path
+
+    def evict(self, keep=None):
+        """Drop least-recently-used entries until the cache fits its budget."""
+        with self._lock:
+            entries = []
+            total = 0
+            try:
+                names = os.listdir(self.directory)
+            except FileNotFoundError:
+                return
+            for name in names:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
@@ -0,0 +1,379 @@
+"""Excel and PDF builders for registration exports.
+
+The builders work on plain export rows (see ``EXPORT_COLUMNS``) so they can be
+called from request handlers, background jobs or worker processes alike.
+"""
+
+import re
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from io import BytesIO
+from multiprocessing import get_context
+
+import pandas as pd
+from fpdf import FPDF
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+from openpyxl.utils import get_column_letter
+
+EXPORT_COLUMNS = ["Name", "College", "Course", "Role", "Phone", "Email", "Registered On"]
+
+EXCEL_SHEET_NAME_LIMIT = 31
+
+EXCEL_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+PDF_MIMETYPE = "application/pdf"
+
+
+def filter_summary(search_query="", college_filter=""):
+    """Return the filter description lines printed at the top of exports."""
+    filter_parts = []
+    if college_filter:
+        filter_parts.append(f"College: {college_filter}")
+    if search_query:
+        filter_parts.append(f"Search: {search_query}")
+    return filter_parts
+
+
+def write_excel_sheet(writer, rows, sheet_name="Registrations", filter_parts=None):
+    """Write one styled registrations sheet into an open ``pd.ExcelWriter``."""
+    dataframe = pd.DataFrame(rows, columns=EXPORT_COLUMNS)
+    report_name = "Laksha Kantha Geetha Parayana Registration Sheet"
+
+    # Determine start row based on whether there are filters
+    has_filters = bool(filter_parts)
+    if has_filters:
+        start_row = 3  # Title (1), Filter (2), Headers (3)
+    else:
+        start_row = 2  # Title (1), Headers (2)
+
+    dataframe.to_excel(writer, index=False, sheet_name=sheet_name, startrow=start_row)
+    worksheet = writer.sheets[sheet_name]
+
+    # Title row
+    worksheet.merge_cells(
+        start_row=1,
+        start_column=1,
+        end_row=1,
+        end_column=len(dataframe.columns),
+    )
+    title_cell = worksheet.cell(row=1, column=1)
+    title_cell.value = report_name
+    title_cell.font = Font(size=16, bold=True, color="1A237E")
+    title_cell.alignment = Alignment(horizontal="center")
+
+    # Filter row (only if filters exist)
+    if has_filters:
+        worksheet.merge_cells(
+            start_row=2,
+            start_column=1,
+            end_row=2,
+            end_column=len(dataframe.columns),
+        )
+        filter_cell = worksheet.cell(row=2, column=1)
+        filter_cell.value = "\n".join(filter_parts)
+        filter_cell.font = Font(size=12, italic=True, color="555555")
+        filter_cell.alignment = Alignment(horizontal="center")
+        header_row = 3
+    else:
+        header_row = 2
+    header_fill = PatternFill("solid", fgColor="0B0A08")
+    header_font = Font(color="FFFFFF", bold=True)
+    thin_border = Border(
+        left=Side(style="thin", color="CCCCCC"),
+        right=Side(style="thin", color="CCCCCC"),
+        top=Side(style="thin", color="CCCCCC"),
+        bottom=Side(style="thin", color="CCCCCC"),
+    )
+    for col_idx, column in enumerate(dataframe.columns, start=1):
+        cell = worksheet.cell(row=header_row, column=col_idx)
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = Alignment(horizontal="center", vertical="center")
+        cell.border = thin_border
+
+    for idx, column in enumerate(dataframe.columns, start=1):
+        max_len = len(column)
+        column_series = dataframe[column].astype(str)
+        if not column_series.empty:
+            max_len = max(max_len, column_series.map(len).max())
+        worksheet.column_dimensions[get_column_letter(idx)].width = max_len + 2
+
+    for row in worksheet.iter_rows(
+        min_row=header_row + 1,
+        max_row=worksheet.max_row,
+        min_col=1,
+        max_col=len(dataframe.columns),
+    ):
+        for cell in row:
+            cell.border = thin_border
+
+
+def build_excel(rows, search_query="", college_filter=""):
+    """Return the XLSX export for ``rows`` as bytes."""
+    buffer = BytesIO()
+    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+        write_excel_sheet(
+            writer, rows, filter_parts=filter_summary(search_query, college_filter)
+        )
+    return buffer.getvalue()
+
+
+def build_pdf(rows, search_query="", college_filter=""):
+    """Return the PDF export for ``rows`` as bytes."""
+    filter_parts = filter_summary(search_query, college_filter)
+
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    # Set consistent line width for borders (same on all pages)
+    pdf.set_line_width(0.1)
+
+    col_widths = [32, 45, 25, 25, 28, 40, 35]
+    usable_width = pdf.w - 2 * pdf.l_margin
+    width_scale = usable_width / sum(col_widths)
+    col_widths = [w * width_scale for w in col_widths]
+
+    line_height = 6
+    header_height = 8
+    header_y = None
+
+    def print_page_header():
+        """Print page header (title, filter info) on every page."""
+        pdf.set_font("Helvetica", "B", 16)
+        pdf.cell(0, 10, "Laksha Kantha Geetha Parayana Registrations", ln=True)
+        pdf.set_font("Helvetica", "", 11)
+        # Filter info on separate line (if exists)
+        if filter_parts:
+            pdf.cell(0, 8, "\n".join(filter_parts), ln=True)
+        pdf.ln(6)
+
+    def print_table_header():
+        """Print table header row on current page."""
+        nonlocal header_y
+        pdf.set_font("Helvetica", "B", 11)
+        pdf.set_fill_color(26, 35, 126)
+        pdf.set_text_color(255, 255, 255)
+        header_y = pdf.get_y()
+        for header, width in zip(EXPORT_COLUMNS, col_widths):
+            pdf.cell(width, header_height, header, border=1, align="C", fill=True)
+        pdf.ln()
+        # Reset font and text color for data rows (same as first page)
+        pdf.set_font("Helvetica", size=10)
+        pdf.set_text_color(40, 40, 40)
+
+    def split_text(text, width):
+        """Split text to fit within column width."""
+        lines = pdf.multi_cell(width, line_height, str(text), split_only=True)
+        return lines or [""]
+
+    # First page
+    pdf.add_page()
+    print_page_header()
+    print_table_header()
+
+    pdf.set_font("Helvetica", size=10)
+
+    for index, export_row in enumerate(rows):
+        # Calculate row height first to check if it fits
+        row = [export_row.get(column) or "" for column in EXPORT_COLUMNS]
+        row_lines = [
+            split_text(text, width) for text, width in zip(row, col_widths)
+        ]
+        max_lines = max(len(lines) for lines in row_lines)
+        row_height = max_lines * line_height
+
+        # Check if we need a new page (leave space for page header and table header)
+        # Page header: 10px (title) + 8px (filter if exists) + 6px (spacing) = ~24px
+        # Table header: 8px
+        # Bottom margin: 15px
+        # Total needed: ~24 + 8 + 15 = 47px minimum, plus row height
+        space_needed = 47 + row_height
+        if pdf.get_y() + space_needed > pdf.h - pdf.b_margin:
+            pdf.add_page()
+            # Reset line width for consistent borders (same as first page)
+            pdf.set_line_width(0.1)
+            print_page_header()
+            print_table_header()
+            # Ensure font is reset for data rows (same style as first page)
+            pdf.set_font("Helvetica", size=10)
+            pdf.set_text_color(40, 40, 40)
+
+        if index % 2 == 0:
+            pdf.set_fill_color(255, 255, 255)
+        else:
+            pdf.set_fill_color(245, 245, 245)
+
+        y_start = pdf.get_y()
+        x_pos = pdf.l_margin
+        for width in col_widths:
+            pdf.set_xy(x_pos, y_start)
+            pdf.cell(width, row_height, "", border=1, fill=True)
+            x_pos += width
+
+        pdf.set_xy(pdf.l_margin, y_start)
+        # Ensure font is set correctly for data (not bold, size 10) - same style on all pages
+        pdf.set_font("Helvetica", size=10)
+        pdf.set_text_color(40, 40, 40)
+        for lines, width in zip(row_lines, col_widths):
+            x = pdf.get_x()
+            y = pdf.get_y()
+            pdf.multi_cell(
+                width,
+                line_height,
+                "\n".join(lines),
+                border=0,
+                align="L",
+            )
+            pdf.set_xy(x + width, y)
+        pdf.set_xy(pdf.l_margin, y_start + row_height)
+
+    pdf_data = pdf.output(dest="S")
+    if isinstance(pdf_data, str):
+        return pdf_data.encode("latin1")
+    return bytes(pdf_data)
+
+
+def build_workbook(partitions, search_query=""):
+    """Return one XLSX with a sheet per ``(college, rows)`` partition."""
+    buffer = BytesIO()
+    used_names = set()
+    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+        for college, rows in partitions:
+            sheet_name = unique_sheet_name(college, used_names)
+            write_excel_sheet(
+                writer,
+                rows,
+                sheet_name=sheet_name,
+                filter_parts=filter_summary(search_query, college),
+            )
+    return buffer.getvalue()
+
+
+def unique_sheet_name(college, used_names):
+    """Return an Excel-safe sheet name for ``college`` not yet in ``used_names``."""
+    base = re.sub(r"[\[\]:*?/\\]", " ", college).strip() or "Registrations"
+    base = base[:EXCEL_SHEET_NAME_LIMIT]
+    name = base
+    counter = 2
+    while name.lower() in used_names:
+        tag = f" ({counter})"
+        name = base[: EXCEL_SHEET_NAME_LIMIT - len(tag)] + tag
+        counter += 1
+    used_names.add(name.lower())
+    return name
+
+
+def bundle_filename(college, suffix, taken=None):
+    """Return a filesystem-friendly file name for a college's export.
+
+    Pass one ``taken`` set for all files of a bundle: colleges whose names
+    slug alike ("St. Mary's", "St Marys") then get ``-2``, ``-3``... instead
+    of shadowing each other in the ZIP.
+    """
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", college).strip("-").lower() or "registrations"
+    name = f"{slug}{suffix}"
+    if taken is not None:
+        counter = 2
+        while name in taken:
+            name = f"{slug}-{counter}{suffix}"
+            counter += 1
+        taken.add(name)
+    return name
+
+
+_export_pool = None
+_export_pool_lock = threading.Lock()
+
+
+def get_export_pool(max_workers=1):
+    """Return the shared process pool used for bundle exports.
+
+    ``max_workers`` only applies when the pool is first created.
+    """
+    global _export_pool
+    with _export_pool_lock:
+        if _export_pool is None:
+            # "spawn" keeps worker processes independent of the web server's
+            # threads and open sockets (a forked copy could inherit held locks).
+            _export_pool = ProcessPoolExecutor(
+                max_workers=max_workers, mp_context=get_context("spawn")
+            )
+        return _export_pool
+
+
+def shutdown_export_pool():
+    global _export_pool
+    with _export_pool_lock:
+        if _export_pool is not None:
+            _export_pool.shutdown(wait=False, cancel_futures=True)
+            _export_pool = None
+
+
+def reset_export_pool():
+    """Drop a pool inherited across ``fork`` without touching its processes."""
+    global _export_pool, _export_pool_lock
+    _export_pool = None
+    _export_pool_lock = threading.Lock()
+
+
+def iter_built_exports(builder, jobs, max_workers=1):
+    """Build ``(name, rows, search_query, college)`` jobs, yielding ``(name, bytes)``.
+
+    Jobs run in parallel on the export process pool and are yielded in
+    completion order. A single job (or ``max_workers == 1``) is built inline
+    since the pool round trip would only add latency. Jobs that have not
+    started are cancelled if the generator is closed early, e.g. when the
+    client disconnects mid-download.
+    """
+    if len(jobs) <= 1 or max_workers <= 1:
+        for name, rows, search_query, college in jobs:
+            yield name, builder(rows, search_query, college)
+        return
+
+    pool = get_export_pool(max_workers)
+    futures = {
+        pool.submit(builder, rows, search_query, college): name
+        for name, rows, search_query, college in jobs
+    }
+    try:
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+class _ZipSink:
+    """Write-only file object that hands back whatever was written so far."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_zip(files):
+    """Yield a ZIP archive chunk by chunk from ``(name, bytes)`` pairs.
+
+    Closing this generator closes ``files`` too, so pending builds stop.
+    """
+    sink = _ZipSink()
+    try:
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for name, data in files:
+                archive.writestr(name, data)
+                yield sink.drain()
+        yield sink.drain()
+    finally:
+        close = getattr(files, "close", None)
+        if close is not None:
+            close()
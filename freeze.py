@@ -0,0 +1,176 @@
+"""Freeze the public pages into static HTML with fingerprinted assets.
+
+``home``, ``about`` and ``gallery`` depend only on ``data.py`` and the image
+directory, so they can be rendered once at build time and served by a front
+web server. Every file under ``static/`` is copied twice into the output: under
+its original name (still used by the Flask-rendered ``/register`` and
+``/admin`` pages) and under a content-hashed name that the frozen pages link
+to and that can be cached forever. ``manifest.json`` in the output directory
+describes the pages, the asset mapping and which paths must still be proxied
+to Flask. Pages and text assets get ``.gz``/``.br`` siblings for the front
+server's precompressed-file support (``gzip_static``).
+
+The output directory is replaced on every run, so it must be empty, missing or
+a previous freeze output (recognised by its ``.frozen-site`` marker), and it
+may never be, or contain, the project, ``static/`` or ``templates/``.
+"""
+
+import hashlib
+import json
+import os
+import posixpath
+import re
+import shutil
+from datetime import datetime, timezone
+
+import compression
+
+PUBLIC_PAGES = {
+    "/": "index.html",
+    "/about": "about/index.html",
+    "/gallery": "gallery/index.html",
+}
+
+# Everything under these prefixes stays dynamic and is proxied to Flask.
+DYNAMIC_PREFIXES = ["/register", "/admin", "/api", "/gallery/more"]
+
+# Written into every output directory; only such directories are wiped.
+MARKER_FILE = ".frozen-site"
+
+HASH_LENGTH = 10
+CSS_URL_PATTERN = re.compile(r"""url\((['"]?)([^'")]+)\1\)""")
+
+
+def hashed_name(logical_path, content):
+    digest = hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+    root, ext = posixpath.splitext(logical_path)
+    return f"{root}.{digest}{ext}"
+
+
+def _rewrite_css_urls(css, css_path, manifest):
+    """Point ``url(...)`` references inside a stylesheet at hashed files."""
+    base_dir = posixpath.dirname(css_path)
+
+    def replace(match):
+        quote, ref = match.groups()
+        if ref.startswith(("data:", "http:", "https:", "//", "#", "/")):
+            return match.group(0)
+        path, suffix = re.match(r"([^?#]*)(.*)", ref).groups()
+        target = posixpath.normpath(posixpath.join(base_dir, path))
+        if target not in manifest:
+            return match.group(0)
+        new_ref = posixpath.relpath(manifest[target], base_dir or ".") + suffix
+        return f"url({quote}{new_ref}{quote})"
+
+    return CSS_URL_PATTERN.sub(replace, css)
+
+
+def fingerprint_static(static_folder, output_static):
+    """Copy static files (original and hashed names); return the asset manifest."""
+    logical_paths = []
+    for root, _, filenames in os.walk(static_folder):
+        for filename in filenames:
+            if filename.endswith(tuple(compression.PRECOMPRESSED_SUFFIXES.values())):
+                continue
+            full_path = os.path.join(root, filename)
+            logical_paths.append(
+                os.path.relpath(full_path, static_folder).replace(os.sep, "/")
+            )
+
+    manifest = {}
+    # Stylesheets go last so their url() references can use the hashed
+    # names of the images and fonts they point at.
+    for logical in sorted(logical_paths, key=lambda path: (path.endswith(".css"), path)):
+        with open(os.path.join(static_folder, logical), "rb") as handle:
+            content = handle.read()
+        if logical.endswith(".css"):
+            content = _rewrite_css_urls(
+                content.decode("utf-8"), logical, manifest
+            ).encode("utf-8")
+        hashed = hashed_name(logical, content)
+        manifest[logical] = hashed
+
+        for name in (logical, hashed):
+            target = os.path.join(output_static, *name.split("/"))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, "wb") as handle:
+                handle.write(content)
+
+    return manifest
+
+
+def check_output_dir(app, output_dir):
+    """Raise ``ValueError`` unless ``output_dir`` is safe to replace."""
+    output = os.path.realpath(output_dir)
+    protected = (
+        app.root_path,
+        app.static_folder,
+        os.path.join(app.root_path, app.template_folder),
+        os.path.expanduser("~"),
+    )
+    for path in protected:
+        path = os.path.realpath(path)
+        if path == output or path.startswith(output.rstrip(os.sep) + os.sep):
+            raise ValueError(f"Refusing to overwrite {output_dir}: it contains {path}.")
+    # Inside static/ the output would be fingerprinted into itself on the next
+    # run (and served by the app); inside templates/ it would be rendered.
+    for path in (app.static_folder, os.path.join(app.root_path, app.template_folder)):
+        path = os.path.realpath(path)
+        if output.startswith(path.rstrip(os.sep) + os.sep):
+            raise ValueError(f"Refusing to write {output_dir}: it is inside {path}.")
+    if (
+        os.path.isdir(output)
+        and os.listdir(output)
+        and not os.path.isfile(os.path.join(output, MARKER_FILE))
+    ):
+        raise ValueError(
+            f"Refusing to overwrite {output_dir}: it is not empty and was not "
+            "written by freeze. Choose another --output."
+        )
+
+
+def freeze_site(app, output_dir):
+    """Render the public pages into ``output_dir``; return the site manifest.
+
+    Raises ``ValueError`` if ``output_dir`` is not safe to replace.
+    """
+    check_output_dir(app, output_dir)
+    if os.path.isdir(output_dir):
+        shutil.rmtree(output_dir)
+    os.makedirs(output_dir)
+    with open(os.path.join(output_dir, MARKER_FILE), "w", encoding="utf-8") as handle:
+        handle.write("Generated by freeze.py; deleted and rebuilt on every run.\n")
+    static_url_path = app.static_url_path.strip("/")
+    manifest = fingerprint_static(
+        app.static_folder, os.path.join(output_dir, static_url_path)
+    )
+
+    pages = {}
+    previous_manifest = app.config.get("ASSET_MANIFEST")
+    app.config["ASSET_MANIFEST"] = manifest
+    try:
+        client = app.test_client()
+        for path, filename in PUBLIC_PAGES.items():
+            response = client.get(path)
+            if response.status_code != 200:
+                raise RuntimeError(f"{path} rendered with status {response.status_code}")
+            target = os.path.join(output_dir, *filename.split("/"))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, "wb") as handle:
+                handle.write(response.get_data())
+            pages[path] = filename
+    finally:
+        app.config["ASSET_MANIFEST"] = previous_manifest
+
+    site_manifest = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "pages": pages,
+        "static_prefix": f"/{static_url_path}/",
+        "assets": manifest,
+        "immutable_assets": sorted(manifest.values()),
+        "dynamic_prefixes": DYNAMIC_PREFIXES,
+    }
+    with open(os.path.join(output_dir, "manifest.json"), "w", encoding="utf-8") as handle:
+        json.dump(site_manifest, handle, indent=2, sort_keys=True)
+    compression.precompress(output_dir)
+    return site_manifest
@@ -0,0 +1,111 @@
+"""Gallery paging, intrinsic image sizes and low-quality placeholders.
+
+``/gallery`` renders only the first screen of images; the rest come from
+``/api/gallery`` in cursor-paginated pages as the visitor scrolls. Every local
+image carries its width and height (so the browser reserves the right box
+before the file arrives) and a tiny blurred JPEG as a data URI to paint in the
+meantime. Both are computed with Pillow, when it is installed, and cached per
+file path and modification time.
+
+Cursors name the last image already shown by its static ``filename`` (or its
+``src`` for remote images), base64url-encoded, so a page boundary stays put if
+images are added to the folder in between. They never use the rendered URL,
+which ``freeze`` rewrites to a content-hashed name.
+"""
+
+import base64
+import io
+import os
+import threading
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # optional; pages then ship without sizes or placeholders
+    Image = None
+
+PLACEHOLDER_SIZE = (16, 16)
+PLACEHOLDER_QUALITY = 40
+# EXIF orientations that rotate the image by 90 degrees.
+ROTATED_ORIENTATIONS = {5, 6, 7, 8}
+EXIF_ORIENTATION_TAG = 0x0112
+
+_metadata_cache = {}
+_metadata_lock = threading.Lock()
+
+
+def _read_metadata(path):
+    with Image.open(path) as image:
+        width, height = image.size
+        orientation = image.getexif().get(EXIF_ORIENTATION_TAG)
+        if orientation in ROTATED_ORIENTATIONS:
+            width, height = height, width
+        # draft() lets JPEG decode at a fraction of full size, which is all a
+        # 16px placeholder needs.
+        image.draft("RGB", (PLACEHOLDER_SIZE[0] * 4, PLACEHOLDER_SIZE[1] * 4))
+        thumbnail = ImageOps.exif_transpose(image).convert("RGB")
+        thumbnail.thumbnail(PLACEHOLDER_SIZE)
+        buffer = io.BytesIO()
+        thumbnail.save(buffer, "JPEG", quality=PLACEHOLDER_QUALITY, optimize=True)
+    encoded = base64.b64encode(buffer.getvalue()).decode("ascii")
+    return {
+        "width": width,
+        "height": height,
+        "placeholder": f"data:image/jpeg;base64,{encoded}",
+    }
+
+
+def image_metadata(path):
+    """Return ``{"width", "height", "placeholder"}`` for an image file, or {}."""
+    if Image is None:
+        return {}
+    try:
+        key = (path, os.path.getmtime(path))
+    except OSError:
+        return {}
+    with _metadata_lock:
+        cached = _metadata_cache.get(key)
+    if cached is not None:
+        return cached
+    try:
+        metadata = _read_metadata(path)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        # SVGs and anything Pillow cannot decode simply go without.
+        metadata = {}
+    with _metadata_lock:
+        _metadata_cache[key] = metadata
+    return metadata
+
+
+def cursor_key(item):
+    return item.get("filename") or item["src"]
+
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(key.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        return base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+    except (ValueError, UnicodeError) as exc:
+        raise ValueError("Malformed gallery cursor.") from exc
+
+
+def paginate(items, cursor=None, limit=12):
+    """Return ``(page, next_cursor)``; ``next_cursor`` is None on the last page.
+
+    Raises ``ValueError`` for a cursor that does not name an image in ``items``.
+    """
+    start = 0
+    if cursor:
+        key = decode_cursor(cursor)
+        for index, item in enumerate(items):
+            if cursor_key(item) == key:
+                start = index + 1
+                break
+        else:
+            raise ValueError("Unknown gallery cursor.")
+    page = items[start : start + limit]
+    has_more = start + limit < len(items)
+    return page, encode_cursor(cursor_key(page[-1])) if page and has_more else None
@@ -0,0 +1,221 @@
+"""Idempotency tokens for the public registration form.
+
+Every rendering of ``register.html`` carries a fresh random token in a hidden
+field. The first POST with a token *claims* it by inserting a tiny document
+into ``submission_tokens``; the unique ``_id`` makes the claim atomic across
+threads and worker processes. When that request finishes, the outcome
+(registered, or the duplicate-contact messages) is stored on the claim and in
+a per-process LRU. A resubmission of the same form (flaky Wi-Fi, a double
+tap, the browser retrying) is answered from the LRU without any database
+work, or otherwise from the claim, and never reaches ``db.registrations``. A
+retry that races the original waits briefly for its outcome instead of
+inserting a second copy. Claims carry a fingerprint of the validated form, so
+only an identical resubmission is replayed: going Back, correcting the phone
+number and submitting again is a new submission that takes the token over.
+
+Claims expire through a TTL index on ``expires_at``. A claim that never
+completed (the worker died mid-request) can be taken over once it is older
+than ``stale_seconds``; the regular duplicate check then still guards the
+insert.
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+from pymongo import errors
+
+TOKEN_COLLECTION = "submission_tokens"
+TOKEN_PATTERN = re.compile(r"^[A-Za-z0-9_-]{16,64}$")
+# Returned by ``claim`` while the first request for a token is still running.
+PENDING = "pending"
+POLL_SECONDS = 0.2
+
+
+def new_token():
+    return secrets.token_urlsafe(18)
+
+
+def valid_token(token):
+    return bool(token) and TOKEN_PATTERN.match(token) is not None
+
+
+def form_fingerprint(form_data, ignore=("created_at",)):
+    """Hash of the submitted values (minus per-request fields like timestamps)."""
+    values = {key: value for key, value in form_data.items() if key not in ignore}
+    payload = json.dumps(values, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SubmissionTokens:
+    def __init__(self, ttl_seconds=86400, cache_size=10000, wait_seconds=5.0, stale_seconds=30.0):
+        self.ttl_seconds = ttl_seconds
+        self.cache_size = cache_size
+        self.wait_seconds = wait_seconds
+        self.stale_seconds = stale_seconds
+        self._outcomes = OrderedDict()
+        self._lock = threading.Lock()
+        self._indexed = False
+
+    def reset(self):
+        """Forget the local outcomes (used after ``fork``)."""
+        self._outcomes = OrderedDict()
+        self._lock = threading.Lock()
+        self._indexed = False
+
+    # -- local cache ---------------------------------------------------------
+
+    def cached(self, token, fingerprint):
+        """Return the outcome this process remembers for the same form, or None."""
+        with self._lock:
+            entry = self._outcomes.get(token)
+            if entry is None or entry[0] != fingerprint:
+                return None
+            self._outcomes.move_to_end(token)
+            return entry[1]
+
+    def _remember(self, token, fingerprint, outcome):
+        with self._lock:
+            self._outcomes[token] = (fingerprint, outcome)
+            self._outcomes.move_to_end(token)
+            while len(self._outcomes) > self.cache_size:
+                self._outcomes.popitem(last=False)
+
+    # -- claims --------------------------------------------------------------
+
+    def _claim_document(self, token, fingerprint):
+        now = datetime.now(timezone.utc)
+        return {
+            "_id": token,
+            "fingerprint": fingerprint,
+            "outcome": None,
+            "claimed_at": now,
+            "expires_at": now + timedelta(seconds=self.ttl_seconds),
+        }
+
+    def _is_stale(self, doc):
+        claimed_at = doc["claimed_at"]
+        if claimed_at.tzinfo is None:
+            claimed_at = claimed_at.replace(tzinfo=timezone.utc)
+        age = datetime.now(timezone.utc) - claimed_at
+        return age.total_seconds() > self.stale_seconds
+
+    def _takeover(self, doc, fingerprint):
+        """Filter and update that re-claim ``doc`` if nobody else did first."""
+        return (
+            {
+                "_id": doc["_id"],
+                "fingerprint": doc.get("fingerprint"),
+                "outcome": doc["outcome"],
+                "claimed_at": doc["claimed_at"],
+            },
+            {
+                "$set": {
+                    "fingerprint": fingerprint,
+                    "outcome": None,
+                    "claimed_at": datetime.now(timezone.utc),
+                }
+            },
+        )
+
+    def _next_step(self, doc, fingerprint):
+        """Decide what a request holding ``fingerprint`` does about claim ``doc``.
+
+        Returns ``("replay", outcome)``, ``("takeover", None)`` or ``("wait", None)``.
+        """
+        same_form = doc.get("fingerprint") == fingerprint
+        if doc["outcome"] is not None:
+            # A different form under a finished token is a fresh submission.
+            return ("replay", doc["outcome"]) if same_form else ("takeover", None)
+        if self._is_stale(doc):
+            return "takeover", None
+        return "wait", None
+
+    def claim(self, db, token, fingerprint):
+        """Claim ``token`` for this request's form (``fingerprint``).
+
+        Returns None when this request now owns the token and should do the
+        work, else the outcome recorded for the same form (``PENDING`` if the
+        request that owns the token is still running after ``wait_seconds``).
+        """
+        collection = db[TOKEN_COLLECTION]
+        if not self._indexed:
+            collection.create_index("expires_at", expireAfterSeconds=0)
+            self._indexed = True
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            try:
+                collection.insert_one(self._claim_document(token, fingerprint))
+                return None
+            except errors.DuplicateKeyError:
+                pass
+            doc = collection.find_one({"_id": token})
+            if doc is None:
+                continue  # expired or released in between; claim it afresh
+            step, outcome = self._next_step(doc, fingerprint)
+            if step == "replay":
+                self._remember(token, fingerprint, outcome)
+                return outcome
+            if step == "takeover":
+                if collection.update_one(*self._takeover(doc, fingerprint)).modified_count:
+                    return None
+                continue
+            if time.monotonic() >= deadline:
+                return PENDING
+            time.sleep(POLL_SECONDS)
+
+    def complete(self, db, token, fingerprint, outcome):
+        """Record the outcome of the request that owns ``token``."""
+        self._remember(token, fingerprint, outcome)
+        db[TOKEN_COLLECTION].update_one(
+            {"_id": token, "fingerprint": fingerprint}, {"$set": {"outcome": outcome}}
+        )
+
+    def release(self, db, token):
+        """Give up an unfinished claim so a retry can do the work."""
+        db[TOKEN_COLLECTION].delete_one({"_id": token, "outcome": None})
+
+    # -- coroutine twins (AsyncMongoClient) ----------------------------------
+
+    async def claim_async(self, db, token, fingerprint):
+        collection = db[TOKEN_COLLECTION]
+        if not self._indexed:
+            await collection.create_index("expires_at", expireAfterSeconds=0)
+            self._indexed = True
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            try:
+                await collection.insert_one(self._claim_document(token, fingerprint))
+                return None
+            except errors.DuplicateKeyError:
+                pass
+            doc = await collection.find_one({"_id": token})
+            if doc is None:
+                continue
+            step, outcome = self._next_step(doc, fingerprint)
+            if step == "replay":
+                self._remember(token, fingerprint, outcome)
+                return outcome
+            if step == "takeover":
+                update = self._takeover(doc, fingerprint)
+                if (await collection.update_one(*update)).modified_count:
+                    return None
+                continue
+            if time.monotonic() >= deadline:
+                return PENDING
+            await asyncio.sleep(POLL_SECONDS)
+
+    async def complete_async(self, db, token, fingerprint, outcome):
+        self._remember(token, fingerprint, outcome)
+        await db[TOKEN_COLLECTION].update_one(
+            {"_id": token, "fingerprint": fingerprint}, {"$set": {"outcome": outcome}}
+        )
+
+    async def release_async(self, db, token):
+        await db[TOKEN_COLLECTION].delete_one({"_id": token, "outcome": None})
@@ -0,0 +1,241 @@
+"""Streaming bulk import of registrations from CSV or XLSX uploads.
+
+Rows are read one at a time (``csv`` over the upload stream, openpyxl in
+read-only mode for spreadsheets), validated with the same rules as
+``/register``, de-duplicated within the file and against the database, and
+written with unordered ``insert_many`` batches. Rejected rows are streamed to a
+CSV error report, so memory stays bounded by the batch size plus the sets of
+phone numbers and emails already seen.
+
+CSV files are read as UTF-8, line by line falling back to Windows-1252, which
+is what Excel's plain "CSV" export writes on most machines.
+"""
+
+import codecs
+import csv
+import os
+
+from openpyxl import load_workbook
+from pymongo import errors
+
+import analytics
+
+IMPORT_FIELDS = ("name", "college", "course", "role", "phone", "email")
+REPORT_HEADER = ["Row", "Name", "Phone", "Email", "Errors"]
+SUPPORTED_EXTENSIONS = (".csv", ".xlsx")
+
+# Spreadsheet headers are matched case-insensitively against these aliases.
+HEADER_ALIASES = {
+    "full name": "name",
+    "mobile": "phone",
+    "mobile number": "phone",
+    "phone number": "phone",
+    "email address": "email",
+    "category": "role",
+}
+
+
+class ImportFormatError(ValueError):
+    """Raised when an upload cannot be read as a registrations sheet."""
+
+
+def _cell_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        # Excel stores phone numbers typed as digits as floats.
+        value = int(value)
+    return str(value).strip()
+
+
+def _field_names(header):
+    names = []
+    for cell in header:
+        label = _cell_text(cell).lower()
+        names.append(HEADER_ALIASES.get(label, label))
+    if "name" not in names or "phone" not in names:
+        raise ImportFormatError("The first row must contain at least Name and Phone columns.")
+    return names
+
+
+def _decoded_lines(stream):
+    """Yield the lines of a byte stream as text, UTF-8 or else Windows-1252."""
+    for line_number, raw in enumerate(stream):
+        if line_number == 0 and raw.startswith(codecs.BOM_UTF8):
+            raw = raw[len(codecs.BOM_UTF8) :]
+        try:
+            yield raw.decode("utf-8")
+        except UnicodeDecodeError:
+            # A few bytes are unassigned in cp1252; never fail on them.
+            yield raw.decode("cp1252", errors="replace")
+
+
+def iter_rows(stream, filename):
+    """Yield ``(row_number, fields)`` pairs from an uploaded CSV or XLSX file.
+
+    Raises ``ImportFormatError`` if the file cannot be read, possibly after
+    some rows were already yielded.
+    """
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension == ".csv":
+        rows = csv.reader(_decoded_lines(stream))
+    elif extension == ".xlsx":
+        try:
+            workbook = load_workbook(stream, read_only=True, data_only=True)
+        except Exception as exc:  # openpyxl raises a variety of zip/xml errors
+            raise ImportFormatError("The spreadsheet could not be read.") from exc
+        rows = workbook.active.iter_rows(values_only=True)
+    else:
+        raise ImportFormatError("Upload a .csv or .xlsx file.")
+
+    row_number = 1
+    try:
+        header = next(rows, None)
+        if header is None:
+            raise ImportFormatError("The uploaded file is empty.")
+        names = _field_names(header)
+        for row_number, values in enumerate(rows, start=2):
+            fields = {
+                name: _cell_text(value)
+                for name, value in zip(names, values)
+                if name in IMPORT_FIELDS
+            }
+            if any(fields.values()):
+                yield row_number, fields
+    except csv.Error as exc:
+        raise ImportFormatError(
+            f"The file could not be read after row {row_number} ({exc})."
+        ) from exc
+    finally:
+        if extension == ".xlsx":
+            workbook.close()
+
+
+class ErrorReport:
+    """CSV file listing every rejected row and why."""
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._handle = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._handle)
+        self._writer.writerow(REPORT_HEADER)
+
+    def add(self, row_number, fields, messages):
+        self.rows += 1
+        self._writer.writerow(
+            [
+                row_number,
+                fields.get("name", ""),
+                fields.get("phone", ""),
+                fields.get("email", ""),
+                " ".join(messages),
+            ]
+        )
+
+    def close(self):
+        self._handle.close()
+
+
+def _existing_contacts(db, batch):
+    phones = [doc["phone"] for _, _, doc in batch]
+    phones += [f"+91{phone}" for phone in phones]
+    emails = [doc["email"] for _, _, doc in batch if doc["email"]]
+    existing_phones = set()
+    existing_emails = set()
+    query = {"$or": [{"phone": {"$in": phones}}]}
+    if emails:
+        query["$or"].append({"email": {"$in": emails}})
+    for doc in db.registrations.find(query, {"phone": 1, "email": 1}):
+        phone = str(doc.get("phone") or "")
+        existing_phones.add(phone[3:] if phone.startswith("+91") else phone)
+        if doc.get("email"):
+            existing_emails.add(doc["email"])
+    return existing_phones, existing_emails
+
+
+def _flush(db, batch, report, summary, encode=None):
+    """Check a batch against the database and insert what is new."""
+    if not batch:
+        return
+    existing_phones, existing_emails = _existing_contacts(db, batch)
+    pending = []
+    for row_number, fields, doc in batch:
+        messages = []
+        if doc["phone"] in existing_phones:
+            messages.append("This mobile number is already registered.")
+        if doc["email"] and doc["email"] in existing_emails:
+            messages.append("This email address is already registered.")
+        if messages:
+            summary["duplicates"] += 1
+            report.add(row_number, fields, messages)
+        else:
+            pending.append((row_number, fields, doc))
+
+    if not pending:
+        return
+    docs = [doc for _, _, doc in pending]
+    stored = [encode(doc) for doc in docs] if encode else docs
+    try:
+        db.registrations.insert_many(stored, ordered=False)
+        inserted = docs
+    except errors.BulkWriteError as exc:
+        failed = {error["index"]: error.get("errmsg", "") for error in exc.details["writeErrors"]}
+        inserted = [doc for index, doc in enumerate(docs) if index not in failed]
+        for index, message in failed.items():
+            row_number, fields, _ = pending[index]
+            summary["failed"] += 1
+            report.add(row_number, fields, [f"Could not be saved: {message}"])
+    summary["inserted"] += len(inserted)
+    analytics.record(db, inserted)
+
+
+def run_import(db, rows, validate, report, batch_size=1000, encode=None):
+    """Validate and insert ``rows``; return counts of what happened to them.
+
+    ``encode`` maps each validated document to the form it is stored in. If
+    reading or writing fails partway, the ``ImportFormatError`` or
+    ``PyMongoError`` carries the counts so far as its ``summary`` attribute,
+    since earlier batches are already saved.
+    """
+    summary = {"rows": 0, "inserted": 0, "invalid": 0, "duplicates": 0, "failed": 0}
+    try:
+        _import_rows(db, rows, validate, report, batch_size, encode, summary)
+    except (ImportFormatError, errors.PyMongoError) as exc:
+        exc.summary = summary
+        raise
+    return summary
+
+
+def _import_rows(db, rows, validate, report, batch_size, encode, summary):
+    seen_phones = set()
+    seen_emails = set()
+    batch = []
+
+    for row_number, fields in rows:
+        summary["rows"] += 1
+        doc, messages = validate(fields)
+        if messages:
+            summary["invalid"] += 1
+            report.add(row_number, fields, messages)
+            continue
+
+        if doc["phone"] in seen_phones:
+            messages.append("This mobile number appears earlier in the file.")
+        if doc["email"] and doc["email"] in seen_emails:
+            messages.append("This email address appears earlier in the file.")
+        if messages:
+            summary["duplicates"] += 1
+            report.add(row_number, fields, messages)
+            continue
+
+        seen_phones.add(doc["phone"])
+        if doc["email"]:
+            seen_emails.add(doc["email"])
+        batch.append((row_number, fields, doc))
+        if len(batch) >= batch_size:
+            _flush(db, batch, report, summary, encode)
+            batch = []
+
+    _flush(db, batch, report, summary, encode)
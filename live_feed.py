@@ -0,0 +1,176 @@
+"""Process-wide live feed of registration changes for the admin dashboard.
+
+A single background watcher per process follows ``db.registrations`` and fans
+events out to every subscribed queue (one per open dashboard tab), so the
+number of open tabs does not multiply database work. The watcher uses a
+MongoDB change stream when the deployment supports it (replica sets) and
+otherwise tails new documents by ``_id``, polling the collection's metadata
+count to notice deletes. It stops on its own once the last subscriber leaves.
+A change stream that drops (failover, network) is reopened from its last
+resume token, so inserts made in the gap are still delivered.
+"""
+
+import queue
+import threading
+import time
+
+from pymongo import errors
+
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class RegistrationFeed:
+    def __init__(self, get_db, serialize, poll_interval=2.0, logger=None):
+        self._get_db = get_db
+        self._serialize = serialize
+        self.poll_interval = poll_interval
+        self._logger = logger
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._resume_token = None
+        self.mode = None
+
+    def subscribe(self, limit=None):
+        """Register a new subscriber queue and make sure the watcher runs.
+
+        Returns None instead when ``limit`` subscribers are already open.
+        """
+        subscriber = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            if limit is not None and len(self._subscribers) >= limit:
+                return None
+            self._subscribers.add(subscriber)
+            # ``_run`` clears ``_thread`` under this lock when it decides to
+            # stop, so a watcher that is still alive here will see this
+            # subscriber.
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="registration-feed", daemon=True
+                )
+                self._thread.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def reset(self):
+        """Forget subscribers and the watcher thread (e.g. in a forked child)."""
+        # A fresh lock: the parent's may have been held by a thread that does
+        # not exist in the child.
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._thread = None
+        self._resume_token = None
+        self.mode = None
+
+    def _has_subscribers(self):
+        with self._lock:
+            return bool(self._subscribers)
+
+    def publish(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(event)
+            except queue.Full:
+                # A stalled client: drop its backlog and ask it to reload.
+                while True:
+                    try:
+                        subscriber.get_nowait()
+                    except queue.Empty:
+                        break
+                subscriber.put_nowait({"type": "resync"})
+
+    def _log(self, message, *args):
+        if self._logger is not None:
+            self._logger.warning(message, *args)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._subscribers:
+                    self._thread = None
+                    # Later subscribers load the table fresh; nothing to replay.
+                    self._resume_token = None
+                    return
+            db = self._get_db()
+            if db is None:
+                time.sleep(self.poll_interval)
+                continue
+            try:
+                if self.mode != "tail":
+                    self.mode = "change_stream"
+                    self._watch_change_stream(db)
+                else:
+                    self._tail(db)
+            except errors.OperationFailure as exc:
+                if self.mode == "change_stream" and self._resume_token is not None:
+                    # Most likely the token fell off the oplog: start afresh
+                    # and have the dashboards reload.
+                    self._log("Could not resume the registration feed: %s", exc)
+                    self._resume_token = None
+                    self.publish({"type": "resync"})
+                elif self.mode == "change_stream":
+                    # Standalone servers reject $changeStream; tail instead.
+                    self._log("Change streams unavailable, tailing instead: %s", exc)
+                    self.mode = "tail"
+                else:
+                    self._log("Registration feed query failed: %s", exc)
+                    time.sleep(self.poll_interval)
+            except errors.PyMongoError as exc:
+                self._log("Registration feed interrupted: %s", exc)
+                time.sleep(self.poll_interval)
+
+    def _watch_change_stream(self, db):
+        pipeline = [{"$match": {"operationType": {"$in": ["insert", "delete"]}}}]
+        with db.registrations.watch(
+            pipeline, max_await_time_ms=1000, resume_after=self._resume_token
+        ) as stream:
+            while self._has_subscribers():
+                change = stream.try_next()
+                self._resume_token = stream.resume_token
+                if change is None:
+                    continue
+                total = db.registrations.estimated_document_count()
+                if change["operationType"] == "insert":
+                    self.publish(
+                        {
+                            "type": "insert",
+                            "registration": self._serialize(change["fullDocument"]),
+                            "total": total,
+                        }
+                    )
+                else:
+                    self.publish(
+                        {
+                            "type": "delete",
+                            "id": str(change["documentKey"]["_id"]),
+                            "total": total,
+                        }
+                    )
+
+    def _tail(self, db):
+        latest = db.registrations.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+        last_id = latest["_id"] if latest else None
+        last_total = db.registrations.estimated_document_count()
+
+        while self._has_subscribers():
+            time.sleep(self.poll_interval)
+            query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+            new_entries = list(db.registrations.find(query).sort("_id", 1))
+            total = db.registrations.estimated_document_count()
+            for entry in new_entries:
+                last_id = entry["_id"]
+                self.publish(
+                    {
+                        "type": "insert",
+                        "registration": self._serialize(entry),
+                        "total": total,
+                    }
+                )
+            if not new_entries and total != last_total:
+                self.publish({"type": "counters", "total": total})
+            last_total = total
@@ -0,0 +1,283 @@
+"""Slow-query log with sampled explain plans.
+
+``SlowQueryLog`` is a PyMongo ``CommandListener``; it is passed to the
+clients as an event listener, so it sees every command the app sends, whether
+from ``register``, the admin API or the exports. Commands slower than the
+threshold are aggregated by *shape* (collection, command and filter with the
+values replaced by ``?``) together with the Flask endpoint that issued them.
+``getMore`` batches are charged to the ``find`` or ``aggregate`` that opened
+the cursor, since a getMore's own command carries no filter.
+
+The first slow occurrence of a shape, and then a random sample of later ones,
+is re-run as ``explain`` (``executionStats``) on a background thread. This
+captures the winning plan stage (``COLLSCAN`` vs ``IXSCAN``), the index used,
+and documents examined vs returned. The log is per process and kept in memory.
+"""
+
+import json
+import logging
+import queue
+import random
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from flask import has_request_context, request
+from pymongo import errors, monitoring
+
+# Read commands that ``explain`` accepts; writes are timed but not explained.
+EXPLAINABLE_COMMANDS = ("find", "aggregate", "count", "distinct")
+AUDITED_COMMANDS = EXPLAINABLE_COMMANDS + ("insert", "update", "delete", "findAndModify")
+FILTER_FIELDS = {
+    "find": "filter",
+    "count": "query",
+    "distinct": "query",
+    "delete": "deletes",
+    "update": "updates",
+    "findAndModify": "query",
+}
+# Commands whose reply may leave a cursor open for later getMores.
+CURSOR_COMMANDS = ("find", "aggregate")
+# In-flight commands and open cursors remembered at once; the oldest are
+# dropped first, e.g. when a connection died without a finished event.
+MAX_TRACKED = 1000
+# Session/cluster bookkeeping that explain must not be sent.
+COMMAND_NOISE = ("lsid", "txnNumber", "$clusterTime", "$db", "$readPreference", "readConcern")
+
+logger = logging.getLogger(__name__)
+
+
+def query_shape(value):
+    """Replace literal values with ``?``, keeping field names and operators."""
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        shapes = []
+        for item in value:
+            shape = query_shape(item)
+            if shape not in shapes:
+                shapes.append(shape)
+        return shapes
+    return "?"
+
+
+def command_shape(command_name, command):
+    """Return the filter (or pipeline) shape of a command."""
+    if command_name == "aggregate":
+        return query_shape(command.get("pipeline", []))
+    field = FILTER_FIELDS.get(command_name)
+    if field is None:
+        return {}
+    if field in ("deletes", "updates"):
+        return query_shape([statement.get("q", {}) for statement in command.get(field, [])])
+    return query_shape(command.get(field, {}))
+
+
+def _walk(node):
+    if isinstance(node, dict):
+        yield node
+        for value in node.values():
+            yield from _walk(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _walk(item)
+
+
+def summarize_explain(explain):
+    """Pull the numbers that matter out of an ``explain`` response."""
+    stages = []
+    indexes = []
+    stats = {}
+    for node in _walk(explain):
+        if "stage" in node and node["stage"] not in stages:
+            stages.append(node["stage"])
+        if node.get("indexName") and node["indexName"] not in indexes:
+            indexes.append(node["indexName"])
+        if "totalDocsExamined" in node and not stats:
+            stats = node
+    return {
+        "stages": stages,
+        "indexes": indexes,
+        "collscan": "COLLSCAN" in stages,
+        "docs_examined": stats.get("totalDocsExamined"),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "returned": stats.get("nReturned"),
+        "execution_ms": stats.get("executionTimeMillis"),
+    }
+
+
+def _remember(tracked, key, value):
+    """Add ``key`` to an ``OrderedDict`` capped at ``MAX_TRACKED``, oldest out."""
+    tracked[key] = value
+    while len(tracked) > MAX_TRACKED:
+        tracked.popitem(last=False)
+
+
+class SlowQueryLog(monitoring.CommandListener):
+    def __init__(self, threshold_ms=100, explain_sample_rate=0.1, max_entries=200, get_client=None):
+        self.threshold_ms = threshold_ms
+        self.explain_sample_rate = explain_sample_rate
+        self.max_entries = max_entries
+        self.get_client = get_client
+        self._pending = OrderedDict()
+        self._cursors = OrderedDict()
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._explain_queue = queue.Queue(maxsize=100)
+        self._explainer = None
+
+    # -- CommandListener -----------------------------------------------------
+
+    def started(self, event):
+        command_name = event.command_name
+        if command_name == "killCursors":
+            with self._lock:
+                for cursor_id in event.command.get("cursors", []):
+                    self._cursors.pop((event.connection_id, cursor_id), None)
+            return
+        if command_name == "getMore":
+            cursor = (event.connection_id, event.command["getMore"])
+            with self._lock:
+                origin = self._cursors.get(cursor)
+                if origin is not None:
+                    _remember(self._pending, event.request_id, (*origin, cursor))
+            return
+        if command_name not in AUDITED_COMMANDS:
+            return
+        endpoint = request.endpoint if has_request_context() else None
+        with self._lock:
+            _remember(
+                self._pending, event.request_id, (command_name, event.command, endpoint, None)
+            )
+
+    def succeeded(self, event):
+        self._finished(event, event.reply)
+
+    def failed(self, event):
+        self._finished(event, {})
+
+    def _finished(self, event, reply):
+        with self._lock:
+            started = self._pending.pop(event.request_id, None)
+        if started is None:
+            return
+        command_name, command, endpoint, cursor = started
+        cursor_id = (reply.get("cursor") or {}).get("id") if isinstance(reply, dict) else None
+        with self._lock:
+            if cursor is not None and not cursor_id:
+                # Exhausted (id 0) or failed: no more getMores will follow.
+                self._cursors.pop(cursor, None)
+            elif cursor is None and cursor_id and command_name in CURSOR_COMMANDS:
+                _remember(
+                    self._cursors,
+                    (event.connection_id, cursor_id),
+                    (command_name, command, endpoint),
+                )
+        duration_ms = event.duration_micros / 1000
+        if duration_ms >= self.threshold_ms:
+            self.record(event.database_name, command_name, command, endpoint, duration_ms)
+
+    # -- log -----------------------------------------------------------------
+
+    def record(self, database, command_name, command, endpoint, duration_ms):
+        collection = command.get(command_name)
+        shape = command_shape(command_name, command)
+        key = json.dumps([database, collection, command_name, shape, endpoint], sort_keys=True)
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.max_entries:
+                    # Make room by forgetting the shape costing the least.
+                    cheapest = min(self._entries, key=lambda k: self._entries[k]["total_ms"])
+                    del self._entries[cheapest]
+                entry = self._entries[key] = {
+                    "database": database,
+                    "collection": collection,
+                    "command": command_name,
+                    "shape": shape,
+                    "endpoint": endpoint,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "plan": None,
+                    "explained_at": None,
+                }
+            entry["count"] += 1
+            entry["total_ms"] += duration_ms
+            entry["max_ms"] = max(entry["max_ms"], duration_ms)
+            entry["last_seen"] = now
+            wants_explain = command_name in EXPLAINABLE_COMMANDS and (
+                entry["plan"] is None or random.random() < self.explain_sample_rate
+            )
+
+        logger.warning(
+            "Slow MongoDB %s on %s.%s (%.1f ms, endpoint=%s): %s",
+            command_name,
+            database,
+            collection,
+            duration_ms,
+            endpoint,
+            json.dumps(shape, sort_keys=True),
+        )
+        if wants_explain and self.get_client is not None:
+            self._queue_explain(key, database, command)
+
+    def _queue_explain(self, key, database, command):
+        explainable = {
+            name: value for name, value in command.items() if name not in COMMAND_NOISE
+        }
+        try:
+            self._explain_queue.put_nowait((key, database, explainable))
+        except queue.Full:
+            return
+        with self._lock:
+            if self._explainer is None or not self._explainer.is_alive():
+                self._explainer = threading.Thread(
+                    target=self._explain_loop, name="slow-query-explain", daemon=True
+                )
+                self._explainer.start()
+
+    def _explain_loop(self):
+        while True:
+            try:
+                key, database, command = self._explain_queue.get(timeout=30)
+            except queue.Empty:
+                return
+            client = self.get_client()
+            if client is None:
+                continue
+            try:
+                # Runs on this thread rather than in the request that was
+                # slow, so capturing a plan never slows a visitor further.
+                explain = client[database].command(
+                    {"explain": command, "verbosity": "executionStats"}
+                )
+            except errors.PyMongoError as exc:
+                logger.info("Could not explain slow query: %s", exc)
+                continue
+            summary = summarize_explain(explain)
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry["plan"] = summary
+                    entry["explained_at"] = datetime.now(timezone.utc)
+
+    def reset(self):
+        """Forget everything (used after ``fork``)."""
+        self._lock = threading.Lock()
+        self._pending = OrderedDict()
+        self._cursors = OrderedDict()
+        self._entries = {}
+        self._explain_queue = queue.Queue(maxsize=100)
+        self._explainer = None
+
+    def worst(self, limit=50):
+        """Return logged shapes, most total time first."""
+        with self._lock:
+            entries = [dict(entry) for entry in self._entries.values()]
+        for entry in entries:
+            entry["avg_ms"] = entry["total_ms"] / entry["count"]
+            entry["shape_json"] = json.dumps(entry["shape"], sort_keys=True)
+        entries.sort(key=lambda entry: entry["total_ms"], reverse=True)
+        return entries[:limit]
@@ -0,0 +1,82 @@
+"""Bounded in-process LRU cache for admin registration searches.
+
+Entries are stamped with a generation number. Every registration write made
+by this process bumps the generation (``invalidate``), which empties the
+cache in O(1) and makes any result computed before the bump unstorable.
+Writes made by *other* worker processes are noticed through the shared
+``meta`` change counter: at most once every ``revalidate_seconds`` the caller
+reads it and passes it to ``observe_version``, and any change invalidates.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class QueryCache:
+    def __init__(self, max_entries=256, revalidate_seconds=2.0):
+        self.max_entries = max_entries
+        self.revalidate_seconds = revalidate_seconds
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self._checked_at = 0.0
+
+    def invalidate(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    @property
+    def version(self):
+        """The shared change counter last passed to ``observe_version``, or None."""
+        return self._version
+
+    def needs_revalidation(self):
+        return time.monotonic() - self._checked_at >= self.revalidate_seconds
+
+    def observe_version(self, version):
+        """Record the shared change counter; invalidate if it moved.
+
+        The counter only grows, so a value older than one already seen (a
+        revalidation read racing this process's own write) is ignored.
+        """
+        self._checked_at = time.monotonic()
+        if self._version is None or version > self._version:
+            first_check = self._version is None
+            self._version = version
+            if not first_check:
+                self.invalidate()
+
+    def get(self, key):
+        """Return the cached value for ``key`` or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != self.generation:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value, generation):
+        """Store ``value`` unless the cache was invalidated since ``generation``."""
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = (generation, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "generation": self.generation,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
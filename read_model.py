@@ -0,0 +1,475 @@
+"""Optional in-memory, column-oriented copy of the registrations collection.
+
+Each field lives in its own compact column: ``array`` codes into interned
+tables for college/course/role, an ``array('d')`` of timestamps, plain lists
+for the free-text fields and a ``bytearray`` of live flags. The lowercase
+search text of every row is concatenated into one string with a parallel
+array of row offsets, so a plain substring search is a loop of ``str.find``
+calls in C rather than a regex per document.
+
+A background thread keeps the copy current. Every ``poll_interval`` it reads
+the ``registrations_state`` counters. New documents are appended by tailing
+``_id``. A document count that no longer matches triggers an ``_id`` scan to
+reconcile deletes (and inserts that arrived with an older ``_id``). A change
+of the ``updates`` counter (bulk reassignments) reloads everything. Writes in
+this process call :meth:`poke`, and the next query catches up inline so an
+admin always sees their own change. Callers compare :attr:`version` with the
+shared counter before trusting a query, since writes made by other processes
+are otherwise only seen on the next poll. That comparison only means something
+if the counters and the rows come from the same node, so ``get_db`` must
+return a primary handle, never a secondary-preferred one.
+
+Results are ordered by ``created_at`` like the Mongo queries. Searches are
+case-insensitive like the ``$regex``/``i`` filter: plain text is matched as a
+substring, anything with regex syntax runs as a Python regex on each field.
+The legacy ``category`` field is returned but, as in the Mongo query, never
+searched.
+"""
+
+import re
+import sys
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from bisect import bisect_right
+from datetime import datetime, timezone
+
+from pymongo import errors
+
+FIELDS = ("name", "college", "course", "role", "phone", "email")
+PROJECTION = {
+    field: 1 for field in FIELDS + ("college_id", "course_id", "category", "created_at")
+}
+LOAD_BATCH_SIZE = 5000
+# Matching row lists kept for recent (search, college) pairs, so paging
+# through a broad search only slices.
+RESULT_MEMO_SIZE = 16
+# Rebuild the columns once this share of rows are deleted tombstones.
+COMPACT_DEAD_RATIO = 0.2
+MISSING_TIMESTAMP = float("-inf")
+SEPARATOR = "\n"
+REGEX_SYNTAX = re.compile(r"[.^$*+?{}\[\]\\|()]")
+
+
+class Interner:
+    """Map repeated strings to small integer codes (0 is the empty string)."""
+
+    def __init__(self):
+        self.values = [""]
+        self.codes = {"": 0}
+
+    def code(self, value):
+        value = value or ""
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class Columns:
+    def __init__(self):
+        self.ids = []
+        self.row_of = {}
+        self.created = array("d")
+        self.colleges = Interner()
+        self.courses = Interner()
+        self.roles = Interner()
+        self.college = array("I")
+        self.course = array("I")
+        self.role = array("I")
+        # Legacy documents carry ``category`` instead of ``role``.
+        self.category = array("I")
+        self.name = []
+        self.phone = []
+        self.email = []
+        self.alive = bytearray()
+        self.live = 0
+        # Bumped on every append/remove; keys the query result memo.
+        self.revision = 0
+        self.in_order = True
+        self.rows_by_college = {}
+        # Search text of rows [0, len(offsets)) joined into ``blob``.
+        self.blob = ""
+        self.offsets = array("q")
+
+    def __len__(self):
+        return len(self.ids)
+
+    def append(self, doc):
+        row = len(self.ids)
+        created = doc.get("created_at")
+        if isinstance(created, datetime):
+            if created.tzinfo is None:
+                created = created.replace(tzinfo=timezone.utc)
+            timestamp = created.timestamp()
+        else:
+            timestamp = MISSING_TIMESTAMP
+        if self.created and timestamp < self.created[-1]:
+            self.in_order = False
+
+        college = self.colleges.code(doc.get("college"))
+        self.ids.append(doc["_id"])
+        self.row_of[doc["_id"]] = row
+        self.created.append(timestamp)
+        self.college.append(college)
+        self.course.append(self.courses.code(doc.get("course")))
+        self.role.append(self.roles.code(doc.get("role")))
+        self.category.append(self.roles.code(doc.get("category")))
+        self.name.append(doc.get("name") or "")
+        self.phone.append(str(doc.get("phone") or ""))
+        self.email.append(doc.get("email") or "")
+        self.alive.append(1)
+        self.live += 1
+        self.revision += 1
+        self.rows_by_college.setdefault(college, array("I")).append(row)
+
+    def remove(self, doc_id):
+        row = self.row_of.pop(doc_id, None)
+        if row is not None and self.alive[row]:
+            self.alive[row] = 0
+            self.live -= 1
+            self.revision += 1
+
+    def field_values(self, row):
+        return (
+            self.name[row],
+            self.colleges.values[self.college[row]],
+            self.courses.values[self.course[row]],
+            self.roles.values[self.role[row]],
+            self.phone[row],
+            self.email[row],
+        )
+
+    def extend_blob(self):
+        """Append the search text of rows added since the last search."""
+        start = len(self.offsets)
+        if start == len(self.ids):
+            return
+        position = len(self.blob)
+        parts = []
+        for row in range(start, len(self.ids)):
+            self.offsets.append(position)
+            text = SEPARATOR.join(self.field_values(row)).lower() + SEPARATOR
+            parts.append(text)
+            position += len(text)
+        self.blob += "".join(parts)
+
+    def search_text(self, row):
+        end = self.offsets[row + 1] if row + 1 < len(self.offsets) else len(self.blob)
+        return self.blob[self.offsets[row] : end]
+
+    def document(self, row):
+        timestamp = self.created[row]
+        created = None
+        if timestamp != MISSING_TIMESTAMP:
+            # Naive UTC, like documents read through PyMongo.
+            created = datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None)
+        name, college, course, role, phone, email = self.field_values(row)
+        doc = {
+            "_id": self.ids[row],
+            "name": name,
+            "college": college,
+            "course": course,
+            "role": role,
+            "phone": phone,
+            "email": email,
+            "created_at": created,
+        }
+        if self.category[row]:
+            doc["category"] = self.roles.values[self.category[row]]
+        return doc
+
+    def memory_bytes(self):
+        """Approximate heap use per column."""
+        def list_bytes(values):
+            return sys.getsizeof(values) + sum(sys.getsizeof(value) for value in values)
+
+        return {
+            "ids": list_bytes(self.ids) + sys.getsizeof(self.row_of),
+            "created": sys.getsizeof(self.created),
+            "codes": sum(
+                sys.getsizeof(column)
+                for column in (self.college, self.course, self.role, self.category)
+            )
+            + sum(sys.getsizeof(rows) for rows in self.rows_by_college.values()),
+            "lookups": sum(
+                list_bytes(interner.values)
+                for interner in (self.colleges, self.courses, self.roles)
+            ),
+            "text": list_bytes(self.name) + list_bytes(self.phone) + list_bytes(self.email),
+            "alive": sys.getsizeof(self.alive),
+            "search_index": sys.getsizeof(self.blob) + sys.getsizeof(self.offsets),
+        }
+
+
+def _compacted(columns):
+    """Rebuild ``columns`` with live rows only, in ``created_at`` order."""
+    rows = [row for row in range(len(columns)) if columns.alive[row]]
+    rows.sort(key=columns.created.__getitem__)
+    fresh = Columns()
+    for row in rows:
+        fresh.append(columns.document(row))
+    return fresh
+
+
+class RegistrationReadModel:
+    def __init__(self, get_db, state_id, poll_interval=2.0, logger=None, decode=None):
+        # Primary reads only; see the module docstring.
+        self._get_db = get_db
+        # Turns stored documents (e.g. compact ids) into plain field values.
+        self._decode = decode or (lambda doc: doc)
+        self._state_id = state_id
+        self.poll_interval = poll_interval
+        self._logger = logger
+        self._lock = threading.RLock()
+        self._sync_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._columns = None
+        self._results = OrderedDict()
+        self._version = None
+        self._updates = None
+        self._last_id = None
+        self.loaded_at = None
+        self.synced_at = None
+        self.load_seconds = None
+
+    @property
+    def ready(self):
+        return self._columns is not None
+
+    @property
+    def version(self):
+        """The ``registrations_state`` version the columns last caught up to."""
+        return self._version
+
+    def start(self):
+        """Start the loader/sync thread if it is not running."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="registration-read-model", daemon=True
+                )
+                self._thread.start()
+
+    def reset(self):
+        """Forget everything (e.g. in a forked child)."""
+        self._lock = threading.RLock()
+        self._sync_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._columns = None
+        self._results = OrderedDict()
+        self._version = None
+        self._updates = None
+        self._last_id = None
+
+    def poke(self):
+        """Note a write made by this process; the next query catches up first."""
+        self._wake.set()
+
+    def _log(self, message, *args):
+        if self._logger is not None:
+            self._logger.warning(message, *args)
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.poll_interval)
+            db = self._get_db()
+            if db is None:
+                continue
+            try:
+                self.sync(db)
+            except errors.PyMongoError as exc:
+                self._log("Read model sync failed: %s", exc)
+
+    # -- keeping current ----------------------------------------------------
+
+    def load(self, db, state=None):
+        """Read every registration into fresh columns and swap them in."""
+        started = time.perf_counter()
+        state = state if state is not None else self._read_state(db)
+        columns = Columns()
+        cursor = db.registrations.find({}, PROJECTION, batch_size=LOAD_BATCH_SIZE)
+        for doc in cursor.sort("created_at", 1):
+            columns.append(self._decode(doc))
+        columns.extend_blob()
+        with self._lock:
+            self._columns = columns
+            self._results.clear()
+            self._version = state.get("version", 0)
+            self._updates = state.get("updates", 0)
+            self._last_id = max(columns.ids) if columns.ids else None
+            self.loaded_at = self.synced_at = datetime.now(timezone.utc)
+        self.load_seconds = time.perf_counter() - started
+
+    def _read_state(self, db):
+        return db.meta.find_one({"_id": self._state_id}) or {}
+
+    def sync(self, db):
+        """Bring the columns up to date with the collection."""
+        with self._sync_lock:
+            self._wake.clear()
+            state = self._read_state(db)
+            if self._columns is None or state.get("updates", 0) != self._updates:
+                self.load(db, state)
+                return
+
+            total = db.registrations.estimated_document_count()
+            if state.get("version", 0) == self._version and total == self._columns.live:
+                self.synced_at = datetime.now(timezone.utc)
+                return
+
+            query = {"_id": {"$gt": self._last_id}} if self._last_id is not None else {}
+            inserted = list(db.registrations.find(query, PROJECTION).sort("_id", 1))
+            with self._lock:
+                for doc in inserted:
+                    if doc["_id"] not in self._columns.row_of:
+                        self._columns.append(self._decode(doc))
+                    self._last_id = doc["_id"]
+
+            if db.registrations.estimated_document_count() != self._columns.live:
+                self._reconcile(db)
+
+            with self._lock:
+                self._version = state.get("version", 0)
+                self.synced_at = datetime.now(timezone.utc)
+                self._maybe_compact()
+
+    def _reconcile(self, db):
+        """Drop deleted rows and pick up inserts that arrived out of ``_id`` order."""
+        ids = {doc["_id"] for doc in db.registrations.find({}, {"_id": 1})}
+        with self._lock:
+            known = set(self._columns.row_of)
+            for doc_id in known - ids:
+                self._columns.remove(doc_id)
+            missing = list(ids - known)
+        if missing:
+            docs = list(db.registrations.find({"_id": {"$in": missing}}, PROJECTION))
+            with self._lock:
+                for doc in docs:
+                    self._columns.append(self._decode(doc))
+
+    def _maybe_compact(self):
+        columns = self._columns
+        dead = len(columns) - columns.live
+        if not columns.in_order or dead > len(columns) * COMPACT_DEAD_RATIO:
+            self._columns = _compacted(columns)
+            self._columns.extend_blob()
+            self._results.clear()
+
+    # -- queries --------------------------------------------------------------
+
+    def catch_up(self):
+        """Sync inline now (instead of waiting for the next poll)."""
+        db = self._get_db()
+        if db is not None:
+            try:
+                self.sync(db)
+            except errors.PyMongoError as exc:
+                self._log("Read model sync failed: %s", exc)
+
+    def _catch_up(self):
+        if self._wake.is_set():
+            self.catch_up()
+
+    def _matching_rows(self, columns, search_query, college_filter):
+        alive = columns.alive
+        college_code = None
+        candidates = range(len(columns))
+        if college_filter:
+            college_code = columns.colleges.codes.get(college_filter)
+            if college_code is None:
+                return []
+            candidates = columns.rows_by_college.get(college_code, ())
+        if not search_query:
+            return [row for row in candidates if alive[row]]
+
+        needle = search_query.lower()
+        plain = not REGEX_SYNTAX.search(needle) and SEPARATOR not in needle
+        pattern = None
+        if not plain:
+            try:
+                pattern = re.compile(search_query, re.IGNORECASE | re.MULTILINE)
+            except re.error:
+                pattern = re.compile(re.escape(search_query), re.IGNORECASE)
+
+        columns.extend_blob()
+        if plain and len(candidates) * 4 < len(columns):
+            # A small college: checking its rows beats scanning everyone's text.
+            return [
+                row for row in candidates if alive[row] and needle in columns.search_text(row)
+            ]
+
+        blob = columns.blob
+        offsets = columns.offsets
+        row_count = len(offsets)
+        college = columns.college
+
+        def find(start):
+            if plain:
+                return blob.find(needle, start)
+            # A regex hit on the joined text may span two fields (``\s``,
+            # ``[^x]``), so rows found this way are re-checked field by field.
+            match = pattern.search(blob, start)
+            return match.start() if match else -1
+
+        rows = []
+        row = 0
+        position = find(0)
+        while position != -1:
+            row = bisect_right(offsets, position, row) - 1
+            if (
+                alive[row]
+                and (college_code is None or college[row] == college_code)
+                and (plain or any(pattern.search(value) for value in columns.field_values(row)))
+            ):
+                rows.append(row)
+            # Continue from the next row: one hit per row is enough.
+            row += 1
+            if row >= row_count:
+                break
+            position = find(offsets[row])
+        return rows
+
+    def query(self, search_query=None, college_filter=None, skip=0, limit=None, catch_up=True):
+        """Return ``(total, documents)`` for a filtered, ``created_at``-ordered page."""
+        search_query = (search_query or "").strip()
+        college_filter = (college_filter or "").strip()
+        if catch_up:
+            self._catch_up()
+        with self._lock:
+            columns = self._columns
+            key = (columns.revision, search_query.lower(), college_filter)
+            rows = self._results.get(key)
+            if rows is None:
+                rows = self._matching_rows(columns, search_query, college_filter)
+                self._results[key] = rows
+                while len(self._results) > RESULT_MEMO_SIZE:
+                    self._results.popitem(last=False)
+            else:
+                self._results.move_to_end(key)
+            page = rows[skip:] if limit is None else rows[skip : skip + limit]
+            return len(rows), [columns.document(row) for row in page]
+
+    def stats(self):
+        with self._lock:
+            columns = self._columns
+            if columns is None:
+                return {"ready": False}
+            memory = columns.memory_bytes()
+            return {
+                "ready": True,
+                "rows": columns.live,
+                "tombstones": len(columns) - columns.live,
+                "colleges": len(columns.colleges.values) - 1,
+                "courses": len(columns.courses.values) - 1,
+                "roles": len(columns.roles.values) - 1,
+                "memory_bytes": memory,
+                "memory_total_bytes": sum(memory.values()),
+                "load_seconds": self.load_seconds,
+                "loaded_at": self.loaded_at.isoformat() if self.loaded_at else None,
+                "synced_at": self.synced_at.isoformat() if self.synced_at else None,
+            }
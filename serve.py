@@ -0,0 +1,92 @@
+"""Production launcher: preforked gunicorn workers around the Flask app.
+
+    python serve.py
+
+The app is imported once in the master (``preload_app``), which also loads
+every template, and workers are forked from it. Each worker then drops what it
+inherited, opens its own MongoDB pool (``MONGO_MAX_POOL_SIZE`` /
+``MONGO_MIN_POOL_SIZE``) and fills its caches before taking requests, so the
+first visitor after a deploy does not pay for connecting. On ``SIGTERM`` the
+master stops accepting, lets workers finish in-flight requests for up to
+``WEB_GRACEFUL_TIMEOUT`` seconds, and each worker closes its pool on exit.
+
+Every open admin live feed (``/admin/api/registrations/stream``, server-sent
+events) keeps one worker thread busy for as long as the dashboard tab stays
+open. ``LIVE_FEED_MAX_STREAMS`` (4) caps them per worker, so keep
+``WEB_THREADS`` comfortably above it; streams beyond the cap get a 503 and the
+dashboard works without live updates.
+
+Tuning (environment):
+
+* ``WEB_BIND`` (``0.0.0.0:$PORT``, port 5002)
+* ``WEB_WORKERS`` (2 x CPUs + 1), ``WEB_THREADS`` (8)
+* ``WEB_TIMEOUT`` (60), ``WEB_GRACEFUL_TIMEOUT`` (30), ``WEB_KEEPALIVE`` (5)
+* ``WEB_MAX_REQUESTS`` (0 = never recycle), jittered by 10%
+"""
+
+import os
+
+from gunicorn.app.base import BaseApplication
+
+
+def default_options():
+    workers = int(os.environ.get("WEB_WORKERS", str((os.cpu_count() or 1) * 2 + 1)))
+    max_requests = int(os.environ.get("WEB_MAX_REQUESTS", "0"))
+    return {
+        "bind": os.environ.get("WEB_BIND", f"0.0.0.0:{os.environ.get('PORT', '5002')}"),
+        "workers": workers,
+        # Threads let slow requests (exports, the SSE feed) share a worker
+        # without blocking the registrations behind them. Up to
+        # LIVE_FEED_MAX_STREAMS of them are held by open live feeds.
+        "worker_class": "gthread",
+        "threads": int(os.environ.get("WEB_THREADS", "8")),
+        "timeout": int(os.environ.get("WEB_TIMEOUT", "60")),
+        "graceful_timeout": int(os.environ.get("WEB_GRACEFUL_TIMEOUT", "30")),
+        "keepalive": int(os.environ.get("WEB_KEEPALIVE", "5")),
+        "max_requests": max_requests,
+        "max_requests_jitter": max_requests // 10,
+        "preload_app": True,
+        "accesslog": os.environ.get("WEB_ACCESS_LOG", "-"),
+        "post_fork": post_fork,
+        "post_worker_init": post_worker_init,
+        "worker_exit": worker_exit,
+    }
+
+
+def post_fork(server, worker):
+    import app as site
+
+    site.reset_after_fork()
+
+
+def post_worker_init(worker):
+    import app as site
+
+    site.warm_worker()
+    worker.log.info("Worker %s warmed up", worker.pid)
+
+
+def worker_exit(server, worker):
+    import app as site
+
+    site.shutdown_worker()
+
+
+class ProductionServer(BaseApplication):
+    def __init__(self, options=None):
+        self.options = {**default_options(), **(options or {})}
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key, value)
+
+    def load(self):
+        from app import app
+
+        return app
+
+
+if __name__ == "__main__":
+    ProductionServer().run()
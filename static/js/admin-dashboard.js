@@ -0,0 +1,791 @@
+document.addEventListener('DOMContentLoaded', () => {
+  const adminPage = document.querySelector('.admin-page');
+  const reorderEndpoint = adminPage.dataset.reorderEndpoint;
+  const registrationsEndpoint = adminPage.dataset.registrationsEndpoint;
+  
+  // Registration table management - Pagination
+  let currentPage = 1;
+  let currentSearch = '';
+  let currentCollege = '';
+  let currentArchive = '';
+  let isLoading = false;
+  let totalCount = 0;
+  let totalPages = 1;
+  const limit = 10;
+  
+  const tableBody = document.getElementById('registrationsTableBody');
+  const searchInput = document.getElementById('registrationSearch');
+  const clearSearchBtn = document.getElementById('clearSearchBtn');
+  const collegeFilter = document.getElementById('collegeFilter');
+  const dataScope = document.getElementById('dataScope');
+  const searchBtn = document.getElementById('searchBtn');
+  const tableInfo = document.getElementById('tableInfo');
+  const tableWrapper = document.getElementById('tableWrapper');
+  const downloadExcelBtn = document.getElementById('downloadExcelBtn');
+  const downloadPdfBtn = document.getElementById('downloadPdfBtn');
+  const prevPageBtn = document.getElementById('prevPageBtn');
+  const nextPageBtn = document.getElementById('nextPageBtn');
+  const pageNumbers = document.getElementById('pageNumbers');
+  const paginationInfo = document.getElementById('paginationInfo');
+  
+  // Debounce function for search
+  function debounce(func, wait) {
+    let timeout;
+    return function executedFunction(...args) {
+      const later = () => {
+        clearTimeout(timeout);
+        func(...args);
+      };
+      clearTimeout(timeout);
+      timeout = setTimeout(later, wait);
+    };
+  }
+  
+  // Load registrations with pagination
+  async function loadRegistrations(page = 1, search = '', college = '') {
+    if (isLoading) return;
+    isLoading = true;
+    
+    tableBody.innerHTML = '<tr><td colspan="10" class="loading-state"><span>Loading registrations...</span></td></tr>';
+    if (prevPageBtn && nextPageBtn) {
+      prevPageBtn.disabled = true;
+      nextPageBtn.disabled = true;
+    }
+    
+    try {
+      const params = new URLSearchParams({
+        page: page.toString(),
+        limit: limit.toString(),
+      });
+      if (search) {
+        params.append('search', search);
+      }
+      if (college) {
+        params.append('college', college);
+      }
+      if (currentArchive) {
+        params.append('archive', currentArchive);
+      }
+      
+      const response = await fetch(`${registrationsEndpoint}?${params}`, {
+        method: 'GET',
+        credentials: 'same-origin',
+        headers: {
+          'Accept': 'application/json',
+        }
+      });
+      
+      if (!response.ok) {
+        if (response.status === 401) {
+          window.location.href = '/admin/login';
+          return;
+        }
+        const errorText = await response.text();
+        console.error('API Error:', response.status, errorText);
+        throw new Error(`Failed to load registrations: ${response.status} ${response.statusText}`);
+      }
+      
+      const data = await response.json();
+      totalCount = data.total;
+      totalPages = Math.ceil(totalCount / limit);
+      currentPage = page;
+      
+      tableBody.innerHTML = '';
+      
+      if (data.registrations.length === 0) {
+        const searchMsg = search ? `No registrations found matching "${search}".` : 'No registrations found.';
+        tableBody.innerHTML = `<tr><td colspan="10" class="empty-state">${searchMsg}</td></tr>`;
+      } else {
+        data.registrations.forEach((reg, index) => {
+          tableBody.appendChild(registrationRow(reg, (page - 1) * limit + index + 1));
+        });
+        appendBlankRows();
+      }
+      
+      updateTableInfo();
+      updatePagination();
+      selectAllRows.checked = false;
+      updateBulkButtons();
+    } catch (error) {
+      console.error('Error loading registrations:', error);
+      tableBody.innerHTML = '<tr><td colspan="10" class="empty-state">Error loading registrations. Please refresh the page.</td></tr>';
+      if (prevPageBtn && nextPageBtn) {
+        prevPageBtn.disabled = true;
+        nextPageBtn.disabled = true;
+      }
+    } finally {
+      isLoading = false;
+      if (prevPageBtn && nextPageBtn && totalPages > 0) {
+        prevPageBtn.disabled = currentPage === 1 || isLoading;
+        nextPageBtn.disabled = currentPage === totalPages || isLoading;
+      }
+    }
+  }
+  
+  function registrationRow(reg, rowNumber) {
+    const row = document.createElement('tr');
+    row.innerHTML = `
+      <td data-label="Select"><input type="checkbox" class="row-select" value="${reg._id}" aria-label="Select ${escapeHtml(reg.name || 'registration')}" /></td>
+      <td data-label="ID">${rowNumber}</td>
+      <td data-label="Name">${escapeHtml(reg.name || '—')}</td>
+      <td data-label="College">${escapeHtml(reg.college || '—')}</td>
+      <td data-label="Course">${escapeHtml(reg.course || '—')}</td>
+      <td data-label="Role">${escapeHtml(reg.role || reg.category || '—')}</td>
+      <td data-label="Phone">${escapeHtml(formatPhone(reg.phone) || '—')}</td>
+      <td data-label="Email">${escapeHtml(reg.email || '—')}</td>
+      <td data-label="Registered">${escapeHtml(reg.formatted_created_at || '—')}</td>
+      <td data-label="Actions" class="action-cell">
+        ${currentArchive ? '—' : `<form
+          method="post"
+          action="/admin/registrations/${reg._id}/delete"
+          id="delete-form-${reg._id}"
+          class="delete-form"
+        >
+          <button
+            type="button"
+            class="btn danger ghost delete-trigger"
+            data-target="delete-form-${reg._id}"
+            data-name="${escapeHtml(reg.name)}"
+          >
+            Delete
+          </button>
+        </form>`}
+      </td>
+    `;
+    return row;
+  }
+  
+  // Insert a row pushed by the live feed above the trailing blank rows
+  function appendLiveRegistration(reg, rowNumber) {
+    const row = registrationRow(reg, rowNumber);
+    const firstBlankRow = tableBody.querySelector('.blank-row');
+    if (firstBlankRow) {
+      tableBody.insertBefore(row, firstBlankRow);
+    } else {
+      // The table was showing its empty-state message
+      tableBody.innerHTML = '';
+      tableBody.appendChild(row);
+      appendBlankRows();
+    }
+  }
+  
+  // Add 3 blank rows after the data rows (GUI only, not in exports)
+  function appendBlankRows() {
+    for (let i = 0; i < 3; i++) {
+      const blankRow = document.createElement('tr');
+      blankRow.className = 'blank-row';
+      blankRow.innerHTML = `
+        <td data-label="Select"></td>
+        <td data-label="ID">—</td>
+        <td data-label="Name">—</td>
+        <td data-label="College">—</td>
+        <td data-label="Course">—</td>
+        <td data-label="Role">—</td>
+        <td data-label="Phone">—</td>
+        <td data-label="Email">—</td>
+        <td data-label="Registered">—</td>
+        <td data-label="Actions" class="action-cell">—</td>
+      `;
+      tableBody.appendChild(blankRow);
+    }
+  }
+  
+  // Update table info
+  function updateTableInfo() {
+    const start = totalCount === 0 ? 0 : (currentPage - 1) * limit + 1;
+    const end = Math.min(currentPage * limit, totalCount);
+    let filterText = '';
+    if (currentCollege && currentSearch) {
+      filterText = ` (filtered by: "${currentCollege}" and "${currentSearch}")`;
+    } else if (currentCollege) {
+      filterText = ` (filtered by college: "${currentCollege}")`;
+    } else if (currentSearch) {
+      filterText = ` (filtered by: "${currentSearch}")`;
+    }
+    tableInfo.textContent = `Showing ${start} to ${end} of ${totalCount} registrations${filterText}`;
+  }
+  
+  // Update pagination controls
+  function updatePagination() {
+    // Update pagination info
+    paginationInfo.textContent = `Page ${currentPage} of ${totalPages}`;
+    
+    // Update buttons
+    prevPageBtn.disabled = currentPage === 1 || isLoading;
+    nextPageBtn.disabled = currentPage === totalPages || isLoading;
+    
+    // Update page numbers
+    pageNumbers.innerHTML = '';
+    const maxPagesToShow = 5;
+    let startPage = Math.max(1, currentPage - Math.floor(maxPagesToShow / 2));
+    let endPage = Math.min(totalPages, startPage + maxPagesToShow - 1);
+    
+    if (endPage - startPage < maxPagesToShow - 1) {
+      startPage = Math.max(1, endPage - maxPagesToShow + 1);
+    }
+    
+    if (startPage > 1) {
+      const firstBtn = document.createElement('button');
+      firstBtn.className = 'page-number';
+      firstBtn.textContent = '1';
+      firstBtn.addEventListener('click', () => loadRegistrations(1, currentSearch, currentCollege));
+      pageNumbers.appendChild(firstBtn);
+      
+      if (startPage > 2) {
+        const ellipsis = document.createElement('span');
+        ellipsis.className = 'page-ellipsis';
+        ellipsis.textContent = '...';
+        pageNumbers.appendChild(ellipsis);
+      }
+    }
+    
+    for (let i = startPage; i <= endPage; i++) {
+      const pageBtn = document.createElement('button');
+      pageBtn.className = `page-number ${i === currentPage ? 'active' : ''}`;
+      pageBtn.textContent = i;
+      pageBtn.addEventListener('click', () => loadRegistrations(i, currentSearch, currentCollege));
+      pageNumbers.appendChild(pageBtn);
+    }
+    
+    if (endPage < totalPages) {
+      if (endPage < totalPages - 1) {
+        const ellipsis = document.createElement('span');
+        ellipsis.className = 'page-ellipsis';
+        ellipsis.textContent = '...';
+        pageNumbers.appendChild(ellipsis);
+      }
+      
+      const lastBtn = document.createElement('button');
+      lastBtn.className = 'page-number';
+      lastBtn.textContent = totalPages;
+      lastBtn.addEventListener('click', () => loadRegistrations(totalPages, currentSearch, currentCollege));
+      pageNumbers.appendChild(lastBtn);
+    }
+  }
+  
+  // Download handlers
+  function downloadExcel() {
+    const params = new URLSearchParams();
+    if (currentSearch) params.append('search', currentSearch);
+    if (currentCollege) params.append('college', currentCollege);
+    if (currentArchive) params.append('archive', currentArchive);
+    const paramString = params.toString() ? `?${params.toString()}` : '';
+    window.location.href = `/admin/export/excel${paramString}`;
+  }
+  
+  function downloadPdf() {
+    const params = new URLSearchParams();
+    if (currentSearch) params.append('search', currentSearch);
+    if (currentCollege) params.append('college', currentCollege);
+    if (currentArchive) params.append('archive', currentArchive);
+    const paramString = params.toString() ? `?${params.toString()}` : '';
+    window.location.href = `/admin/export/pdf${paramString}`;
+  }
+  
+  
+  // Escape HTML
+  function escapeHtml(text) {
+    const div = document.createElement('div');
+    div.textContent = text;
+    return div.innerHTML;
+  }
+  
+  // Format phone
+  function formatPhone(phone) {
+    if (!phone) return '';
+    const digits = phone.replace(/\D/g, '');
+    if (digits.length === 12 && digits.startsWith('91')) {
+      return digits.substring(2);
+    }
+    return digits;
+  }
+  
+  // Perform search function
+  function performSearch() {
+    currentSearch = searchInput.value.trim();
+    currentCollege = collegeFilter.value;
+    currentArchive = dataScope ? dataScope.value : '';
+    // Archived rows are read-only: bulk edits and deletes target the current event.
+    const bulkActions = document.querySelector('.table-bulk-actions');
+    if (bulkActions) bulkActions.style.display = currentArchive ? 'none' : '';
+    
+    // Show/hide clear button
+    if (currentSearch || currentCollege) {
+      clearSearchBtn.style.display = 'flex';
+    } else {
+      clearSearchBtn.style.display = 'none';
+    }
+    
+    // Load search results - this will display filtered data in the GUI
+    loadRegistrations(1, currentSearch, currentCollege);
+    // Scroll to top of table
+    setTimeout(() => {
+      document.querySelector('.admin-table-section')?.scrollIntoView({ behavior: 'smooth', block: 'start' });
+    }, 100);
+  }
+  
+  // Search button handler
+  searchBtn.addEventListener('click', performSearch);
+  
+  // Search on Enter key
+  searchInput.addEventListener('keypress', (e) => {
+    if (e.key === 'Enter') {
+      performSearch();
+    }
+  });
+  
+  // College filter change handler
+  collegeFilter.addEventListener('change', () => {
+    performSearch();
+  });
+  dataScope?.addEventListener('change', performSearch);
+  
+  // Clear search button handler
+  clearSearchBtn.addEventListener('click', () => {
+    searchInput.value = '';
+    collegeFilter.value = '';
+    currentSearch = '';
+    currentCollege = '';
+    clearSearchBtn.style.display = 'none';
+    loadRegistrations(1, '', '');
+    setTimeout(() => {
+      document.querySelector('.admin-table-section')?.scrollIntoView({ behavior: 'smooth', block: 'start' });
+    }, 100);
+  });
+  
+  // Pagination handlers
+  prevPageBtn.addEventListener('click', function(e) {
+    e.preventDefault();
+    e.stopPropagation();
+    if (currentPage > 1 && !isLoading) {
+      loadRegistrations(currentPage - 1, currentSearch, currentCollege);
+      // Scroll to top of table
+      setTimeout(() => {
+        document.querySelector('.admin-table-section')?.scrollIntoView({ behavior: 'smooth', block: 'start' });
+      }, 100);
+    }
+  });
+  
+  nextPageBtn.addEventListener('click', function(e) {
+    e.preventDefault();
+    e.stopPropagation();
+    if (currentPage < totalPages && !isLoading) {
+      loadRegistrations(currentPage + 1, currentSearch, currentCollege);
+      // Scroll to top of table
+      setTimeout(() => {
+        document.querySelector('.admin-table-section')?.scrollIntoView({ behavior: 'smooth', block: 'start' });
+      }, 100);
+    }
+  });
+  
+  // Bulk selection and actions
+  const bulkEndpoint = adminPage.dataset.bulkEndpoint;
+  const selectAllRows = document.getElementById('selectAllRows');
+  const bulkDeleteBtn = document.getElementById('bulkDeleteBtn');
+  const bulkMoveBtn = document.getElementById('bulkMoveBtn');
+  const bulkCollegeSelect = document.getElementById('bulkCollegeSelect');
+
+  function selectedIds() {
+    return Array.from(tableBody.querySelectorAll('.row-select:checked')).map((box) => box.value);
+  }
+
+  function updateBulkButtons() {
+    const count = selectedIds().length;
+    bulkDeleteBtn.disabled = count === 0;
+    bulkMoveBtn.disabled = count === 0 || !bulkCollegeSelect.value;
+    bulkDeleteBtn.textContent = count ? `Delete selected (${count})` : 'Delete selected';
+  }
+
+  async function runBulkAction(payload) {
+    const response = await fetch(bulkEndpoint, {
+      method: 'POST',
+      credentials: 'same-origin',
+      headers: {
+        'Content-Type': 'application/json',
+        'Accept': 'application/json',
+      },
+      body: JSON.stringify(payload),
+    });
+    const data = await response.json();
+    if (!response.ok) {
+      throw new Error(data.error || 'Bulk operation failed');
+    }
+    return data;
+  }
+
+  selectAllRows.addEventListener('change', () => {
+    tableBody.querySelectorAll('.row-select').forEach((box) => {
+      box.checked = selectAllRows.checked;
+    });
+    updateBulkButtons();
+  });
+  tableBody.addEventListener('change', (e) => {
+    if (e.target.classList.contains('row-select')) updateBulkButtons();
+  });
+  bulkCollegeSelect.addEventListener('change', updateBulkButtons);
+
+  bulkDeleteBtn.addEventListener('click', async () => {
+    const ids = selectedIds();
+    if (!ids.length || !confirm(`Delete ${ids.length} registration(s)? This action cannot be undone.`)) return;
+    try {
+      const report = await runBulkAction({ action: 'delete', ids });
+      tableInfo.textContent = `Deleted ${report.deleted} registration(s).`;
+    } catch (error) {
+      alert(error.message);
+    }
+    selectAllRows.checked = false;
+    loadRegistrations(currentPage, currentSearch, currentCollege);
+  });
+
+  bulkMoveBtn.addEventListener('click', async () => {
+    const ids = selectedIds();
+    const college = bulkCollegeSelect.value;
+    if (!ids.length || !college) return;
+    try {
+      await runBulkAction({ action: 'reassign', ids, set: { college } });
+    } catch (error) {
+      alert(error.message);
+    }
+    selectAllRows.checked = false;
+    bulkCollegeSelect.value = '';
+    loadRegistrations(currentPage, currentSearch, currentCollege);
+  });
+
+  // Download button handlers
+  downloadExcelBtn.addEventListener('click', downloadExcel);
+  downloadPdfBtn.addEventListener('click', downloadPdf);
+  
+  // Initial load
+  loadRegistrations(1, '', '');
+
+  // Registration analytics panel (reads precomputed rollups)
+  const analyticsEndpoint = adminPage.dataset.analyticsEndpoint;
+
+  function renderAnalyticsBars(listId, rows, labelFor = (row) => row.key) {
+    const list = document.getElementById(listId);
+    if (!list) return;
+    // The hourly series is zero-filled, so "no data" means every count is 0.
+    if (!rows.some((row) => row.count)) {
+      list.innerHTML = '<li>No data yet.</li>';
+      return;
+    }
+    const max = Math.max(...rows.map((row) => row.count));
+    list.innerHTML = rows.map((row) => `
+      <li>
+        <span class="analytics-label">${escapeHtml(labelFor(row))}</span>
+        <span class="analytics-bar" style="width: ${row.count ? Math.max(4, (row.count / max) * 100) : 0}%"></span>
+        <strong>${row.count}</strong>
+      </li>
+    `).join('');
+  }
+
+  async function loadAnalytics() {
+    try {
+      const response = await fetch(`${analyticsEndpoint}?hours=24`, {
+        credentials: 'same-origin',
+        headers: { 'Accept': 'application/json' },
+      });
+      if (!response.ok) return;
+      const data = await response.json();
+      renderAnalyticsBars('analyticsHourly', data.hourly, (row) => row.key.slice(5).replace('T', ' '));
+      renderAnalyticsBars('analyticsColleges', data.college.slice(0, 5));
+      renderAnalyticsBars('analyticsRoles', data.role);
+    } catch (error) {
+      console.error('Error loading analytics:', error);
+    }
+  }
+
+  const refreshAnalytics = debounce(loadAnalytics, 2000);
+  loadAnalytics();
+
+  // Live registration feed (server-sent events)
+  const totalRegistrations = document.getElementById('totalRegistrations');
+  const liveFeedNotice = document.getElementById('liveFeedNotice');
+  let pendingNewRegistrations = 0;
+
+  function showLiveFeedNotice() {
+    if (!liveFeedNotice) return;
+    const label = pendingNewRegistrations === 1 ? 'registration' : 'registrations';
+    liveFeedNotice.textContent = `${pendingNewRegistrations} new ${label} · Show`;
+    liveFeedNotice.hidden = false;
+  }
+
+  liveFeedNotice?.addEventListener('click', () => {
+    pendingNewRegistrations = 0;
+    liveFeedNotice.hidden = true;
+    const lastPage = Math.max(1, Math.ceil(totalCount / limit));
+    loadRegistrations(currentSearch || currentCollege ? currentPage : lastPage, currentSearch, currentCollege);
+  });
+
+  if ('EventSource' in window) {
+    const liveFeed = new EventSource(`${registrationsEndpoint}/stream`);
+    const updateTotal = (data) => {
+      if (totalRegistrations && typeof data.total === 'number') {
+        totalRegistrations.textContent = data.total;
+      }
+    };
+
+    liveFeed.addEventListener('insert', (event) => {
+      const data = JSON.parse(event.data);
+      updateTotal(data);
+      refreshAnalytics();
+      if (currentArchive) return;
+      if (!currentSearch && !currentCollege && !isLoading && typeof data.total === 'number') {
+        // The event carries the row and the new total, so the table is
+        // updated in place; only 'resync' re-fetches.
+        const onLastPage = currentPage >= totalPages;
+        const shownRows = tableBody.querySelectorAll('.row-select').length;
+        totalCount = data.total;
+        totalPages = Math.max(1, Math.ceil(totalCount / limit));
+        if (onLastPage && shownRows < limit && data.registration) {
+          appendLiveRegistration(data.registration, (currentPage - 1) * limit + shownRows + 1);
+        } else {
+          pendingNewRegistrations += 1;
+          showLiveFeedNotice();
+        }
+        updateTableInfo();
+        updatePagination();
+      } else {
+        pendingNewRegistrations += 1;
+        showLiveFeedNotice();
+      }
+    });
+    liveFeed.addEventListener('delete', (event) => {
+      updateTotal(JSON.parse(event.data));
+      refreshAnalytics();
+    });
+    liveFeed.addEventListener('counters', (event) => updateTotal(JSON.parse(event.data)));
+    liveFeed.addEventListener('resync', () => {
+      loadRegistrations(currentPage, currentSearch, currentCollege);
+    });
+    window.addEventListener('beforeunload', () => liveFeed.close());
+  }
+  
+  // Smooth click-and-drag scrolling for table (horizontal only)
+  let isDown = false;
+  let startX;
+  let scrollLeft;
+  
+  tableWrapper.addEventListener('mousedown', (e) => {
+    // Don't interfere with buttons, links, or form elements
+    if (e.target.closest('button') || e.target.closest('a') || e.target.closest('input') || e.target.closest('form')) {
+      return;
+    }
+    // Only enable drag for horizontal scrolling on table cells
+    if (e.target.closest('table')) {
+      isDown = true;
+      tableWrapper.style.cursor = 'grabbing';
+      startX = e.pageX - tableWrapper.offsetLeft;
+      scrollLeft = tableWrapper.scrollLeft;
+      e.preventDefault();
+    }
+  });
+  
+  tableWrapper.addEventListener('mouseleave', () => {
+    isDown = false;
+    tableWrapper.style.cursor = 'grab';
+  });
+  
+  tableWrapper.addEventListener('mouseup', () => {
+    isDown = false;
+    tableWrapper.style.cursor = 'grab';
+  });
+  
+  tableWrapper.addEventListener('mousemove', (e) => {
+    if (!isDown) return;
+    e.preventDefault();
+    const x = e.pageX - tableWrapper.offsetLeft;
+    const walk = (x - startX) * 2; // Scroll speed multiplier
+    tableWrapper.scrollLeft = scrollLeft - walk;
+  });
+  
+  // Set initial cursor
+  tableWrapper.style.cursor = 'grab';
+  
+  // Delete modal handlers using event delegation
+  let currentDeleteFormId = null;
+  const modal = document.getElementById('deleteModal');
+  const modalText = document.getElementById('deleteModalText');
+  const confirmBtn = document.getElementById('confirmDeleteBtn');
+  const cancelBtn = document.querySelector('[data-modal-cancel]');
+  
+  // Ensure elements exist
+  if (!modal || !modalText || !confirmBtn || !cancelBtn) {
+    console.error('Delete modal elements not found:', { modal: !!modal, modalText: !!modalText, confirmBtn: !!confirmBtn, cancelBtn: !!cancelBtn });
+  }
+  
+  // Event delegation for delete buttons - use tableBody to catch dynamically added buttons
+  tableBody.addEventListener('click', (e) => {
+    const deleteBtn = e.target.closest('.delete-trigger');
+    if (!deleteBtn) return;
+    
+    e.preventDefault();
+    e.stopPropagation();
+    
+    const formId = deleteBtn.dataset.target;
+    const name = deleteBtn.dataset.name;
+    
+    if (!formId || !name) {
+      console.error('Delete button missing data attributes:', { formId, name });
+      return;
+    }
+    
+    if (!modal || !modalText) {
+      console.error('Modal elements not available');
+      return;
+    }
+    
+    currentDeleteFormId = formId;
+    modalText.textContent = `Are you sure you want to delete the registration for "${name}"? This action cannot be undone.`;
+    modal.setAttribute('aria-hidden', 'false');
+    modal.classList.add('is-open');
+  });
+  
+  // Confirm delete
+  if (confirmBtn) {
+    confirmBtn.addEventListener('click', (e) => {
+      e.preventDefault();
+      e.stopPropagation();
+      if (currentDeleteFormId) {
+        const form = document.getElementById(currentDeleteFormId);
+        if (form) {
+          // Close modal first
+          if (modal) {
+            modal.setAttribute('aria-hidden', 'true');
+            modal.classList.remove('is-open');
+          }
+          // Submit form
+          form.submit();
+        } else {
+          console.error('Delete form not found:', currentDeleteFormId);
+          if (modal) {
+            modal.setAttribute('aria-hidden', 'true');
+            modal.classList.remove('is-open');
+          }
+        }
+        currentDeleteFormId = null;
+      }
+    });
+  }
+  
+  // Cancel delete
+  if (cancelBtn) {
+    cancelBtn.addEventListener('click', (e) => {
+      e.preventDefault();
+      e.stopPropagation();
+      if (modal) {
+        modal.setAttribute('aria-hidden', 'true');
+        modal.classList.remove('is-open');
+      }
+      currentDeleteFormId = null;
+    });
+  }
+  
+  // Close modal when clicking outside
+  if (modal) {
+    modal.addEventListener('click', (e) => {
+      if (e.target === modal) {
+        modal.setAttribute('aria-hidden', 'true');
+        modal.classList.remove('is-open');
+        currentDeleteFormId = null;
+      }
+    });
+  }
+  
+  // Close modal with Escape key
+  document.addEventListener('keydown', (e) => {
+    if (e.key === 'Escape' && modal && modal.classList.contains('is-open')) {
+      modal.setAttribute('aria-hidden', 'true');
+      modal.classList.remove('is-open');
+      currentDeleteFormId = null;
+    }
+  });
+
+  document.querySelectorAll('.option-list[data-type]').forEach((list) => {
+    list.querySelectorAll('li').forEach((item) => {
+      item.setAttribute('draggable', 'true');
+    });
+
+    const handleDragStart = (event) => {
+      const item = event.target.closest('li');
+      if (!item || event.target.closest('button')) {
+        event.preventDefault();
+        return;
+      }
+      event.dataTransfer.effectAllowed = 'move';
+      try {
+        event.dataTransfer.setData('text/plain', '');
+      } catch (err) {}
+      item.classList.add('dragging');
+    };
+
+    const handleDragOver = (event) => {
+      event.preventDefault();
+      const dragging = list.querySelector('.dragging');
+      if (!dragging) return;
+      const afterElement = getDragAfterElement(list, event.clientY);
+      if (afterElement == null) {
+        list.appendChild(dragging);
+      } else {
+        list.insertBefore(dragging, afterElement);
+      }
+    };
+
+    const handleDrop = (event) => {
+      event.preventDefault();
+      const dragging = list.querySelector('.dragging');
+      if (dragging) {
+        dragging.classList.remove('dragging');
+        persistOrder(list);
+      }
+    };
+
+    const handleDragEnd = () => {
+      const dragging = list.querySelector('.dragging');
+      dragging?.classList.remove('dragging');
+    };
+
+    list.addEventListener('dragstart', handleDragStart);
+    list.addEventListener('dragover', handleDragOver);
+    list.addEventListener('drop', handleDrop);
+    list.addEventListener('dragend', handleDragEnd);
+    list.addEventListener('dragenter', (event) => event.preventDefault());
+  });
+
+  function getDragAfterElement(list, y) {
+    const items = [...list.querySelectorAll('li:not(.dragging)')];
+    return items.reduce((closest, child) => {
+      const box = child.getBoundingClientRect();
+      const offset = y - box.top - box.height / 2;
+      if (offset < 0 && offset > closest.offset) {
+        return { offset, element: child };
+      } else {
+        return closest;
+      }
+    }, { offset: Number.NEGATIVE_INFINITY }).element || null;
+  }
+
+  function persistOrder(list) {
+    const optionType = list.dataset.type;
+    const order = Array.from(list.querySelectorAll('li')).map((item) => item.dataset.value);
+    fetch(reorderEndpoint, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        'X-Requested-With': 'XMLHttpRequest',
+      },
+      credentials: 'same-origin',
+      body: JSON.stringify({ option_type: optionType, order }),
+    })
+      .then((response) => response.json())
+      .then((data) => {
+        if (!data.success) {
+          throw new Error();
+        }
+      })
+      .catch(() => {
+        alert('Unable to save the new order. Please try again.');
+        window.location.reload();
+      });
+  }
+});
@@ -198,12 +198,12 @@ window.addEventListener('resize', function() {
 
 // Gallery fullscreen lightbox
 document.addEventListener('DOMContentLoaded', function() {
-  const triggers = document.querySelectorAll('.gallery-fullscreen-trigger');
+  const grid = document.querySelector('.gallery-grid');
   const lightbox = document.getElementById('galleryLightbox');
   const lightboxImage = document.getElementById('lightboxImage');
   const closeButton = document.querySelector('.modal-close');
 
-  if (!lightbox || !lightboxImage || triggers.length === 0) return;
+  if (!grid || !lightbox || !lightboxImage) return;
 
   const openLightbox = trigger => {
     const src = trigger.dataset.src;
@@ -220,11 +220,12 @@ document.addEventListener('DOMContentLoaded', function() {
     document.body.classList.remove('modal-open');
   };
 
-  triggers.forEach(trigger => {
-    trigger.addEventListener('click', e => {
-      e.preventDefault();
-      openLightbox(trigger);
-    });
+  // Delegated, so cards appended by the gallery loader below work too.
+  grid.addEventListener('click', e => {
+    const trigger = e.target.closest('.gallery-fullscreen-trigger');
+    if (!trigger) return;
+    e.preventDefault();
+    openLightbox(trigger);
   });
 
   closeButton?.addEventListener('click', closeLightbox);
@@ -240,6 +241,75 @@ document.addEventListener('DOMContentLoaded', function() {
   });
 });
 
+// Gallery progressive loading: the page ships the first screen of images and
+// fetches the next page from /api/gallery as the sentinel scrolls into view.
+document.addEventListener('DOMContentLoaded', function() {
+  const grid = document.querySelector('.gallery-grid');
+  const sentinel = document.getElementById('galleryMore');
+  const template = document.getElementById('galleryItemTemplate');
+
+  if (!grid || !sentinel || !template || !('IntersectionObserver' in window)) return;
+
+  let cursor = sentinel.dataset.nextCursor;
+  let loading = false;
+
+  const buildItem = item => {
+    const figure = template.content.firstElementChild.cloneNode(true);
+    const title = item.title || 'Gallery image';
+    const trigger = figure.querySelector('.gallery-fullscreen-trigger');
+    const image = figure.querySelector('img');
+    figure.setAttribute('aria-label', title);
+    trigger.dataset.src = item.src;
+    trigger.dataset.alt = title;
+    trigger.setAttribute('aria-label', 'Expand ' + title);
+    image.src = item.src;
+    image.alt = title;
+    if (item.width && item.height) {
+      image.width = item.width;
+      image.height = item.height;
+    }
+    if (item.placeholder) {
+      image.style.backgroundImage = 'url("' + item.placeholder + '")';
+    }
+    return figure;
+  };
+
+  const observer = new IntersectionObserver(entries => {
+    if (!entries.some(entry => entry.isIntersecting) || loading || !cursor) return;
+    loading = true;
+    const url = sentinel.dataset.endpoint + '?cursor=' + encodeURIComponent(cursor) +
+      '&limit=' + encodeURIComponent(sentinel.dataset.pageSize || '12');
+    fetch(url, { headers: { Accept: 'application/json' } })
+      .then(response => {
+        if (!response.ok) throw new Error('Gallery page failed: ' + response.status);
+        return response.json();
+      })
+      .then(data => {
+        const fragment = document.createDocumentFragment();
+        data.items.forEach(item => fragment.appendChild(buildItem(item)));
+        grid.appendChild(fragment);
+        cursor = data.next_cursor;
+        if (!cursor) {
+          observer.disconnect();
+          sentinel.remove();
+          return;
+        }
+        // Re-observe so a sentinel still in view after a short page fires again.
+        observer.unobserve(sentinel);
+        observer.observe(sentinel);
+      })
+      .catch(() => {
+        // Leave the "Load more" link in place as the fallback.
+        observer.disconnect();
+      })
+      .finally(() => {
+        loading = false;
+      });
+  }, { rootMargin: '600px 0px' });
+
+  observer.observe(sentinel);
+});
+
 (function () {
   const MODAL_IDS = ["registrationSuccessModal", "registrationDuplicateModal"];
 
@@ -0,0 +1,228 @@
+// Advanced audio playback with seamless tab switching
+(function() {
+  const audio = document.getElementById('site-background-audio');
+  if (!audio) return;
+
+  // Configure audio for best performance
+  audio.volume = 0.5;
+  audio.crossOrigin = 'anonymous';
+
+  let isPlaying = false;
+  let hasStarted = false;
+  let autoplayAttempts = 0;
+  const MAX_ATTEMPTS = 50;
+
+  // Aggressive play function that tries multiple strategies
+  const attemptPlay = () => {
+    if (isPlaying) return true;
+    if (autoplayAttempts >= MAX_ATTEMPTS) return false;
+
+    autoplayAttempts++;
+
+    // Try to play if audio is ready
+    if (audio.readyState >= 2) { // HAVE_CURRENT_DATA or better
+      const playPromise = audio.play();
+      if (playPromise !== undefined) {
+        return playPromise
+          .then(() => {
+            isPlaying = true;
+            hasStarted = true;
+            console.log("Audio playing successfully");
+            return true;
+          })
+          .catch((error) => {
+            // Autoplay blocked - will retry
+            return false;
+          });
+      }
+    }
+    return false;
+  };
+
+  // Continuous attempt function
+  const continuousAttempt = () => {
+    if (!isPlaying && !hasStarted) {
+      attemptPlay();
+    }
+  };
+
+  // Try to play immediately and continuously
+  attemptPlay();
+
+  // Schedule multiple immediate attempts
+  const immediateAttempts = [0, 10, 25, 50, 75, 100, 150, 200, 300, 400, 500, 750, 1000];
+  immediateAttempts.forEach(delay => {
+    setTimeout(continuousAttempt, delay);
+  });
+
+  // Use requestAnimationFrame for very early attempts
+  requestAnimationFrame(() => {
+    continuousAttempt();
+    requestAnimationFrame(() => {
+      continuousAttempt();
+      requestAnimationFrame(continuousAttempt);
+    });
+  });
+
+  // Listen for all audio ready events
+  ['loadstart', 'loadedmetadata', 'loadeddata', 'canplay', 'canplaythrough', 'playing'].forEach(eventType => {
+    audio.addEventListener(eventType, continuousAttempt, { once: true });
+  });
+
+  // Try on all page load events
+  if (document.readyState === 'complete' || document.readyState === 'interactive') {
+    continuousAttempt();
+    setTimeout(continuousAttempt, 50);
+  }
+
+  document.addEventListener('DOMContentLoaded', () => {
+    continuousAttempt();
+    setTimeout(continuousAttempt, 50);
+    setTimeout(continuousAttempt, 100);
+  }, { once: true });
+
+  window.addEventListener('load', () => {
+    continuousAttempt();
+    setTimeout(continuousAttempt, 50);
+    setTimeout(continuousAttempt, 200);
+  }, { once: true });
+
+  // Save playback position for seamless navigation between pages
+  const savePosition = () => {
+    try {
+      sessionStorage.setItem('audio_position', audio.currentTime.toString());
+      sessionStorage.setItem('audio_playing', (!audio.paused).toString());
+    } catch(e) {}
+  };
+
+  // Restore playback position from previous page
+  const restorePosition = () => {
+    try {
+      const savedPosition = sessionStorage.getItem('audio_position');
+      const wasPlaying = sessionStorage.getItem('audio_playing') === 'true';
+
+      if (savedPosition !== null) {
+        const position = parseFloat(savedPosition);
+        if (audio.readyState >= 1) {
+          audio.currentTime = position;
+        } else {
+          audio.addEventListener('loadeddata', () => {
+            audio.currentTime = position;
+          }, { once: true });
+        }
+
+        // Resume if it was playing before
+        if (wasPlaying && hasStarted) {
+          setTimeout(() => {
+            audio.play().catch(() => {});
+          }, 100);
+        }
+      }
+    } catch(e) {}
+  };
+
+  // Save position periodically and before page unload
+  setInterval(savePosition, 1000); // Save every second
+
+  window.addEventListener('beforeunload', () => {
+    savePosition();
+  });
+
+  // Restore position on load
+  restorePosition();
+
+  // Page Visibility API - pause/resume smoothly when switching tabs
+  let wasPlayingBeforeHidden = false;
+  document.addEventListener('visibilitychange', () => {
+    if (document.hidden) {
+      // Tab hidden - pause (don't stop, preserves position)
+      if (!audio.paused) {
+        wasPlayingBeforeHidden = true;
+        audio.pause();
+        }
+      savePosition();
+    } else {
+      // Tab visible - resume from where it was (no restart)
+      if (wasPlayingBeforeHidden || hasStarted) {
+        wasPlayingBeforeHidden = false;
+        // Resume immediately if it was playing
+        audio.play().catch(() => {
+          // If resume fails, try again
+          setTimeout(() => audio.play().catch(() => {}), 100);
+        });
+      } else {
+        // First time load - try to start
+        restorePosition();
+        continuousAttempt();
+      }
+    }
+  });
+
+  // Capture ANY user interaction to unlock audio (as fallback)
+  const unlockOnInteraction = () => {
+    if (!hasStarted) {
+      attemptPlay();
+      setTimeout(continuousAttempt, 10);
+      setTimeout(continuousAttempt, 50);
+    }
+  };
+
+  // Listen for any user interaction with capture phase for earliest capture
+  const interactionEvents = ['click', 'touchstart', 'keydown', 'mousedown', 'pointerdown', 'mouseover', 'mousemove', 'scroll', 'wheel'];
+  interactionEvents.forEach(eventType => {
+    document.addEventListener(eventType, unlockOnInteraction, { once: true, passive: true, capture: true });
+    window.addEventListener(eventType, unlockOnInteraction, { once: true, passive: true, capture: true });
+  });
+
+  // Also add listeners to body when ready
+  if (document.body) {
+    interactionEvents.forEach(eventType => {
+      document.body.addEventListener(eventType, unlockOnInteraction, { once: true, passive: true, capture: true });
+    });
+  } else {
+    const bodyObserver = new MutationObserver(() => {
+      if (document.body) {
+        interactionEvents.forEach(eventType => {
+          document.body.addEventListener(eventType, unlockOnInteraction, { once: true, passive: true, capture: true });
+        });
+        bodyObserver.disconnect();
+      }
+    });
+    bodyObserver.observe(document.documentElement, { childList: true, subtree: true });
+  }
+
+  // Handle audio errors and retry
+  audio.addEventListener('error', () => {
+    console.log('Audio error, retrying...');
+    setTimeout(continuousAttempt, 500);
+  }, { once: true });
+
+  // Ensure playback continues smoothly
+  audio.addEventListener('pause', () => {
+    // Only set isPlaying to false if not due to visibility change
+    if (!document.hidden) {
+      isPlaying = false;
+    }
+  });
+
+  audio.addEventListener('play', () => {
+    isPlaying = true;
+    hasStarted = true;
+  });
+
+  // Keep trying periodically until it plays (for browsers that eventually allow it)
+  const persistentAttempt = setInterval(() => {
+    if (hasStarted || autoplayAttempts >= MAX_ATTEMPTS) {
+      clearInterval(persistentAttempt);
+      return;
+    }
+    if (document.readyState === 'complete' && !document.hidden) {
+      continuousAttempt();
+  }
+  }, 500);
+
+  // Clear interval after 10 seconds to avoid infinite attempts
+  setTimeout(() => {
+    clearInterval(persistentAttempt);
+  }, 10000);
+})();
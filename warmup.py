@@ -0,0 +1,132 @@
+"""Template warm-up and a cold-start benchmark.
+
+Jinja compiles a template to Python source, then to a code object, the first
+time it is loaded. ``app.py`` points Jinja at a ``FileSystemBytecodeCache``
+(``TEMPLATE_CACHE_DIR``) so that work is done once and shared by every worker
+and restart, and calls :func:`warm_templates` at import so the remaining
+unmarshal-and-exec step happens at boot rather than on a visitor's request.
+
+``flask --app app bench-startup`` (or ``python warmup.py``) measures import
+time, warm-up time and first-request latency in fresh interpreters for three
+setups: no bytecode cache, bytecode cache only, and cache plus warm-up.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# Pages that render without MongoDB, so the numbers measure templates only.
+BENCH_PATHS = ["/", "/about", "/gallery", "/admin/login"]
+
+BENCH_MODES = {
+    "cold": {"TEMPLATE_CACHE": "0", "TEMPLATE_WARMUP": "0"},
+    "bytecode cache": {"TEMPLATE_CACHE": "1", "TEMPLATE_WARMUP": "0"},
+    "cache + warm-up": {"TEMPLATE_CACHE": "1", "TEMPLATE_WARMUP": "1"},
+}
+
+
+def warm_templates(app):
+    """Load every template so no request pays for compiling one.
+
+    Returns ``(count, seconds)``.
+    """
+    started = time.perf_counter()
+    names = [
+        name
+        for name in app.jinja_env.list_templates()
+        if not os.path.basename(name).startswith(".")
+    ]
+    for name in names:
+        app.jinja_env.get_template(name)
+    return len(names), time.perf_counter() - started
+
+
+def _measure_child():
+    """Run inside a fresh interpreter: import the app and hit each page once."""
+    started = time.perf_counter()
+    import app as site
+
+    imported = time.perf_counter() - started
+    client = site.app.test_client()
+    first_requests = {}
+    for path in BENCH_PATHS:
+        request_started = time.perf_counter()
+        client.get(path).close()
+        first_requests[path] = (time.perf_counter() - request_started) * 1000
+    print(
+        json.dumps(
+            {
+                "import_ms": imported * 1000,
+                "warmup_ms": site.template_warmup_seconds * 1000,
+                "first_requests_ms": first_requests,
+            }
+        )
+    )
+
+
+def run_benchmark(project_dir, runs=5):
+    """Return the median timings per mode, measured in fresh interpreters."""
+    results = {}
+    cache_dir = tempfile.mkdtemp(prefix="jinja-bench-")
+    try:
+        for mode, overrides in BENCH_MODES.items():
+            samples = []
+            for _ in range(runs):
+                env = {**os.environ, **overrides, "TEMPLATE_CACHE_DIR": cache_dir}
+                output = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--child"],
+                    cwd=project_dir,
+                    env=env,
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                ).stdout
+                samples.append(json.loads(output.strip().splitlines()[-1]))
+            results[mode] = _median_sample(samples)
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    return results
+
+
+def _median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def _median_sample(samples):
+    return {
+        "import_ms": _median([sample["import_ms"] for sample in samples]),
+        "warmup_ms": _median([sample["warmup_ms"] for sample in samples]),
+        "first_requests_ms": {
+            path: _median([sample["first_requests_ms"][path] for sample in samples])
+            for path in BENCH_PATHS
+        },
+    }
+
+
+def format_results(results):
+    header = f"{'mode':<18}{'import':>9}{'warm-up':>9}" + "".join(
+        f"{path:>14}" for path in BENCH_PATHS
+    )
+    lines = [header, "-" * len(header)]
+    for mode, timings in results.items():
+        lines.append(
+            f"{mode:<18}{timings['import_ms']:>7.1f}ms{timings['warmup_ms']:>7.1f}ms"
+            + "".join(
+                f"{timings['first_requests_ms'][path]:>12.1f}ms" for path in BENCH_PATHS
+            )
+        )
+    return lines
+
+
+if __name__ == "__main__":
+    if "--child" in sys.argv:
+        sys.path.insert(0, os.getcwd())
+        _measure_child()
+    else:
+        for line in format_results(run_benchmark(os.path.dirname(os.path.abspath(__file__)))):
+            print(line)